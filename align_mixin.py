@@ -0,0 +1,116 @@
+import tkinter as tk
+
+try:
+    import numpy as np
+except ImportError: # NumPy が無い環境では同じ計算を Python のリストで行う
+    np = None
+
+# 選択中のアイテムの整列・等間隔配置。
+# bbox の取得と移動はそれぞれ Tcl 側のループ1回にまとめ、移動量はまとめて計算する。
+
+
+def compute_align_deltas(bboxes, mode):
+    # bboxes: [(x1, y1, x2, y2), ...] -> 各アイテムの (dx, dy)
+    if np is not None:
+        boxes = np.asarray(bboxes, dtype=float)
+        dx = np.zeros(len(boxes)); dy = np.zeros(len(boxes))
+        if mode == "left": dx = boxes[:, 0].min() - boxes[:, 0]
+        elif mode == "right": dx = boxes[:, 2].max() - boxes[:, 2]
+        elif mode == "top": dy = boxes[:, 1].min() - boxes[:, 1]
+        elif mode == "bottom": dy = boxes[:, 3].max() - boxes[:, 3]
+        elif mode == "center_x":
+            centers = (boxes[:, 0] + boxes[:, 2]) / 2
+            dx = (boxes[:, 0].min() + boxes[:, 2].max()) / 2 - centers
+        elif mode == "center_y":
+            centers = (boxes[:, 1] + boxes[:, 3]) / 2
+            dy = (boxes[:, 1].min() + boxes[:, 3].max()) / 2 - centers
+        return list(zip(np.rint(dx).astype(int).tolist(), np.rint(dy).astype(int).tolist()))
+    x1s = [b[0] for b in bboxes]; y1s = [b[1] for b in bboxes]; x2s = [b[2] for b in bboxes]; y2s = [b[3] for b in bboxes]
+    zeros = [0] * len(bboxes)
+    if mode == "left": dx, dy = [min(x1s) - x for x in x1s], zeros
+    elif mode == "right": dx, dy = [max(x2s) - x for x in x2s], zeros
+    elif mode == "top": dx, dy = zeros, [min(y1s) - y for y in y1s]
+    elif mode == "bottom": dx, dy = zeros, [max(y2s) - y for y in y2s]
+    elif mode == "center_x":
+        mid = (min(x1s) + max(x2s)) / 2
+        dx, dy = [mid - (a + b) / 2 for a, b in zip(x1s, x2s)], zeros
+    else:
+        mid = (min(y1s) + max(y2s)) / 2
+        dx, dy = zeros, [mid - (a + b) / 2 for a, b in zip(y1s, y2s)]
+    return [(round(x), round(y)) for x, y in zip(dx, dy)]
+
+
+def compute_distribute_deltas(bboxes, axis):
+    # 両端のアイテムは動かさず、間のアイテムの隙間を等しくする (axis: 0=横, 1=縦)
+    count = len(bboxes)
+    if np is not None:
+        boxes = np.asarray(bboxes, dtype=float)
+        starts, ends = boxes[:, axis], boxes[:, axis + 2]
+        order = np.argsort((starts + ends) / 2, kind="stable")
+        sizes = (ends - starts)[order]
+        gap = (ends.max() - starts.min() - sizes.sum()) / (count - 1)
+        new_starts = starts.min() + np.concatenate(([0.0], np.cumsum(sizes[:-1] + gap)))
+        moves = np.zeros(count)
+        moves[order] = np.rint(new_starts - starts[order])
+        moves = moves.astype(int).tolist()
+    else:
+        starts = [b[axis] for b in bboxes]; ends = [b[axis + 2] for b in bboxes]
+        order = sorted(range(count), key=lambda i: (starts[i] + ends[i]) / 2)
+        gap = (max(ends) - min(starts) - sum(e - s for s, e in zip(starts, ends))) / (count - 1)
+        moves = [0] * count; position = min(starts)
+        for i in order:
+            moves[i] = round(position - starts[i]); position += ends[i] - starts[i] + gap
+    return [(move, 0) if axis == 0 else (0, move) for move in moves]
+
+
+class AlignMixin:
+    def _init_align_commands(self):
+        self.tk.eval("proc ::layoutdesigner_bboxes {canvas ids} {set result {}; foreach id $ids {lappend result [$canvas bbox $id]}; return $result}")
+        self.tk.eval("proc ::layoutdesigner_move_items {canvas moves} {foreach {id dx dy} $moves {$canvas move $id $dx $dy}}")
+
+    def _bboxes_for_ids(self, ids, keep_empty=False):
+        # [(アイテムID, bbox), ...] (bbox の無いアイテムは除く。keep_empty なら bbox を None にして残す)
+        raw = self.tk.splitlist(self.tk.call("::layoutdesigner_bboxes", str(self.canvas_frame), tuple(ids)))
+        return [(item_id, tuple(int(v) for v in self.tk.splitlist(bbox)) if bbox else None) for item_id, bbox in zip(ids, raw)
+                if bbox or keep_empty]
+
+    def _selected_bboxes(self):
+        pairs = self._bboxes_for_ids([item.id for item in self.canvas_items if item.id in self.selected_item_ids])
+        return [item_id for item_id, _ in pairs], [bbox for _, bbox in pairs]
+
+    def _move_items_batched(self, moves):
+        # moves: [(item_id, dx, dy), ...] を1回の Tcl 呼び出しで適用する
+        flat = [value for move in moves if move[1] or move[2] for value in move]
+        if flat: self.tk.call("::layoutdesigner_move_items", str(self.canvas_frame), tuple(flat))
+        return len(flat) // 3
+
+    def _apply_layout_moves(self, label, ids, deltas):
+        moves = [(item_id, dx, dy) for item_id, (dx, dy) in zip(ids, deltas)]
+        if not self._move_items_batched(moves): return
+        def restore():
+            self._move_items_batched([(item_id, -dx, -dy) for item_id, dx, dy in moves])
+        self.push_undo_entry(label, restore, item_ids=ids)
+        self.invalidate_smart_guides(ids)
+        self.invalidate_group_bounds(ids)
+        self.update_highlight()
+
+    def align_selection(self, mode):
+        if len(self.selected_item_ids) < 2: return
+        ids, bboxes = self._selected_bboxes()
+        if len(ids) < 2: return
+        self._apply_layout_moves(f"整列 ({mode})", ids, compute_align_deltas(bboxes, mode))
+
+    def distribute_selection(self, axis):
+        if len(self.selected_item_ids) < 3: return
+        ids, bboxes = self._selected_bboxes()
+        if len(ids) < 3: return
+        self._apply_layout_moves("等間隔に配置", ids, compute_distribute_deltas(bboxes, axis))
+
+    def _build_align_menu(self, parent_menu):
+        align_menu = tk.Menu(parent_menu, tearoff=0); parent_menu.add_cascade(label="整列", menu=align_menu)
+        for label, mode in (("左揃え", "left"), ("左右中央揃え", "center_x"), ("右揃え", "right"),
+                            ("上揃え", "top"), ("上下中央揃え", "center_y"), ("下揃え", "bottom")):
+            align_menu.add_command(label=label, command=lambda m=mode: self.align_selection(m))
+        align_menu.add_separator()
+        align_menu.add_command(label="左右に等間隔で配置", command=lambda: self.distribute_selection(0))
+        align_menu.add_command(label="上下に等間隔で配置", command=lambda: self.distribute_selection(1))
@@ -0,0 +1,170 @@
+import time
+
+from PIL import Image, ImageSequence, ImageTk
+
+# アニメーション GIF / APNG の画像アイテム。
+# - コマは (ファイル, 表示サイズ) ごとに1回だけ展開して PhotoImage にし、同じファイルを置いた全アイテムで共有する
+# - 全アイテムを1つの after() の時計で動かす。次にコマを進めるアイテムの時刻まで眠り、アイテムごとのタイマーは持たない
+# - 見えていないアイテム (キャンバスの外・非表示・ウィンドウが最小化) はコマを進めない
+# generate_code は同じ仕組みを animation_code_lines() の形で書き出す。
+
+DEFAULT_FRAME_MS = 100 # 表示時間の無いコマ (ブラウザと同じく 0 もこれにする)
+MIN_FRAME_MS = 20
+HIDDEN_POLL_MS = 250 # 見えていないアイテムが見えるようになったかを確かめる間隔
+
+
+def is_animated_image(image):
+    return getattr(image, "is_animated", False) and getattr(image, "n_frames", 1) > 1
+
+
+def frame_delay(frame):
+    duration = frame.info.get("duration") or DEFAULT_FRAME_MS
+    return max(MIN_FRAME_MS, int(duration))
+
+
+def decode_frames(path, size):
+    # 合成済みのコマを表示サイズにして返す ([RGBA 画像], [表示時間 ms])
+    frames = []; delays = []
+    with Image.open(path) as image:
+        for frame in ImageSequence.Iterator(image):
+            rgba = frame.convert("RGBA")
+            frames.append(rgba.resize(size, Image.Resampling.LANCZOS) if rgba.size != size else rgba)
+            delays.append(frame_delay(frame))
+    return frames, delays
+
+
+class AnimationFrames:
+    __slots__ = ("key", "photos", "delays")
+
+    def __init__(self, key, photos, delays):
+        self.key = key; self.photos = photos; self.delays = delays
+
+
+class FrameCache:
+    # (パス, 幅, 高さ) -> AnimationFrames
+    def __init__(self):
+        self._frames = {}
+
+    def frames(self, master, path, size):
+        key = (path, int(size[0]), int(size[1]))
+        frames = self._frames.get(key)
+        if frames is None:
+            pil_frames, delays = decode_frames(path, key[1:])
+            frames = self._frames[key] = AnimationFrames(key, [ImageTk.PhotoImage(frame, master=master) for frame in pil_frames], delays)
+        return frames
+
+    def discard_path(self, path):
+        for key in [key for key in self._frames if key[0] == path]: del self._frames[key]
+
+    def prune(self, keys_in_use):
+        for key in [key for key in self._frames if key not in keys_in_use]: del self._frames[key]
+
+    def clear(self):
+        self._frames.clear()
+
+
+class AnimationClock:
+    # is_visible(キー) が偽のアイテムはコマを進めない。show_frame(キー, PhotoImage) で表示を切り替える
+    def __init__(self, master, is_visible, show_frame):
+        self.master = master
+        self.is_visible = is_visible; self.show_frame = show_frame
+        self._entries = {} # キー -> [AnimationFrames, コマ番号, 次に進める時刻 (ms)]
+        self._after_id = None
+        self.ticks = 0; self.frames_shown = 0
+
+    def add(self, key, frames):
+        self._entries[key] = [frames, 0, self._now() + frames.delays[0]]
+        self._reschedule()
+
+    def set_frames(self, key, frames):
+        entry = self._entries.get(key)
+        if entry is None: self.add(key, frames); return
+        entry[0] = frames; entry[1] %= len(frames.photos)
+        self.show_frame(key, frames.photos[entry[1]])
+
+    def remove(self, key):
+        if self._entries.pop(key, None) is not None and not self._entries: self._cancel()
+
+    def clear(self):
+        self._entries.clear(); self._cancel()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _now(self):
+        return time.monotonic() * 1000
+
+    def _cancel(self):
+        if self._after_id is not None:
+            self.master.after_cancel(self._after_id); self._after_id = None
+
+    def _reschedule(self):
+        self._cancel()
+        if not self._entries: return
+        delay = min(entry[2] for entry in self._entries.values()) - self._now()
+        self._after_id = self.master.after(max(1, int(delay)), self._tick)
+
+    def _tick(self):
+        self._after_id = None; self.ticks += 1
+        now = self._now()
+        if not self.master.winfo_viewable(): # 最小化・非表示の間は全部止める
+            for entry in self._entries.values(): entry[2] = now + HIDDEN_POLL_MS
+            self._reschedule(); return
+        for key, entry in list(self._entries.items()):
+            if entry[2] > now: continue
+            frames = entry[0]
+            if not self.is_visible(key):
+                entry[2] = now + max(HIDDEN_POLL_MS, frames.delays[entry[1]]); continue
+            entry[1] = (entry[1] + 1) % len(frames.photos)
+            self.show_frame(key, frames.photos[entry[1]]); self.frames_shown += 1
+            entry[2] += frames.delays[entry[1]]
+            if entry[2] <= now: entry[2] = now + frames.delays[entry[1]] # 遅れたコマは飛ばす
+        self._reschedule()
+
+
+def animation_code_lines():
+    # 生成コード用: 上と同じ共有コマキャッシュと1つの時計 (App の __init__ で self._animation_clock = AnimationClock(self) を作る)
+    return [
+        "_ANIMATION_FRAMES = {} # (パス, 幅, 高さ) -> (PhotoImage のリスト, 表示時間 ms のリスト)", "",
+        "def load_animation(master, path, width, height):",
+        "    key = (path, width, height)",
+        "    if key not in _ANIMATION_FRAMES:",
+        "        photos = []; delays = []",
+        "        with Image.open(path) as image:",
+        "            for frame in ImageSequence.Iterator(image):",
+        "                photos.append(ImageTk.PhotoImage(frame.convert('RGBA').resize((width, height), Image.Resampling.LANCZOS), master=master))",
+        f"                delays.append(max({MIN_FRAME_MS}, int(frame.info.get('duration') or {DEFAULT_FRAME_MS})))",
+        "        _ANIMATION_FRAMES[key] = (photos, delays)",
+        "    return _ANIMATION_FRAMES[key]", "",
+        "class AnimationClock:",
+        "    # 全アニメーションを1つの after() で動かす。見えていないラベルはコマを進めない",
+        "    def __init__(self, root):",
+        "        self.root = root; self.entries = []; self.after_id = None",
+        "",
+        "    def add(self, label, frames):",
+        "        label.config(image=frames[0][0])",
+        "        self.entries.append([label, frames, 0, time.monotonic() * 1000 + frames[1][0]])",
+        "        self._reschedule()",
+        "",
+        "    def _reschedule(self):",
+        "        if self.after_id is not None: self.root.after_cancel(self.after_id)",
+        "        delay = min(entry[3] for entry in self.entries) - time.monotonic() * 1000",
+        "        self.after_id = self.root.after(max(1, int(delay)), self._tick)",
+        "",
+        "    def _visible(self, label):",
+        "        return (label.winfo_viewable() and label.winfo_x() < self.root.winfo_width() and label.winfo_y() < self.root.winfo_height()",
+        "                and label.winfo_x() + label.winfo_width() > 0 and label.winfo_y() + label.winfo_height() > 0)",
+        "",
+        "    def _tick(self):",
+        "        self.after_id = None; now = time.monotonic() * 1000",
+        "        for entry in self.entries:",
+        "            label, (photos, delays), index, due = entry",
+        "            if due > now: continue",
+        "            if not self._visible(label):",
+        f"                entry[3] = now + max({HIDDEN_POLL_MS}, delays[index]); continue",
+        "            index = entry[2] = (index + 1) % len(photos)",
+        "            label.config(image=photos[index])",
+        "            entry[3] = due + delays[index] if due + delays[index] > now else now + delays[index]",
+        "        self._reschedule()",
+        "",
+    ]
@@ -0,0 +1,50 @@
+import tkinter as tk
+
+from animated_image import AnimationClock, FrameCache
+from item_records import AnimatedImageItem
+from layout_diff import new_item_uid
+
+
+class AnimatedImageMixin:
+    # アニメーション画像のアイテム (animated_image.py)。コマはファイル・サイズごとに共有し、全アイテムを1つの時計で動かす
+    def _init_animations(self):
+        self.frame_cache = FrameCache()
+        self.animation_clock = AnimationClock(self, self._animation_visible, self._show_animation_frame)
+
+    def create_animated_image_item(self, path, x, y, width, height, uid=None, original_pil_image=None):
+        frames = self.frame_cache.frames(self, path, (width, height))
+        image_id = self.canvas_frame.create_image(x, y, image=frames.photos[0], anchor=tk.NW)
+        self.add_to_content_layer(image_id)
+        item = AnimatedImageItem(image_id, frames.photos[0], path, int(width), int(height), uid or new_item_uid(), frames,
+                                 original_pil_image=original_pil_image)
+        self.canvas_items.append(item)
+        self.bind_image_item_press(image_id)
+        self.animation_clock.add(item, frames)
+        return item
+
+    def _animation_visible(self, item):
+        if self.active_resize_handle and item is self.selected_item_info: return False # リサイズ中は静止画で描いている
+        if self.canvas_frame.itemcget(item.id, "state") == "hidden": return False
+        x, y = self.canvas_frame.coords(item.id)[:2]
+        return (x < self.canvas_frame.winfo_width() and y < self.canvas_frame.winfo_height()
+                and x + item.width > 0 and y + item.height > 0)
+
+    def _show_animation_frame(self, item, photo):
+        self.canvas_frame.itemconfig(item.id, image=photo); item.obj = photo
+
+    def resize_animated_item(self, item, width, height):
+        # 新しいサイズのコマに差し替える (同じファイル・サイズのアイテムがあればそのコマを使う)
+        item.frames = self.frame_cache.frames(self, item.path, (width, height))
+        self.animation_clock.set_frames(item, item.frames)
+        self._prune_animation_frames()
+
+    def stop_animations(self, items):
+        for item in items:
+            if item.animated: self.animation_clock.remove(item)
+        self._prune_animation_frames()
+
+    def _prune_animation_frames(self):
+        self.frame_cache.prune({item.frames.key for item in self.canvas_items if item.animated})
+
+    def clear_animations(self):
+        self.animation_clock.clear(); self.frame_cache.clear()
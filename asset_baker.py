@@ -0,0 +1,62 @@
+import hashlib
+import os
+
+from PIL import Image
+
+# generate_code 用: 画像アイテムを配置サイズに事前リサイズした PNG として書き出し、
+# 生成アプリ起動時のデコード・リサンプリングを無くす。
+# 同じ内容の元画像を同じサイズで使うアイテムは1つのファイルを共有する。
+
+PNG_SAVE_MODES = {"1", "L", "LA", "P", "RGB", "RGBA", "I"}
+
+
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AssetBaker:
+    def __init__(self, asset_dir):
+        self.asset_dir = asset_dir
+        self._source_digests = {} # 元画像パス -> 内容のハッシュ
+        self._baked_names = {} # (ハッシュ, 幅, 高さ) -> 書き出したファイル名
+        self.stats = {"items": 0, "written": 0, "reused": 0}
+
+    def source_digest(self, path, pil_image=None):
+        digest = self._source_digests.get(path)
+        if digest is None:
+            try:
+                digest = file_digest(path)
+            except OSError:
+                if pil_image is None: raise
+                # 元ファイルが無くなっていても、読み込み済みの画像があればその画素から識別する
+                digest = hashlib.sha1(pil_image.tobytes()).hexdigest()
+            self._source_digests[path] = digest
+        return digest
+
+    def bake(self, path, size, pil_image=None):
+        width, height = int(size[0]), int(size[1])
+        key = (self.source_digest(path, pil_image), width, height)
+        self.stats["items"] += 1
+        name = self._baked_names.get(key)
+        if name:
+            self.stats["reused"] += 1; return name
+        name = f"{key[0][:16]}_{width}x{height}.png"
+        target = os.path.join(self.asset_dir, name)
+        if os.path.exists(target):
+            # ファイル名が内容とサイズから決まるので、前回の書き出しをそのまま使える
+            self.stats["reused"] += 1
+        else:
+            os.makedirs(self.asset_dir, exist_ok=True)
+            image = pil_image if pil_image is not None else Image.open(path)
+            if image.size != (width, height):
+                image = image.resize((width, height), Image.Resampling.LANCZOS)
+            if image.mode not in PNG_SAVE_MODES:
+                image = image.convert("RGBA")
+            image.save(target, format="PNG")
+            self.stats["written"] += 1
+        self._baked_names[key] = name
+        return name
@@ -0,0 +1,276 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tkinter as tk
+import tkinter.messagebox
+from tkinter import filedialog
+from types import SimpleNamespace
+from unittest import mock
+
+from event_recorder import EventReplayer, load_recording
+from layout_generator import make_synthetic_layout, write_sample_images
+
+# 使い方:
+#   python benchmark_designer.py --sizes 10,100,1000 --output bench.json
+#   python benchmark_designer.py --compare old.json new.json
+# DISPLAY が無い環境では Xvfb を自動で起動する。
+
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+
+
+@contextlib.contextmanager
+def virtual_display(width=1600, height=1200):
+    if os.environ.get("DISPLAY"):
+        yield os.environ["DISPLAY"]; return
+    xvfb = shutil.which("Xvfb")
+    if not xvfb:
+        raise RuntimeError("DISPLAY が未設定で Xvfb も見つかりません")
+    display = f":{random.randint(100, 999)}"
+    proc = subprocess.Popen([xvfb, display, "-screen", "0", f"{width}x{height}x24", "-nolisten", "tcp"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        time.sleep(0.5)
+        if proc.poll() is not None:
+            raise RuntimeError(f"Xvfb の起動に失敗しました (display {display})")
+        os.environ["DISPLAY"] = display
+        yield display
+    finally:
+        os.environ.pop("DISPLAY", None)
+        proc.terminate(); proc.wait()
+
+
+def time_call(func, repeat, settle):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        settle()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return samples
+
+
+def summarize(samples):
+    return {"repeat": len(samples), "min_ms": round(min(samples), 3), "median_ms": round(statistics.median(samples), 3),
+            "mean_ms": round(statistics.fmean(samples), 3), "max_ms": round(max(samples), 3)}
+
+
+class DesignerDriver:
+    # 単一キャンバス版とデュアルキャンバス版の差異を吸収する
+    def __init__(self, variant):
+        self.variant = variant
+        if variant == "dual":
+            import layoutdesigner_dual_canvas as module
+        else:
+            import layoutdesigner as module
+        self.app = module.LayoutDesigner()
+        self.app.update()
+
+    @property
+    def canvas(self):
+        return self.app.active_state.canvas if self.variant == "dual" else self.app.canvas_frame
+
+    @property
+    def items(self):
+        return self.app.active_state.items if self.variant == "dual" else self.app.canvas_items
+
+    def settle(self):
+        self.app.update_idletasks()
+
+    def event(self, x, y, state=0):
+        canvas = self.canvas
+        return SimpleNamespace(x=x, y=y, x_root=canvas.winfo_rootx() + x, y_root=canvas.winfo_rooty() + y,
+                               state=state, widget=canvas)
+
+    def select(self, item_ids):
+        item_ids = list(item_ids)
+        if not item_ids: return
+        first_bbox = self.canvas.bbox(item_ids[0])
+        self.app.on_canvas_item_press(self.event(first_bbox[0] + 2, first_bbox[1] + 2), item_ids[0])
+        for item_id in item_ids[1:]:
+            bbox = self.canvas.bbox(item_id)
+            self.app.on_canvas_item_press(self.event(bbox[0] + 2, bbox[1] + 2, state=0x0001), item_id)
+
+    def drag(self, item_ids, steps):
+        # 実操作と同じく、残りを選択してから primary を Shift+クリックしてドラッグを開始する
+        primary_id, rest_ids = item_ids[0], item_ids[1:]
+        self.select(rest_ids)
+        primary_bbox = self.canvas.bbox(primary_id)
+        x0, y0 = primary_bbox[0] + 2, primary_bbox[1] + 2
+        self.app.on_canvas_item_press(self.event(x0, y0, state=0x0001 if rest_ids else 0), primary_id)
+        for step in range(1, steps + 1):
+            self.app.on_multi_item_drag(self.event(x0 + step * 3, y0 + step * 2))
+            self.settle()
+        self.app.on_multi_item_release(self.event(x0 + steps * 3, y0 + steps * 2))
+
+    def resize_image(self, item_id, steps):
+        self.select([item_id])
+        x1, y1, x2, y2 = self.canvas.bbox(item_id)
+        press = self.event(x2, y2)
+        if self.variant == "dual":
+            self.app.on_resize_handle_press(press, "se", self.app.active_state)
+        else:
+            self.app.on_resize_handle_press(press, "se")
+        for step in range(1, steps + 1):
+            self.app.on_resize_handle_drag(self.event(x2 + step * 4, y2 + step * 3))
+            self.settle()
+        self.app.on_resize_handle_release(self.event(x2 + steps * 4, y2 + steps * 3))
+
+    def draw_grid(self, spacing):
+        self.app.grid_spacing = spacing
+        if self.variant == "dual":
+            self.app.draw_grid(self.app.active_state)
+        else:
+            self.app.draw_grid()
+
+    def close_toplevels(self):
+        for child in self.app.winfo_children():
+            if isinstance(child, tk.Toplevel): child.destroy()
+
+    def destroy(self):
+        self.app.destroy()
+
+
+def run_case(variant, num_items, layout_path, save_path, args):
+    results = []
+    driver = DesignerDriver(variant)
+    app = driver.app
+    repeat = args.repeat if num_items < 10000 else 1
+
+    def record(op, samples):
+        entry = {"designer": variant, "items": num_items, "op": op}
+        entry.update(summarize(samples))
+        results.append(entry)
+        print(f"  {variant:<6} {num_items:>6} {op:<18} median {entry['median_ms']:>10.2f} ms", file=sys.stderr)
+
+    with mock.patch.object(filedialog, "askopenfilename", return_value=layout_path), \
+         mock.patch.object(filedialog, "asksaveasfilename", return_value=save_path):
+        record("open_layout", time_call(app.open_layout, repeat, driver.settle))
+        record("save_layout", time_call(app.save_layout, repeat, driver.settle))
+
+    def generate():
+        app.generate_code(); driver.close_toplevels()
+    record("generate_code", time_call(generate, repeat, driver.settle))
+
+    widget_ids = [item.id for item in driver.items if item.type == 'widget']
+    image_ids = [item.id for item in driver.items if item.type == 'image']
+    for selection_size in (1, min(len(widget_ids), args.drag_selection)):
+        if not widget_ids: break
+        ids = widget_ids[:selection_size]
+        record(f"drag_{selection_size}_items", time_call(lambda: driver.drag(ids, args.motion_steps), 1, driver.settle))
+    if image_ids:
+        record("image_resize", time_call(lambda: driver.resize_image(image_ids[0], args.motion_steps), 1, driver.settle))
+    spacings = iter([10, 20, 40] * repeat)
+    record("draw_grid", time_call(lambda: driver.draw_grid(next(spacings)), repeat, driver.settle))
+
+    events = app.perf_monitor.report()
+    driver.destroy()
+    return results, events
+
+
+def run_recording(recording_path, args):
+    # 記録した編集セッションを単一キャンバス版で再生し、イベントごとの処理時間を集計する
+    recording = load_recording(recording_path)
+    if not recording.get("layout"):
+        raise ValueError(f"{recording_path}: 記録にレイアウトファイルのパスがありません")
+    driver = DesignerDriver("single")
+    with mock.patch.object(filedialog, "askopenfilename", return_value=recording["layout"]):
+        driver.app.open_layout()
+    driver.settle()
+    samples = []
+    for _ in range(args.repeat):
+        replayer = EventReplayer(driver.app, recording)
+        samples.append(sum(t["elapsed_ms"] for t in replayer.replay()))
+    entry = {"designer": "single", "items": len(driver.items), "op": f"replay:{os.path.basename(recording_path)}",
+             "events": len(recording["events"])}
+    entry.update(summarize(samples))
+    driver.destroy()
+    return entry
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_benchmarks(args):
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    variants = [v.strip() for v in args.designers.split(",") if v.strip()]
+    report = {"meta": {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "git_revision": git_revision(),
+                       "python": platform.python_version(), "platform": platform.platform(),
+                       "tk_version": tk.TkVersion, "seed": args.seed, "repeat": args.repeat,
+                       "motion_steps": args.motion_steps},
+              "results": [], "event_stats": {}}
+    work_dir = tempfile.mkdtemp(prefix="layout_bench_")
+    try:
+        image_paths = write_sample_images(work_dir)
+        with virtual_display(), mock.patch.object(tkinter.messagebox, "showerror"), \
+             mock.patch.object(tkinter.messagebox, "showwarning"):
+            for num_items in sizes:
+                layout_path = os.path.join(work_dir, f"layout_{num_items}.json")
+                with open(layout_path, "w", encoding="utf-8") as f:
+                    json.dump(make_synthetic_layout(num_items, image_paths, seed=args.seed), f)
+                save_path = os.path.join(work_dir, f"saved_{num_items}.json")
+                for variant in variants:
+                    # ハンドラ内のデバッグ出力で計測が端末速度に左右されないようにする
+                    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                        results, events = run_case(variant, num_items, layout_path, save_path, args)
+                    report["results"].extend(results)
+                    report["event_stats"][f"{variant}/{num_items}"] = events
+            for recording_path in args.recording or []:
+                with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                    report["results"].append(run_recording(recording_path, args))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return report
+
+
+def compare_reports(base_path, new_path):
+    with open(base_path, encoding="utf-8") as f: base = json.load(f)
+    with open(new_path, encoding="utf-8") as f: new = json.load(f)
+    key = lambda r: (r["designer"], r["items"], r["op"])
+    base_map = {key(r): r for r in base["results"]}
+    print(f"{'designer':<8}{'items':>7}  {'op':<18}{'base ms':>11}{'new ms':>11}{'ratio':>8}")
+    for r in new["results"]:
+        b = base_map.get(key(r))
+        if not b: continue
+        ratio = r["median_ms"] / b["median_ms"] if b["median_ms"] else float("inf")
+        print(f"{r['designer']:<8}{r['items']:>7}  {r['op']:<18}{b['median_ms']:>11.2f}{r['median_ms']:>11.2f}{ratio:>8.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LayoutDesigner のホットパスを計測するベンチマーク")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES))
+    parser.add_argument("--designers", default="single,dual", help="single, dual のカンマ区切り")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--motion-steps", type=int, default=30)
+    parser.add_argument("--drag-selection", type=int, default=100, help="複数ドラッグ時の最大選択数")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--recording", action="append", help="再生する操作記録 JSON (複数指定可)")
+    parser.add_argument("--output", help="結果 JSON の出力先 (省略時は標準出力)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="2つの結果 JSON を比較する")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare_reports(*args.compare); return
+    report = run_benchmarks(args)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f: f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
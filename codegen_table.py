@@ -0,0 +1,203 @@
+# generate_code の「テーブル形式」出力。
+# ウィジェットごとにコンストラクタや .place の行を書く代わりに、
+# (クラス, オプション, テキスト, x, y, 追加情報) のタプル表と、それを生成する短いループを出力する。
+# フォント・色・オプションの組は表の中で一度だけ定義し、番号で参照する。
+# 遅延生成モードでは、初期ウィンドウに掛かる行だけを起動時に作り、残りは after_idle のバッチで作る。
+# 行は重なり順の番号を持ち、後から作ったウィジェットも作成済みのウィジェットの間の正しい位置に入れる。
+
+IMAGE_ROW = -1
+ANIMATION_ROW = -2
+LAZY_BATCH_SIZE = 200
+DEFERRED_BUCKET = 256 # ウィンドウを広げたときに調べる後回しの行のバケット (px)
+COLOR_OPTIONS = {"fg", "foreground", "bg", "background"}
+
+
+def _tuple_lines(name, exprs):
+    return [f"{name} = ("] + [f"    {expr}," for expr in exprs] + [")"]
+
+
+class TableCodeBuilder:
+    def __init__(self):
+        self._tables = {name: ([], {}) for name in ("classes", "fonts", "colors", "options", "images")}
+        self.rows = []
+        self.row_sizes = []
+        self.has_animations = False
+
+    def _intern(self, table_name, value):
+        values, index = self._tables[table_name]
+        position = index.get(value)
+        if position is None:
+            position = index[value] = len(values)
+            values.append(value)
+        return position
+
+    def add_widget(self, module_name, class_name, options, text, x, y, values=None, size=(0, 0)):
+        class_index = self._intern("classes", f"{module_name}.{class_name}")
+        encoded = []
+        for name, value in options.items():
+            if name == "font" and not isinstance(value, str): encoded.append((name, "FONTS", self._intern("fonts", tuple(value))))
+            elif name in COLOR_OPTIONS: encoded.append((name, "COLORS", self._intern("colors", value)))
+            else: encoded.append((name, None, value))
+        option_index = self._intern("options", tuple(encoded))
+        self.rows.append((class_index, option_index, text, x, y, tuple(values) if values is not None else None))
+        self.row_sizes.append((int(size[0]), int(size[1])))
+
+    def add_image(self, source, width, height, x, y):
+        image_index = self._intern("images", (source, int(width), int(height)))
+        self.rows.append((IMAGE_ROW, image_index, None, x, y, None))
+        self.row_sizes.append((int(width), int(height)))
+
+    def add_animation(self, path, width, height, x, y):
+        # コマは生成コードの load_animation で読み、1つの AnimationClock で動かす (animated_image.animation_code_lines)
+        image_index = self._intern("images", (path, int(width), int(height)))
+        self.rows.append((ANIMATION_ROW, image_index, None, x, y, None))
+        self.row_sizes.append((int(width), int(height)))
+        self.has_animations = True
+
+    @staticmethod
+    def _option_set_expr(encoded):
+        parts = []
+        for name, table_name, value in encoded:
+            parts.append(f"{name!r}: {table_name}[{value}]" if table_name else f"{name!r}: {value!r}")
+        return "{" + ", ".join(parts) + "}"
+
+    def split_rows_for_viewport(self, viewport_width, viewport_height):
+        # 初期ウィンドウに掛かる行 (末尾に重なり順) と、後から作る行 (右端・下端・重なり順を付けて、上から近い順) に分ける
+        initial, deferred = [], []
+        for z, (row, (width, height)) in enumerate(zip(self.rows, self.row_sizes)):
+            x, y = row[3], row[4]
+            if x < viewport_width and y < viewport_height and x + width > 0 and y + height > 0:
+                initial.append(row + (z,))
+            else:
+                deferred.append(row + (x + width, y + height, z))
+        deferred.sort(key=lambda row: (row[4], row[3]))
+        return initial, deferred
+
+    def table_lines(self, lazy_viewport=None):
+        tables = {name: values for name, (values, _) in self._tables.items()}
+        lines = [f"IMAGE_ROW = {IMAGE_ROW}"]
+        if self.has_animations: lines.append(f"ANIMATION_ROW = {ANIMATION_ROW}")
+        lines += _tuple_lines("CLASSES", tables["classes"])
+        lines += _tuple_lines("FONTS", [repr(font) for font in tables["fonts"]])
+        lines += _tuple_lines("COLORS", [repr(color) for color in tables["colors"]])
+        lines += _tuple_lines("OPTIONS", [self._option_set_expr(encoded) for encoded in tables["options"]])
+        lines += _tuple_lines("IMAGES", [repr(image) for image in tables["images"]])
+        lines += ["# (クラス番号 または IMAGE_ROW, オプション番号 または 画像番号, テキスト, x, y, 追加情報)"]
+        if lazy_viewport is None:
+            lines += _tuple_lines("ITEMS", [repr(row) for row in self.rows])
+            return lines
+        initial, deferred = self.split_rows_for_viewport(*lazy_viewport)
+        lines += [f"DEFERRED_BUCKET = {DEFERRED_BUCKET}"]
+        lines += ["# 初期ウィンドウに掛かる行 (末尾に重なり順)"]
+        lines += _tuple_lines("ITEMS", [repr(row) for row in initial])
+        lines += ["# 初期ウィンドウ外の行 (末尾に右端・下端・重なり順)。起動後に after_idle のバッチで作る"]
+        lines += _tuple_lines("DEFERRED_ITEMS", [repr(row) for row in deferred])
+        return lines
+
+    def app_lines(self, geometry, image_load_expr, lazy=False, setup_lines=()):
+        # image_load_expr は source, width, height を参照して PhotoImage を返す式。setup_lines はウィジェットを作る前に実行する行
+        lines = [
+            "class App(tk.Tk):", "    def __init__(self):",
+            "        super().__init__()", "        self.title('Generated Layout')",
+            f"        self.geometry('{geometry}')\n",
+            *setup_lines,
+            *(["        self._animation_clock = AnimationClock(self)"] if self.has_animations else []),
+            "        self._image_references_generated_app = {}",
+        ]
+        if not lazy: lines.append("        self.items = [self._create_item(*row) for row in ITEMS]\n")
+        if lazy:
+            lines += [
+                "        self.items = []; self._stacked_z = []; self._stacked_widgets = []",
+                "        for row in ITEMS: self._add_item(row)",
+                "        self._deferred_items = list(DEFERRED_ITEMS); self._deferred_position = 0",
+                "        # ウィンドウを広げたときは新しく見えるバケットの行だけを調べる",
+                "        self._deferred_buckets = {}; self._exposed_size = (0, 0)",
+                "        for index, row in enumerate(self._deferred_items):",
+                "            cell = (int(max(0, row[3]) // DEFERRED_BUCKET), int(max(0, row[4]) // DEFERRED_BUCKET))",
+                "            self._deferred_buckets.setdefault(cell, []).append(index)",
+                "        self.after_idle(self._on_first_paint)\n",
+                "    def _add_item(self, row):",
+                "        # 行の末尾は重なり順。後から作ったウィジェットも、重なり順で1つ上の作成済みウィジェットのすぐ下に入れる",
+                "        widget = self._create_item(*row[:6])",
+                "        if widget is None: return",
+                "        self.items.append(widget)",
+                "        position = bisect.bisect(self._stacked_z, row[-1])",
+                "        if position < len(self._stacked_widgets): widget.lower(self._stacked_widgets[position])",
+                "        self._stacked_z.insert(position, row[-1]); self._stacked_widgets.insert(position, widget)\n",
+                "    def _on_first_paint(self):",
+                "        self.update_idletasks()",
+                "        self.time_to_first_paint_ms = (time.perf_counter() - _START_TIME) * 1000",
+                "        if REPORT_STARTUP_TIME: print(f'first paint: {self.time_to_first_paint_ms:.1f} ms ({len(self.items)} items)')",
+                "        self.bind('<Configure>', self._on_window_configure, add='+')",
+                "        self.after_idle(self._build_deferred_batch)\n",
+                "    def _build_deferred_batch(self):",
+                "        end = min(self._deferred_position + LAZY_BATCH_SIZE, len(self._deferred_items))",
+                "        for row in self._deferred_items[self._deferred_position:end]:",
+                "            if row is not None: self._add_item(row)",
+                "        self._deferred_position = end",
+                "        if end < len(self._deferred_items):",
+                "            self.after_idle(self._build_deferred_batch); return",
+                "        self._deferred_items = []; self._deferred_position = 0; self._deferred_buckets = {}",
+                "        self.time_to_all_items_ms = (time.perf_counter() - _START_TIME) * 1000",
+                "        if REPORT_STARTUP_TIME: print(f'all items: {self.time_to_all_items_ms:.1f} ms ({len(self.items)} items)')\n",
+                "    def _on_window_configure(self, event):",
+                "        # ウィンドウが広げられたら、前に見えていた範囲の外のバケットだけを調べて、見えた行をバッチを待たずに作る",
+                "        if event.widget is not self or not self._deferred_items: return",
+                "        width, height = self.winfo_width(), self.winfo_height()",
+                "        seen_width, seen_height = self._exposed_size",
+                "        if width <= seen_width and height <= seen_height: return",
+                "        self._exposed_size = (max(width, seen_width), max(height, seen_height))",
+                "        exposed = []",
+                "        for cell_y in range((height - 1) // DEFERRED_BUCKET + 1):",
+                "            for cell_x in range((width - 1) // DEFERRED_BUCKET + 1):",
+                "                if (cell_x + 1) * DEFERRED_BUCKET <= seen_width and (cell_y + 1) * DEFERRED_BUCKET <= seen_height: continue",
+                "                indices = self._deferred_buckets.get((cell_x, cell_y))",
+                "                if not indices: continue",
+                "                remaining = []",
+                "                for index in indices:",
+                "                    row = self._deferred_items[index]",
+                "                    if row is None: continue",
+                "                    if row[3] < width and row[4] < height: exposed.append(index)",
+                "                    else: remaining.append(index)",
+                "                self._deferred_buckets[(cell_x, cell_y)] = remaining",
+                "        for index in sorted(exposed, key=lambda index: self._deferred_items[index][-1]): # 重なり順に作る",
+                "            self._add_item(self._deferred_items[index]); self._deferred_items[index] = None\n",
+            ]
+        return lines + [
+            "    def _image(self, index):",
+            "        photo = self._image_references_generated_app.get(index)",
+            "        if photo is None:",
+            "            source, width, height = IMAGES[index]",
+            "            try:",
+            f"                photo = {image_load_expr}",
+            "            except Exception as e:",
+            "                print(f'Error loading image {e} for {source}'); return None",
+            "            self._image_references_generated_app[index] = photo",
+            "        return photo\n",
+            "    def _create_item(self, class_index, option_index, text, x, y, extra):",
+            "        if class_index == IMAGE_ROW:",
+            "            photo = self._image(option_index)",
+            "            if photo is None: return None",
+            "            widget = tk.Label(self, image=photo, borderwidth=0)",
+            "            widget.place(x=x, y=y)",
+            "            return widget",
+            *([
+                "        if class_index == ANIMATION_ROW:",
+                "            widget = tk.Label(self, borderwidth=0)",
+                "            try: self._animation_clock.add(widget, load_animation(self, *IMAGES[option_index]))",
+                "            except Exception as e:",
+                "                print(f'Error loading animation {e} for {IMAGES[option_index][0]}'); widget.destroy(); return None",
+                "            widget.place(x=x, y=y)",
+                "            return widget",
+            ] if self.has_animations else []),
+            "        cls = CLASSES[class_index]; options = dict(OPTIONS[option_index])",
+            "        if cls is ttk.Combobox: options['values'] = extra",
+            "        elif cls is not ttk.Entry: options['text'] = text",
+            "        widget = cls(self, **options)",
+            "        if cls is ttk.Entry and text: widget.insert(0, text)",
+            "        elif cls is ttk.Combobox and text:",
+            "            if text in extra: widget.set(text)",
+            "            elif extra: widget.current(0)",
+            "        widget.place(x=x, y=y)",
+            "        return widget",
+        ]
@@ -0,0 +1,241 @@
+import tkinter as tk
+from tkinter import ttk
+import tkinter.messagebox
+from tkinter import simpledialog
+
+from components import (make_definition, member_from_item, instance_origin, member_overrides, resolve_members,
+                        instance_bounds, member_codegen_spec, COMPONENT_ITEM_TYPE)
+from layout_diff import new_item_uid
+
+# 部品 (シンボル) の作成・配置・定義の更新。
+# メンバーのアイテムは item_info に 'component' (インスタンスの uid) と 'member' (定義内の番号) を持つだけで、
+# 定義と違う値 (上書き) は保存時・更新時にウィジェットの現在の値と定義を比べて求める。
+
+
+class ComponentMixin:
+    def _init_components(self):
+        self.component_definitions = {} # 定義ID -> {"name", "members"}
+        self.component_instances = {} # インスタンスの uid -> 定義ID
+
+    def _component_members(self, instance_uid):
+        return {item.member: item for item in self.canvas_items if item.component == instance_uid}
+
+    def _instance_state(self, instance_uid):
+        # (定義, 原点, {メンバー番号: 相対位置のメンバー}, {メンバー番号: item_info})
+        definition = self.component_definitions[self.component_instances[instance_uid]]
+        member_items = self._component_members(instance_uid)
+        serialized = {index: self._serialize_item(item) for index, item in member_items.items()}
+        serialized = {index: data for index, data in serialized.items() if data is not None}
+        if not serialized: return definition, None, {}, member_items
+        origin = instance_origin(definition, {index: (data['x'], data['y']) for index, data in serialized.items()})
+        return definition, origin, {index: member_from_item(data, origin) for index, data in serialized.items()}, member_items
+
+    def _component_layout_entry(self, instance_uid):
+        definition, origin, members, member_items = self._instance_state(instance_uid)
+        if origin is None: return None
+        overrides = member_overrides(definition, members)
+        x, y, width, height = instance_bounds(definition, overrides, origin)
+        member_uids = [None] * len(definition['members'])
+        for index, item in member_items.items(): member_uids[index] = item.uid
+        return {"uid": instance_uid, "type": COMPONENT_ITEM_TYPE, "component": self.component_instances[instance_uid],
+                "x": origin[0], "y": origin[1], "width": width, "height": height,
+                "member_uids": member_uids, "overrides": overrides}
+
+    def _selected_instance_uid(self):
+        # 選択中のアイテムが全て同じインスタンスのメンバーならその uid
+        instance_uids = {item.component for item in self.canvas_items if item.id in self.selected_item_ids}
+        if len(instance_uids) != 1: return None
+        return next(iter(instance_uids))
+
+    def create_component_from_selection(self):
+        selected = [item for item in self.canvas_items_in_z_order() if item.id in self.selected_item_ids]
+        if not selected: return
+        if any(item.type != 'widget' for item in selected):
+            tkinter.messagebox.showwarning("部品の作成", "部品にできるのはウィジェットだけです (画像は含められません)。"); return
+        if any(item.component for item in selected):
+            tkinter.messagebox.showwarning("部品の作成", "既に部品のメンバーになっているアイテムが含まれています。先に部品を解除してください。"); return
+        name = simpledialog.askstring("部品の作成", "部品の名前:", initialvalue=f"部品{len(self.component_definitions) + 1}", parent=self)
+        if not name: return
+        items_data = [self._serialize_item(item) for item in selected]
+        pairs = [(item, data) for item, data in zip(selected, items_data) if data is not None]
+        definition, _ = make_definition(name, [data for _, data in pairs])
+        definition_id = new_item_uid()
+        self.component_definitions[definition_id] = definition
+        # 選択していたアイテムはそのまま最初のインスタンスにする
+        instance_uid = new_item_uid()
+        self.component_instances[instance_uid] = definition_id
+        for index, (item, _) in enumerate(pairs):
+            item.component = instance_uid; item.member = index
+        def restore():
+            for item, _ in pairs: item.component = item.member = None
+            self.component_instances.pop(instance_uid, None); self.component_definitions.pop(definition_id, None)
+        self.push_undo_entry(f"部品の作成 ({name})", restore, item_ids=())
+
+    def place_component(self, definition_id, x=None, y=None, instance_uid=None, overrides=None, member_uids=None):
+        # 定義からメンバーのウィジェットを作って (x, y) に置く。戻り値はインスタンスの uid
+        definition = self.component_definitions[definition_id]
+        if x is None or y is None:
+            x, y = self._snap_to_grid(self.canvas_frame.winfo_width() / 3, self.canvas_frame.winfo_height() / 3)
+        instance_uid = instance_uid or new_item_uid()
+        self.component_instances[instance_uid] = definition_id
+        for index, member in resolve_members(definition, overrides):
+            class_name = member.get('widget_class_name', '')
+            canvas_id = self.add_widget(widget_type=class_name.replace('T', '').lower(), text=member.get('text'),
+                                        x=x + member['dx'], y=y + member['dy'], values=member.get('values'),
+                                        font_info=member.get('font'), colors=member.get('colors'),
+                                        width=member.get('width'), height=member.get('height'), anchor=member.get('anchor', 'center'),
+                                        style=member.get('style'),
+                                        uid=member_uids[index] if member_uids and index < len(member_uids) else None)
+            if canvas_id is None: continue
+            item = next(item for item in reversed(self.canvas_items) if item.id == canvas_id)
+            item.component = instance_uid; item.member = index
+        return instance_uid
+
+    def place_component_interactive(self, definition_id):
+        instance_uid = self.place_component(definition_id)
+        placed_ids = [item.id for item in self.canvas_items if item.component == instance_uid]
+        def restore():
+            self.forget_group_items(placed_ids)
+            self.destroy_canvas_items([item for item in self.canvas_items if item.id in placed_ids])
+            self.canvas_items[:] = [item for item in self.canvas_items if item.id not in placed_ids]
+            self.component_instances.pop(instance_uid, None)
+            self.invalidate_smart_guides(placed_ids)
+            self.deselect_all()
+        self.push_undo_entry("部品の配置", restore, item_ids=placed_ids)
+        self.invalidate_smart_guides(placed_ids)
+        self.selected_item_ids.clear(); self.selected_item_ids.update(placed_ids)
+        self.update_property_editor_for_selection(); self.update_highlight()
+
+    def _apply_member_spec(self, item, member):
+        # ウィジェットを作り直さずに、メンバーの値 (テキスト・フォント・色・大きさ) をその場で反映する
+        widget = item.obj
+        text = member.get('text') or ""
+        if isinstance(widget, ttk.Combobox):
+            if member.get('values') is not None: widget['values'] = member['values']
+            widget.set(text)
+        elif isinstance(widget, ttk.Entry):
+            widget.delete(0, tk.END); widget.insert(0, text)
+        else: widget.config(text=text)
+        if member.get('style') in self.palette:
+            # スタイルを使うメンバーは個別のフォント・色ではなくスタイルを参照させる
+            self._apply_style_to_widgets(member['style'], [item]); font = None
+        else:
+            if item.style: self.detach_widget_styles({item.id})
+            font = member.get('font')
+        if font:
+            styles = [style for style, on in (("bold", font.get('weight') == 'bold'), ("italic", font.get('slant') == 'italic')) if on]
+            widget.config(font=(font.get('family'), font.get('size'), " ".join(styles)))
+        if member.get('anchor') and 'anchor' in widget.keys(): widget.config(anchor=member['anchor'])
+        colors = (member.get('colors') or {}) if not item.style else {}
+        if 'fg' in colors:
+            widget.config(**{'foreground' if isinstance(widget, (ttk.Label, ttk.Entry, ttk.Combobox)) else 'fg': colors['fg']})
+        if 'bg' in colors and isinstance(widget, (tk.Button, tk.Checkbutton, tk.Radiobutton)): widget.config(bg=colors['bg'])
+        if member.get('width') and member.get('height'):
+            self.canvas_frame.itemconfig(item.id, width=int(member['width']), height=int(member['height']))
+            item.width, item.height = member['width'], member['height']
+
+    def _apply_instance_members(self, origin, member_items, members):
+        # 値を反映してから、位置の変更を1回の Tcl 呼び出しでまとめて移動する
+        for index, member in members.items():
+            if index in member_items: self._apply_member_spec(member_items[index], member)
+        self.update_idletasks()
+        ids = [member_items[index].id for index in members if index in member_items]
+        current = dict(self._bboxes_for_ids(ids))
+        moves = []
+        for index, member in members.items():
+            item = member_items.get(index)
+            if item is None or item.id not in current: continue
+            bbox = current[item.id]
+            moves.append((item.id, int(origin[0] + member['dx'] - bbox[0]), int(origin[1] + member['dy'] - bbox[1])))
+        self._move_items_batched(moves)
+
+    def update_component_definition(self):
+        # 選択中のインスタンスの今の状態を定義にして、他のインスタンスへ上書きを保ったまま一括で反映する
+        instance_uid = self._selected_instance_uid()
+        if instance_uid is None:
+            tkinter.messagebox.showinfo("部品の定義を更新", "1つの部品のメンバーを選択してください。"); return
+        definition_id = self.component_instances[instance_uid]
+        old_definition = self.component_definitions[definition_id]
+        _, _, source_members, _ = self._instance_state(instance_uid)
+        new_definition = {"name": old_definition['name'],
+                          "members": [source_members.get(index, member) for index, member in enumerate(old_definition['members'])]}
+
+        pending = []
+        for other_uid, other_definition_id in self.component_instances.items():
+            if other_definition_id != definition_id or other_uid == instance_uid: continue
+            _, origin, members, member_items = self._instance_state(other_uid)
+            if origin is None: continue
+            overrides = member_overrides(old_definition, members)
+            targets = dict(resolve_members(new_definition, overrides))
+            if targets != members: pending.append((origin, member_items, members, targets))
+        self.component_definitions[definition_id] = new_definition
+        for origin, member_items, _, targets in pending: self._apply_instance_members(origin, member_items, targets)
+
+        def restore():
+            self.component_definitions[definition_id] = old_definition
+            for origin, member_items, members, _ in pending:
+                live = {index: item for index, item in member_items.items() if item in self.canvas_items}
+                self._apply_instance_members(origin, live, members)
+            self.invalidate_smart_guides(changed_ids); self.update_highlight()
+        changed_ids = [item.id for _, member_items, _, _ in pending for item in member_items.values()]
+        self.push_undo_entry(f"部品の定義を更新 ({new_definition['name']})", restore, item_ids=changed_ids)
+        self.invalidate_group_bounds(changed_ids)
+        self.invalidate_smart_guides(changed_ids); self.update_highlight()
+
+    def detach_component(self):
+        instance_uid = self._selected_instance_uid()
+        if instance_uid is None: return
+        member_items = self._component_members(instance_uid)
+        definition_id = self.component_instances.pop(instance_uid)
+        for item in member_items.values(): item.component = item.member = None
+        def restore():
+            self.component_instances[instance_uid] = definition_id
+            for index, item in member_items.items(): item.component = instance_uid; item.member = index
+        self.push_undo_entry("部品の解除", restore, item_ids=())
+
+    def _component_codegen_blocks(self):
+        # 生成コード用: ({定義ID: {"const", "name", "members", "instances"}}, {インスタンスの uid: (定数名, インスタンス番号)})
+        # _create_component はメンバーを番号順に続けて作るので、キャンバスの重なり順でメンバーが連続し番号順に並んでいる
+        # インスタンスだけを対象にする (間に他のアイテムが挟まっているものは通常のウィジェットとして書き出す)
+        z_positions = {item.id: z for z, item in enumerate(self.canvas_items_in_z_order())}
+        blocks = {}; instance_uids = {}
+        for instance_uid, definition_id in self.component_instances.items():
+            definition, origin, members, member_items = self._instance_state(instance_uid)
+            if origin is None: continue
+            stacked = sorted((z_positions[item.id], index) for index, item in member_items.items())
+            if stacked[-1][0] - stacked[0][0] + 1 != len(stacked) or [index for _, index in stacked] != sorted(member_items): continue
+            block = blocks.get(definition_id)
+            if block is None:
+                block = blocks[definition_id] = {
+                    "const": f"COMPONENT_{len(blocks) + 1}", "name": definition['name'], "instances": [],
+                    "members": [(module_name, class_name, options, text, member['dx'], member['dy'], values)
+                                for member in definition['members']
+                                for module_name, class_name, options, text, values in (member_codegen_spec(member, self.palette),)]}
+            overrides = {}
+            for index, (_, _, options, text, dx, dy, values) in enumerate(block['members']):
+                if index not in members or index not in member_items:
+                    overrides[index] = None; continue
+                _, _, live_options, live_text, live_values = self._widget_codegen_spec(member_items[index])
+                live = {'options': live_options, 'text': live_text, 'values': live_values, 'dx': members[index]['dx'], 'dy': members[index]['dy']}
+                base = {'options': options, 'text': text, 'values': values, 'dx': dx, 'dy': dy}
+                changed = {name: value for name, value in live.items() if value != base[name]}
+                if changed: overrides[index] = changed
+            instance_uids[instance_uid] = (block['const'], len(block['instances']))
+            block['instances'].append((int(origin[0]), int(origin[1]), overrides))
+        return blocks, instance_uids
+
+    def _build_component_menu(self, parent_menu):
+        component_menu = tk.Menu(parent_menu, tearoff=0); parent_menu.add_cascade(label="部品", menu=component_menu)
+        component_menu.add_command(label="選択範囲から部品を作成...", command=self.create_component_from_selection)
+        self._place_component_menu = tk.Menu(component_menu, tearoff=0, postcommand=self._refresh_place_component_menu)
+        component_menu.add_cascade(label="部品を配置", menu=self._place_component_menu)
+        component_menu.add_separator()
+        component_menu.add_command(label="選択中の部品から定義を更新", command=self.update_component_definition)
+        component_menu.add_command(label="部品を解除", command=self.detach_component)
+
+    def _refresh_place_component_menu(self):
+        self._place_component_menu.delete(0, tk.END)
+        if not self.component_definitions:
+            self._place_component_menu.add_command(label="(部品がありません)", state="disabled"); return
+        for definition_id, definition in self.component_definitions.items():
+            self._place_component_menu.add_command(label=definition['name'], command=lambda d=definition_id: self.place_component_interactive(d))
@@ -0,0 +1,139 @@
+import copy
+
+from style_palette import styled_widget_options
+
+# 再利用できる部品 (シンボル)。
+# 定義はメンバー (save_layout と同じ形式のアイテムから x, y を左上からの相対位置 dx, dy に置き換えたもの) のリスト。
+# 配置したもの (インスタンス) は定義への参照と、定義と違う値 (上書き) だけを持つ。
+# レイアウト JSON では "components" に定義を1回だけ書き、items には次の形で置く:
+#   {"uid", "type": "component", "component": 定義ID, "x", "y", "width", "height", "z",
+#    "member_uids": [...], "overrides": {"メンバー番号": {フィールド: 値} または {"removed": true}}}
+
+COMPONENT_ITEM_TYPE = "component"
+MEMBER_FIELDS_IGNORED = {"uid", "z", "x", "y", "id_on_canvas"}
+
+
+def member_from_item(item_data, origin):
+    member = {name: value for name, value in item_data.items() if name not in MEMBER_FIELDS_IGNORED}
+    member["dx"] = item_data["x"] - origin[0]; member["dy"] = item_data["y"] - origin[1]
+    return member
+
+
+def make_definition(name, items_data):
+    # 戻り値: (定義, 左上の座標)
+    origin = (min(item["x"] for item in items_data), min(item["y"] for item in items_data))
+    return {"name": name, "members": [member_from_item(item, origin) for item in items_data]}, origin
+
+
+def instance_origin(definition, positions):
+    # positions: {メンバー番号: (x, y)}。残っている一番若いメンバーの位置から逆算する
+    index = min(positions)
+    member = definition["members"][index]
+    return positions[index][0] - member["dx"], positions[index][1] - member["dy"]
+
+
+def member_overrides(definition, members):
+    # members: {メンバー番号: 相対位置のメンバー}。定義と違うフィールドだけを返す
+    overrides = {}
+    for index, base in enumerate(definition["members"]):
+        member = members.get(index)
+        if member is None:
+            overrides[str(index)] = {"removed": True}; continue
+        changed = {name: member.get(name) for name in base.keys() | member.keys() if member.get(name) != base.get(name)}
+        if changed: overrides[str(index)] = changed
+    return overrides
+
+
+def resolve_members(definition, overrides):
+    # [(メンバー番号, 上書きを適用したメンバー), ...] (削除されたメンバーは除く)
+    resolved = []
+    for index, base in enumerate(definition["members"]):
+        override = (overrides or {}).get(str(index), {})
+        if override.get("removed"): continue
+        resolved.append((index, dict(copy.deepcopy(base), **override)))
+    return resolved
+
+
+def instance_bounds(definition, overrides, origin):
+    members = [member for _, member in resolve_members(definition, overrides)]
+    if not members: return origin[0], origin[1], 0, 0
+    x1 = min(member["dx"] for member in members); y1 = min(member["dy"] for member in members)
+    x2 = max(member["dx"] + (member.get("width") or 0) for member in members)
+    y2 = max(member["dy"] + (member.get("height") or 0) for member in members)
+    return origin[0] + x1, origin[1] + y1, x2 - x1, y2 - y1
+
+
+def expand_layout_components(layout_data):
+    # 部品のインスタンスを通常のアイテムに展開したレイアウト (検査など、アイテム単位で見たいとき用)
+    definitions = layout_data.get("components", {})
+    items = []
+    for info in sorted(layout_data.get("items", []), key=lambda info: info.get("z", 0)):
+        definition = definitions.get(info.get("component")) if info.get("type") == COMPONENT_ITEM_TYPE else None
+        if definition is None:
+            if info.get("type") != COMPONENT_ITEM_TYPE: items.append(dict(info))
+            continue
+        member_uids = info.get("member_uids", [])
+        for index, member in resolve_members(definition, info.get("overrides")):
+            item = {name: value for name, value in member.items() if name not in ("dx", "dy")}
+            item["x"] = info["x"] + member["dx"]; item["y"] = info["y"] + member["dy"]
+            if index < len(member_uids): item["uid"] = member_uids[index]
+            items.append(item)
+    for z_index, item in enumerate(items): item["z"] = z_index
+    expanded = {name: value for name, value in layout_data.items() if name not in ("items", "components")}
+    expanded["items"] = items
+    return expanded
+
+
+def member_codegen_spec(member, palette=None):
+    # 生成コード用の (モジュール, クラス, オプション, テキスト, values)。LayoutDesigner._widget_codegen_spec と同じ規則
+    class_name = member.get("widget_class_name", "")
+    module_name = "ttk" if class_name.startswith("T") else "tk"
+    options = {}
+    style = member.get("style") if member.get("style") in (palette or {}) else None
+    font = member.get("font") if not style else None
+    if font:
+        styles = [style for style, on in (("bold", font.get("weight") == "bold"), ("italic", font.get("slant") == "italic")) if on]
+        options["font"] = (font.get("family"), abs(font.get("size", 0)), " ".join(styles))
+    anchor = member.get("anchor")
+    if anchor and anchor != "center": options["anchor"] = anchor
+    colors = member.get("colors", {}) if not style else {}
+    if style: options.update(styled_widget_options(style, palette[style], class_name))
+    if "fg" in colors: options["foreground" if class_name in ("TLabel", "TEntry", "TCombobox") else "fg"] = colors["fg"]
+    if "bg" in colors and class_name in ("Button", "Checkbutton", "Radiobutton"): options["background"] = colors["bg"]
+    values = member.get("values") if class_name == "TCombobox" else None
+    return module_name, class_name[1:] if module_name == "ttk" else class_name, options, member.get("text", ""), values
+
+
+def component_code_lines(const_name, name, members, instances):
+    # members: [(モジュール, クラス, オプション, テキスト, dx, dy, values), ...]
+    # instances: [(x, y, {メンバー番号: 上書き (None なら置かない)}), ...]
+    lines = [f"{const_name} = [ # {name}"]
+    lines += [f"    {member!r}," for member in members]
+    lines += ["]", f"{const_name}_INSTANCES = ["]
+    lines += [f"    {instance!r}," for instance in instances]
+    lines += ["]", ""]
+    return lines
+
+
+def component_app_method_lines():
+    return [
+        "    def _create_component(self, members, x, y, overrides):",
+        "        # 部品の定義 (members) を (x, y) に置く。overrides: {メンバー番号: 上書きする値 (None なら置かない)}",
+        "        for index, member in enumerate(members):",
+        "            member_override = overrides.get(index, {})",
+        "            if member_override is None: continue",
+        "            module_name, class_name, options, text, dx, dy, values = member",
+        "            options = member_override.get('options', options); text = member_override.get('text', text)",
+        "            values = member_override.get('values', values)",
+        "            dx, dy = member_override.get('dx', dx), member_override.get('dy', dy)",
+        "            widget_class = getattr(ttk if module_name == 'ttk' else tk, class_name)",
+        "            if class_name == 'Entry':",
+        "                widget = widget_class(self, **options)",
+        "                if text: widget.insert(0, text)",
+        "            elif class_name == 'Combobox':",
+        "                widget = widget_class(self, values=values or [], **options)",
+        "                if text: widget.set(text)",
+        "            else: widget = widget_class(self, text=text, **options)",
+        "            widget.place(x=x + dx, y=y + dy)",
+        "            self._component_widgets.append(widget)",
+    ]
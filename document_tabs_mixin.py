@@ -0,0 +1,143 @@
+import os
+import tkinter as tk
+from tkinter import ttk
+import tkinter.messagebox
+
+from perf_monitor import perf_timed
+from layout_diff import diff_layouts
+
+UNTITLED_DOCUMENT_TITLE = "無題"
+
+
+class DocumentTabsMixin:
+    # 複数のレイアウトをタブで開いておく。キャンバスに載っているのは選択中のタブだけで、
+    # 他のタブは save_layout 形式の辞書 (Tk のウィジェットや PhotoImage を持たない) にして持ち、選ばれたときに読み込み直す
+    def _init_document_tabs(self):
+        # model: 非表示のタブの内容 (表示中のタブは None)。saved: 最後に開いた/保存した時点の内容 (閉じるときの未保存の確認に使う)
+        self.documents = [{"path": None, "model": None, "saved": None}]
+        self.active_document = 0
+        self._ignore_tab_change = False
+
+    def _build_document_tabs(self):
+        self.document_notebook = ttk.Notebook(self)
+        self.document_notebook.pack(side="top", fill="x", padx=5, pady=(5, 0))
+        self.document_notebook.add(ttk.Frame(self.document_notebook, height=0), text=UNTITLED_DOCUMENT_TITLE)
+        self.document_notebook.bind("<<NotebookTabChanged>>", self._on_document_tab_changed)
+        self.bind("<Control-t>", lambda e: self.new_document())
+        self.bind("<Control-w>", lambda e: self.close_document())
+
+    def _document_title(self, document):
+        title = os.path.basename(document["path"]) if document["path"] else UNTITLED_DOCUMENT_TITLE
+        if document["model"] is not None:
+            title += f" ({len(document['model'].get('items', []))})" # 非表示のタブは保存形式のアイテム数を出す
+        return title
+
+    def update_document_tab(self):
+        self.documents[self.active_document]["path"] = self._current_layout_path
+        self._refresh_document_tab(self.active_document)
+
+    def _refresh_document_tab(self, index):
+        tab = self.document_notebook.tabs()[index]
+        self.document_notebook.tab(tab, text=self._document_title(self.documents[index]))
+
+    def _document_is_blank(self, document):
+        return document["path"] is None and not self.canvas_items and not self._undo_stack
+
+    def mark_document_saved(self, layout_data):
+        self.documents[self.active_document]["saved"] = layout_data
+
+    def _has_unsaved_changes(self):
+        # 最後に開いた/保存した内容との差分で判断する (ウィンドウの大きさに合わせて変わる canvas_size は除く)
+        saved = self.documents[self.active_document]["saved"]
+        if saved is None: return bool(self.canvas_items)
+        diff = diff_layouts(saved, self.build_layout_data())
+        return bool(diff["added"] or diff["removed"] or diff["moved"] or diff["changed"] or diff["sections"]
+                    or set(diff["settings"]) - {"canvas_size"})
+
+    def _confirm_discard_changes(self):
+        if not self._has_unsaved_changes(): return True
+        return tkinter.messagebox.askyesno("未保存の変更", "保存していない変更があります。破棄して閉じますか？")
+
+    def _confirm_discard_undo(self):
+        # 非表示にするタブのアイテムは作り直すので、そのタブの「元に戻す」履歴は残せない。履歴があるときは確認する
+        if not self._undo_stack: return True
+        return tkinter.messagebox.askyesno("タブの切り替え", "表示中のタブの「元に戻す」履歴は、切り替えると消えます。切り替えますか？")
+
+    def _select_document_tab(self, index):
+        tab = self.document_notebook.tabs()[index]
+        if self.document_notebook.select() == tab: return
+        self._ignore_tab_change = True
+        try: self.document_notebook.select(tab)
+        finally: self._ignore_tab_change = False
+
+    def _unload_active_document(self):
+        document = self.documents[self.active_document]
+        document["path"] = self._current_layout_path
+        document["model"] = self.build_layout_data()
+        self.clear_layout()
+        self._refresh_document_tab(self.active_document)
+
+    def _show_document(self, index, layout_data):
+        self.active_document = index
+        document = self.documents[index]
+        document["model"] = None
+        self._current_layout_path = document["path"]
+        self.load_layout_data(layout_data)
+        self._refresh_document_tab(index)
+        self._select_document_tab(index)
+
+    @perf_timed()
+    def activate_document(self, index):
+        if index == self.active_document or not 0 <= index < len(self.documents): return
+        if not self._confirm_discard_undo():
+            self._select_document_tab(self.active_document); return
+        self._unload_active_document()
+        self._show_document(index, self.documents[index]["model"])
+
+    def _on_document_tab_changed(self, event=None):
+        if self._ignore_tab_change: return
+        try: index = self.document_notebook.index(self.document_notebook.select())
+        except tk.TclError: return
+        self.activate_document(index)
+
+    def _add_document(self, path):
+        self.documents.append({"path": path, "model": None, "saved": None})
+        self.document_notebook.add(ttk.Frame(self.document_notebook, height=0), text=UNTITLED_DOCUMENT_TITLE)
+        return len(self.documents) - 1
+
+    def new_document(self):
+        if not self._confirm_discard_undo(): return
+        self._unload_active_document()
+        self._show_document(self._add_document(None), {})
+
+    def open_document(self, filepath, layout_data):
+        # 同じファイルのタブがあればそこに読み直す。選択中のタブが空ならそこに、それ以外は新しいタブに開く
+        target = os.path.abspath(filepath)
+        index = next((i for i, document in enumerate(self.documents)
+                      if document["path"] and os.path.abspath(document["path"]) == target), None)
+        if index is None and self._document_is_blank(self.documents[self.active_document]): index = self.active_document
+        if index == self.active_document:
+            if not self._confirm_discard_changes(): return # 開いているファイルを読み直す
+            self.clear_layout()
+        else:
+            if not self._confirm_discard_undo(): return
+            self._unload_active_document()
+            if index is None: index = self._add_document(filepath)
+        self.documents[index]["path"] = filepath
+        self._show_document(index, layout_data)
+        self.mark_document_saved(self.build_layout_data())
+
+    def close_document(self):
+        if not self._confirm_discard_changes(): return
+        closing = self.active_document
+        self.clear_layout()
+        if len(self.documents) == 1:
+            self.documents[0] = {"path": None, "model": None, "saved": None}
+            self._current_layout_path = None; self.load_layout_data({}); self._refresh_document_tab(0)
+            return
+        del self.documents[closing]
+        self._ignore_tab_change = True # forget で別のタブが選ばれても、閉じたタブの内容は残さない
+        try: self.document_notebook.forget(closing)
+        finally: self._ignore_tab_change = False
+        index = min(closing, len(self.documents) - 1)
+        self._show_document(index, self.documents[index]["model"])
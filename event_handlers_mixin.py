@@ -26,7 +26,7 @@ class EventHandlersMixin:
         clicked_item_id = None
         if overlapping_ids:
             for item_id_overlap in overlapping_ids:
-                if any(ci['id'] == item_id_overlap for ci in self.canvas_items):
+                if any(ci.id == item_id_overlap for ci in self.canvas_items):
                     if "highlight_rect" not in self.canvas_frame.gettags(item_id_overlap) and \
                        "multi_highlight_rect" not in self.canvas_frame.gettags(item_id_overlap) and \
                        self.ALL_RESIZE_HANDLES_TAG not in self.canvas_frame.gettags(item_id_overlap):
@@ -78,6 +78,7 @@ class EventHandlersMixin:
             else:
                 # print(f"[DEBUG] Mixin: on_canvas_item_press: Shift+クリックで追加選択 item_id={item_id}")
                 self.selected_item_ids.add(item_id)
+        self.expand_selection_to_groups(item_id, event) # グループのメンバーならグループごと (group_mixin)
 
         # --- ここで必ず全選択アイテムのbboxをセットし直す ---
         self._dragged_item_id = item_id
@@ -90,9 +91,7 @@ class EventHandlersMixin:
 
         if self.selected_item_ids:
             # print(f"[DEBUG] Mixin: on_canvas_item_press: drag対象 self.selected_item_ids={self.selected_item_ids}")
-            for s_id in self.selected_item_ids:
-                # print(f"[DEBUG] Mixin: on_canvas_item_press: drag対象 s_id={s_id}")
-                self.canvas_frame.tag_raise(s_id) # Raise selected items
+            self.promote_selection() # Raise selected items as one group (zorder_mixin)
             self.canvas_frame.bind("<B1-Motion>", self.on_multi_item_drag)
             self.canvas_frame.bind("<ButtonRelease-1>", self.on_multi_item_release)
 
@@ -137,15 +136,15 @@ class EventHandlersMixin:
                 new_top_left_x = start_bbox[0] + effective_delta_x
                 new_top_left_y = start_bbox[1] + effective_delta_y
 
-                item_info = next((item for item in self.canvas_items if item['id'] == item_id), None)
+                item_info = next((item for item in self.canvas_items if item.id == item_id), None)
                 if item_info:
-                    if item_info['type'] == 'widget':
-                        width = item_info.get('width', start_bbox[2] - start_bbox[0])
-                        height = item_info.get('height', start_bbox[3] - start_bbox[1])
+                    if item_info.type == 'widget':
+                        width = item_info.width
+                        height = item_info.height
                         center_x = new_top_left_x + width / 2
                         center_y = new_top_left_y + height / 2
                         self.canvas_frame.coords(item_id, center_x, center_y)
-                    elif item_info['type'] == 'image':
+                    elif item_info.type == 'image':
                         self.canvas_frame.coords(item_id, new_top_left_x, new_top_left_y)
         
         self.update_highlight()
@@ -0,0 +1,144 @@
+import json
+import time
+from types import SimpleNamespace
+
+# 編集操作のイベント列 (アイテム・リサイズハンドル上の押下/移動/解放) を記録し、
+# 同じレイアウトを開いた LayoutDesigner のハンドラへ決定的に再投入する。
+# アイテムはキャンバス ID ではなく canvas_items 内の順番で記録するので、別セッションでも再生できる。
+
+RECORDING_FORMAT_VERSION = 1
+RECORDED_HANDLERS = (
+    "on_canvas_press", "on_canvas_item_press", "on_multi_item_drag", "on_multi_item_release",
+    "on_resize_handle_press", "on_resize_handle_drag", "on_resize_handle_release",
+)
+
+
+class EventRecorder:
+    def __init__(self, app):
+        self.app = app
+        self.recording = False
+        self.events = []
+        self._start_time = 0.0
+        self._layout_info = {}
+
+    def start(self):
+        if self.recording: return
+        self.events = []
+        canvas = self.app.canvas_frame
+        self._layout_info = {"canvas_size": [canvas.winfo_width(), canvas.winfo_height()],
+                             "grid_spacing": self.app.grid_spacing, "item_count": len(self.app.canvas_items)}
+        for name in RECORDED_HANDLERS:
+            setattr(self.app, name, self._wrap_handler(name, getattr(type(self.app), name).__get__(self.app)))
+        # 起動時に元のメソッドで bind されているキャンバス押下だけは張り直す
+        canvas.bind("<ButtonPress-1>", self.app.on_canvas_press)
+        self._start_time = time.perf_counter()
+        self.recording = True
+
+    def stop(self):
+        if not self.recording: return self.events
+        self.recording = False
+        for name in RECORDED_HANDLERS:
+            self.app.__dict__.pop(name, None)
+        self.app.canvas_frame.bind("<ButtonPress-1>", self.app.on_canvas_press)
+        return self.events
+
+    def _wrap_handler(self, name, original):
+        def wrapper(event, *extra):
+            if self.recording:
+                self._record(name, event, extra)
+            return original(event, *extra)
+        return wrapper
+
+    def _item_index(self, item_id):
+        for index, item in enumerate(self.app.canvas_items):
+            if item.id == item_id: return index
+        return None
+
+    def _record(self, name, event, extra):
+        canvas = self.app.canvas_frame
+        try:
+            canvas_x = event.x_root - canvas.winfo_rootx()
+            canvas_y = event.y_root - canvas.winfo_rooty()
+        except AttributeError:
+            canvas_x, canvas_y = event.x, event.y
+        entry = {"t": round(time.perf_counter() - self._start_time, 6), "handler": name,
+                 "x": canvas_x, "y": canvas_y, "state": int(getattr(event, "state", 0) or 0)}
+        if name == "on_canvas_item_press":
+            entry["item_index"] = self._item_index(extra[0])
+        elif name == "on_resize_handle_press":
+            entry["handle"] = extra[0]
+        self.events.append(entry)
+
+    def save(self, filepath, layout_path=None):
+        data = {"version": RECORDING_FORMAT_VERSION, "layout": layout_path, "events": self.events}
+        data.update(self._layout_info)
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1, ensure_ascii=False)
+
+
+def load_recording(filepath):
+    with open(filepath, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get("version") != RECORDING_FORMAT_VERSION:
+        raise ValueError(f"未対応の記録形式です: version={data.get('version')}")
+    return data
+
+
+class EventReplayer:
+    def __init__(self, app, recording):
+        self.app = app
+        self.recording = recording
+        self.timings = []
+
+    def _make_event(self, entry):
+        canvas = self.app.canvas_frame
+        x, y = entry["x"], entry["y"]
+        return SimpleNamespace(x=x, y=y, x_root=canvas.winfo_rootx() + x, y_root=canvas.winfo_rooty() + y,
+                               state=entry.get("state", 0), widget=canvas)
+
+    def _dispatch(self, entry):
+        handler = getattr(self.app, entry["handler"])
+        event = self._make_event(entry)
+        start = time.perf_counter()
+        if entry["handler"] == "on_canvas_item_press":
+            index = entry.get("item_index")
+            if index is None or index >= len(self.app.canvas_items):
+                return
+            handler(event, self.app.canvas_items[index].id)
+        elif entry["handler"] == "on_resize_handle_press":
+            handler(event, entry["handle"])
+        else:
+            handler(event)
+        self.app.update_idletasks()
+        self.timings.append({"t": entry["t"], "handler": entry["handler"],
+                             "elapsed_ms": round((time.perf_counter() - start) * 1000.0, 3)})
+
+    def replay(self):
+        # 記録の時刻は無視し、可能な限り速く順番どおりに再投入する (性能比較用)
+        self.timings = []
+        for entry in self.recording["events"]:
+            self._dispatch(entry)
+        return self.timings
+
+    def replay_realtime(self, speed=1.0, on_finished=None):
+        # 記録時の時間間隔を after() で再現する (見た目の確認用)
+        self.timings = []
+        events = self.recording["events"]
+        if not events:
+            if on_finished: on_finished(self.timings)
+            return
+        def step(index):
+            self._dispatch(events[index])
+            if index + 1 < len(events):
+                delay_ms = max(0, int((events[index + 1]["t"] - events[index]["t"]) / speed * 1000))
+                self.app.after(delay_ms, step, index + 1)
+            elif on_finished:
+                on_finished(self.timings)
+        self.app.after(0, step, 0)
+
+    def summary(self):
+        by_handler = {}
+        for timing in self.timings:
+            by_handler.setdefault(timing["handler"], []).append(timing["elapsed_ms"])
+        return {name: {"count": len(values), "total_ms": round(sum(values), 3), "max_ms": max(values)}
+                for name, values in by_handler.items()}
@@ -0,0 +1,153 @@
+import tkinter as tk
+import tkinter.messagebox
+from tkinter import simpledialog
+from PIL import Image
+
+from groups import GroupTree
+from layout_diff import new_item_uid
+from zorder_mixin import SELECTION_LAYER_TAG
+
+GROUP_FRAME_TAG = "group_frame"
+CONTROL_MASK = 0x0004 # Ctrl+クリックはグループの中のアイテムを1つだけ選ぶ
+
+
+class GroupMixin:
+    def _init_groups(self):
+        self.group_tree = GroupTree()
+
+    def _fetch_item_bboxes(self, item_ids):
+        return dict(self._bboxes_for_ids(list(item_ids)))
+
+    def group_bbox(self, group_uid):
+        return self.group_tree.bbox(group_uid, self._fetch_item_bboxes)
+
+    def invalidate_group_bounds(self, item_ids=None):
+        # アイテムの位置・大きさが変わったとき (None なら全グループ)
+        if item_ids is None: self.group_tree.mark_all_dirty()
+        else: self.group_tree.mark_items_dirty(item_ids)
+
+    def selected_groups(self):
+        # 配下のアイテムが全て選択されている最上位グループ
+        _, roots = self.group_tree.group_units(self.selected_item_ids)
+        return [uid for uid in roots if self.selected_item_ids.issuperset(self.group_tree.leaf_items(uid))]
+
+    def expand_selection_to_groups(self, item_id, event=None):
+        # グループのメンバーをクリックしたら、最上位グループごと選択 (外すときもまとめて外す)
+        if event is not None and event.state & CONTROL_MASK: return
+        root = self.group_tree.root_of_item(item_id)
+        if root is None: return
+        members = self.group_tree.leaf_items(root)
+        if item_id in self.selected_item_ids: self.selected_item_ids.update(members)
+        else: self.selected_item_ids.difference_update(members)
+
+    def end_group_drag(self, dragged_item_id, start_bboxes):
+        # ドラッグで丸ごと動いたグループはキャッシュをずらし、それ以外のアイテムだけ dirty にする
+        start = start_bboxes.get(dragged_item_id)
+        current = self.canvas_frame.bbox(dragged_item_id) if dragged_item_id else None
+        if not start or not current: return self.invalidate_group_bounds(start_bboxes.keys())
+        dx, dy = current[0] - start[0], current[1] - start[1]
+        if not dx and not dy: return
+        moved_groups = self.selected_groups()
+        whole = set()
+        for uid in moved_groups:
+            self.group_tree.translate(uid, dx, dy); whole.update(self.group_tree.leaf_items(uid))
+        self.invalidate_group_bounds([item_id for item_id in start_bboxes if item_id not in whole])
+
+    def _draw_group_frames(self):
+        self.canvas_frame.delete(GROUP_FRAME_TAG)
+        groups = self.selected_groups() if self.selected_item_ids else []
+        if not groups: return
+        # ドラッグ中はキャッシュを更新せず、掴んだアイテムの移動量だけずらして描く
+        offset_x = offset_y = 0
+        start = getattr(self, '_drag_selected_items_start_bboxes', {}).get(self._dragged_item_id) if self._dragged_item_id else None
+        if start:
+            current = self.canvas_frame.bbox(self._dragged_item_id)
+            if current: offset_x, offset_y = current[0] - start[0], current[1] - start[1]
+        for uid in groups:
+            bbox = self.group_bbox(uid)
+            if not bbox: continue
+            self.canvas_frame.create_rectangle(bbox[0] - 4 + offset_x, bbox[1] - 4 + offset_y, bbox[2] + 4 + offset_x, bbox[3] + 4 + offset_y,
+                                               outline="#2e8b57", dash=(6, 3), tags=(GROUP_FRAME_TAG, SELECTION_LAYER_TAG))
+        self.canvas_frame.tag_lower(GROUP_FRAME_TAG, self._layer_top_marker("selection"))
+
+    def group_selection(self):
+        if len(self.selected_item_ids) < 2: return
+        free_items, roots = self.group_tree.group_units(self.selected_item_ids)
+        # 一部だけ選択されたグループは、そのグループを丸ごと子にする
+        if len(free_items) + len(roots) < 2: return
+        uid = self.group_tree.create(new_item_uid(), f"グループ{len(self.group_tree) + 1}", items=free_items, children=roots)
+        self.selected_item_ids.update(self.group_tree.leaf_items(uid))
+        self.push_undo_entry("グループ化", lambda: self._ungroup(uid), item_ids=self.group_tree.leaf_items(uid))
+        self.update_highlight()
+
+    def _ungroup(self, uid):
+        if uid in self.group_tree: self.group_tree.ungroup(uid)
+        self.update_highlight()
+
+    def ungroup_selection(self):
+        groups = self.selected_groups()
+        if not groups: return
+        removed = []
+        for uid in groups:
+            group = self.group_tree.ungroup(uid)
+            removed.append((uid, group['name'], list(group['items']), list(group['children'])))
+        def restore():
+            existing_ids = {item.id for item in self.canvas_items}
+            for uid, name, items, children in removed:
+                self.group_tree.create(uid, name, items=[item_id for item_id in items if item_id in existing_ids],
+                                       children=[child for child in children if child in self.group_tree])
+            self.update_highlight()
+        self.push_undo_entry("グループ解除", restore, item_ids=[item_id for _, _, items, _ in removed for item_id in items])
+        self.update_highlight()
+
+    def forget_group_items(self, item_ids):
+        self.group_tree.remove_items(item_ids)
+
+    def _set_item_geometry(self, item, x, y, width, height):
+        width, height = max(1, int(round(width))), max(1, int(round(height)))
+        if item.type == 'widget':
+            self.canvas_frame.itemconfig(item.id, width=width, height=height)
+            self.canvas_frame.coords(item.id, x + width / 2, y + height / 2)
+        elif item.type == 'image':
+            self.canvas_frame.coords(item.id, int(round(x)), int(round(y)))
+            if item.tiled: self.render_tiled_item(item, width, height)
+            elif item.animated: self.resize_animated_item(item, width, height)
+            else:
+                source = self.original_image_for(item)
+                self._update_canvas_image(item.id, source.resize((width, height), Image.Resampling.LANCZOS))
+        item.width, item.height = width, height
+
+    def scale_selected_groups(self):
+        groups = self.selected_groups()
+        if not groups:
+            tkinter.messagebox.showinfo("グループの拡大縮小", "グループを選択してください。"); return
+        percent = simpledialog.askfloat("グループの拡大縮小", "倍率 (%):", initialvalue=100, minvalue=10, maxvalue=1000, parent=self)
+        if not percent or percent == 100: return
+        scale = percent / 100
+        items_by_id = {item.id: item for item in self.canvas_items}
+        previous = []
+        for uid in groups:
+            origin = self.group_bbox(uid)
+            if not origin: continue
+            for item_id, bbox in self._bboxes_for_ids(self.group_tree.leaf_items(uid)):
+                item = items_by_id.get(item_id)
+                if item is None: continue
+                previous.append((item, bbox))
+                try:
+                    self._set_item_geometry(item, origin[0] + (bbox[0] - origin[0]) * scale, origin[1] + (bbox[1] - origin[1]) * scale,
+                                            (bbox[2] - bbox[0]) * scale, (bbox[3] - bbox[1]) * scale)
+                except Exception as e: print(f"グループの拡大縮小エラー ({item_id}): {e}")
+        changed_ids = [item.id for item, _ in previous]
+        def restore():
+            for item, bbox in previous:
+                if item in self.canvas_items: self._set_item_geometry(item, bbox[0], bbox[1], bbox[2] - bbox[0], bbox[3] - bbox[1])
+            self.invalidate_group_bounds(changed_ids); self.invalidate_smart_guides(changed_ids); self.update_highlight()
+        self.push_undo_entry(f"グループの拡大縮小 ({percent:g}%)", restore, item_ids=changed_ids)
+        self.invalidate_group_bounds(changed_ids); self.invalidate_smart_guides(changed_ids)
+        self.update_highlight()
+
+    def _build_group_menu(self, parent_menu):
+        group_menu = tk.Menu(parent_menu, tearoff=0); parent_menu.add_cascade(label="グループ", menu=group_menu)
+        group_menu.add_command(label="グループ化", command=self.group_selection, accelerator="Ctrl+G")
+        group_menu.add_command(label="グループ解除", command=self.ungroup_selection, accelerator="Ctrl+Shift+G")
+        group_menu.add_command(label="グループの拡大縮小...", command=self.scale_selected_groups)
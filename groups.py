@@ -0,0 +1,168 @@
+# 入れ子のグループ。
+# 各グループは直下のアイテムと子グループを持ち、全体の bbox をキャッシュする。
+# アイテムが変わったら、そのアイテムから親をたどって dirty にする (既に dirty の親に着いたら止める)。
+# bbox を求めるときは dirty なグループの直下のアイテムだけをまとめて取得し、下から計算し直す。
+
+
+def union_bbox(bboxes):
+    bboxes = [bbox for bbox in bboxes if bbox]
+    if not bboxes: return None
+    return (min(b[0] for b in bboxes), min(b[1] for b in bboxes), max(b[2] for b in bboxes), max(b[3] for b in bboxes))
+
+
+class GroupTree:
+    def __init__(self):
+        self.groups = {} # uid -> {"name", "parent", "items": set, "children": set}
+        self.item_parent = {} # アイテムID -> 直属のグループの uid
+        self._bboxes = {} # uid -> キャッシュした bbox
+        self._dirty = set()
+        self._leaf_cache = {} # uid -> 配下の全アイテム (構造が変わったら捨てる)
+
+    def __len__(self):
+        return len(self.groups)
+
+    def __contains__(self, uid):
+        return uid in self.groups
+
+    def clear(self):
+        self.groups.clear(); self.item_parent.clear(); self._bboxes.clear(); self._dirty.clear(); self._leaf_cache.clear()
+
+    def _structure_changed(self, uid):
+        self._leaf_cache.clear()
+        self._mark_group_dirty(uid)
+
+    def _mark_group_dirty(self, uid):
+        while uid is not None and uid not in self._dirty:
+            self._dirty.add(uid)
+            uid = self.groups[uid]["parent"]
+
+    def create(self, uid, name, parent=None, items=(), children=()):
+        self.groups[uid] = {"name": name, "parent": parent, "items": set(), "children": set()}
+        if parent is not None: self.groups[parent]["children"].add(uid)
+        for item_id in items:
+            self.groups[uid]["items"].add(item_id); self.item_parent[item_id] = uid
+        for child in children:
+            old_parent = self.groups[child]["parent"]
+            if old_parent is not None: self.groups[old_parent]["children"].discard(child)
+            self.groups[child]["parent"] = uid; self.groups[uid]["children"].add(child)
+        self._structure_changed(uid)
+        return uid
+
+    def root_of_item(self, item_id):
+        uid = self.item_parent.get(item_id)
+        if uid is None: return None
+        while self.groups[uid]["parent"] is not None: uid = self.groups[uid]["parent"]
+        return uid
+
+    def group_units(self, item_ids):
+        # 選択をまとめる単位: グループに属さないアイテムと、属するアイテムの最上位グループ
+        free_items, roots = [], []
+        seen = set()
+        for item_id in item_ids:
+            root = self.root_of_item(item_id)
+            if root is None: free_items.append(item_id)
+            elif root not in seen: seen.add(root); roots.append(root)
+        return free_items, roots
+
+    def ungroup(self, uid):
+        # 直下のアイテムと子グループを親 (無ければ最上位) へ移してグループを消す
+        group = self.groups.pop(uid)
+        parent = group["parent"]
+        for item_id in group["items"]:
+            if parent is None: self.item_parent.pop(item_id, None)
+            else: self.item_parent[item_id] = parent; self.groups[parent]["items"].add(item_id)
+        for child in group["children"]:
+            self.groups[child]["parent"] = parent
+            if parent is not None: self.groups[parent]["children"].add(child)
+        if parent is not None:
+            self.groups[parent]["children"].discard(uid)
+            self._structure_changed(parent)
+        else: self._leaf_cache.clear()
+        self._bboxes.pop(uid, None); self._dirty.discard(uid)
+        return group
+
+    def remove_items(self, item_ids):
+        # アイテムの削除。空になったグループは上に向かって消す
+        for item_id in item_ids:
+            uid = self.item_parent.pop(item_id, None)
+            if uid is None: continue
+            self.groups[uid]["items"].discard(item_id)
+            self._structure_changed(uid)
+            self.remove_empty(uid)
+
+    def leaf_items(self, uid):
+        cached = self._leaf_cache.get(uid)
+        if cached is not None: return cached
+        leaves, stack = [], [uid]
+        while stack:
+            group = self.groups[stack.pop()]
+            leaves.extend(group["items"]); stack.extend(group["children"])
+        self._leaf_cache[uid] = leaves = tuple(leaves)
+        return leaves
+
+    def mark_items_dirty(self, item_ids):
+        for item_id in item_ids:
+            uid = self.item_parent.get(item_id)
+            if uid is not None: self._mark_group_dirty(uid)
+
+    def mark_all_dirty(self):
+        self._dirty.update(self.groups)
+
+    def translate(self, uid, dx, dy):
+        # グループ全体を動かしたとき: 配下のキャッシュはずらすだけで済む (親は中身が変わったので dirty)
+        stack = [uid]
+        while stack:
+            current = stack.pop()
+            bbox = self._bboxes.get(current)
+            if bbox is not None and current not in self._dirty:
+                self._bboxes[current] = (bbox[0] + dx, bbox[1] + dy, bbox[2] + dx, bbox[3] + dy)
+            stack.extend(self.groups[current]["children"])
+        parent = self.groups[uid]["parent"]
+        if parent is not None: self._mark_group_dirty(parent)
+
+    def bbox(self, uid, fetch_bboxes):
+        # fetch_bboxes: [アイテムID, ...] -> {アイテムID: bbox}。dirty な部分のアイテムだけを1回で渡す
+        if uid not in self._dirty and uid in self._bboxes: return self._bboxes[uid]
+        order, stack, needed = [], [uid], []
+        while stack:
+            current = stack.pop()
+            if current not in self._dirty and current in self._bboxes: continue
+            order.append(current)
+            needed.extend(self.groups[current]["items"])
+            stack.extend(self.groups[current]["children"])
+        item_bboxes = fetch_bboxes(needed) if needed else {}
+        for current in reversed(order): # 子から順に
+            group = self.groups[current]
+            self._bboxes[current] = union_bbox([item_bboxes.get(item_id) for item_id in group["items"]] +
+                                               [self._bboxes.get(child) for child in group["children"]])
+            self._dirty.discard(current)
+        return self._bboxes[uid]
+
+    def to_data(self, item_key):
+        # 保存用: {uid: {"name", "parent", "items": [アイテムの uid, ...]}}
+        return {uid: {"name": group["name"], "parent": group["parent"],
+                      "items": sorted(item_key[item_id] for item_id in group["items"] if item_id in item_key)}
+                for uid, group in self.groups.items()}
+
+    def load_data(self, groups_data, item_ids_by_key):
+        # 親が先に作られるように、親をたどった深さの順に作る
+        def depth(uid):
+            count = 0
+            while groups_data.get(uid, {}).get("parent") in groups_data and count <= len(groups_data):
+                uid = groups_data[uid]["parent"]; count += 1
+            return count
+        for uid in sorted(groups_data, key=depth):
+            data = groups_data[uid]
+            parent = data.get("parent") if data.get("parent") in self.groups else None
+            self.create(uid, data.get("name", ""), parent,
+                        items=[item_ids_by_key[key] for key in data.get("items", []) if key in item_ids_by_key])
+        for uid in [uid for uid in self.groups if not self.leaf_items(uid)]:
+            self.remove_empty(uid)
+
+    def remove_empty(self, uid):
+        while uid is not None and uid in self.groups and not self.groups[uid]["items"] and not self.groups[uid]["children"]:
+            parent = self.groups[uid]["parent"]
+            self.groups.pop(uid); self._bboxes.pop(uid, None); self._dirty.discard(uid)
+            if parent is not None: self.groups[parent]["children"].discard(uid)
+            uid = parent
+        self._leaf_cache.clear()
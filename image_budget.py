@@ -0,0 +1,92 @@
+from collections import OrderedDict
+from PIL import Image
+
+# 画像アイテムの元画像 (リサイズの元にするフル解像度の PIL 画像) のメモリ上限。
+# 上限を超えたら長く使っていない元画像から手放し (item.original_pil_image = None)、リサイズなどで必要になったときに path から開き直す。
+# 無圧縮の TIFF など Pillow がメモリマップで読める形式は、ページキャッシュから読むだけなので上限には数えない。
+
+DEFAULT_BUDGET_MB = 512
+
+
+def image_nbytes(image):
+    if getattr(image, "map", None) is not None: return 0 # メモリマップ (OS がいつでも捨てられる)
+    return image.width * image.height * len(image.getbands())
+
+
+def open_original(path):
+    image = Image.open(path)
+    image.load() # 形式が許せばここでメモリマップになる
+    return image
+
+
+class OriginalImageBudget:
+    def __init__(self, budget_mb=DEFAULT_BUDGET_MB):
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self._items = OrderedDict() # id(アイテム) -> アイテム (古く使った順)
+        self._images = {} # id(画像) -> [画像, バイト数, 参照しているアイテム数]
+        self._images_by_path = {} # path -> 持っている元画像 (手放したアイテムを開き直すときに共有する)
+        self.used_bytes = 0
+        self.dropped = 0 # 上限のために手放した回数
+        self.reopened = 0
+
+    def set_budget_mb(self, budget_mb):
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self._enforce()
+
+    def _retain(self, item):
+        image = item.original_pil_image
+        entry = self._images.get(id(image))
+        if entry is None:
+            entry = self._images[id(image)] = [image, image_nbytes(image), 0]
+            self.used_bytes += entry[1]
+        entry[2] += 1
+        self._images_by_path[item.path] = image
+
+    def _release(self, item):
+        image = item.original_pil_image
+        entry = self._images.get(id(image))
+        if entry is None: return
+        entry[2] -= 1
+        if entry[2] <= 0:
+            del self._images[id(image)]; self.used_bytes -= entry[1]
+            if self._images_by_path.get(item.path) is image: del self._images_by_path[item.path]
+
+    def register(self, item):
+        # 元画像を持ったアイテムを管理に入れる (同じ画像を共有するアイテムは1回分だけ数える)
+        if item.original_pil_image is None: return
+        if id(item) in self._items: self._items.move_to_end(id(item)); return
+        self._items[id(item)] = item
+        self._retain(item)
+        self._enforce(keep=item)
+
+    def discard(self, item):
+        if self._items.pop(id(item), None) is None: return
+        self._release(item)
+
+    def clear(self):
+        self._items.clear(); self._images.clear(); self._images_by_path.clear(); self.used_bytes = 0
+
+    def original(self, item):
+        # 元画像を返す。手放していれば path から開き直す (同じファイルを持っているアイテムがあればそれを使う)
+        if item.original_pil_image is None:
+            item.original_pil_image = self._images_by_path.get(item.path) or open_original(item.path)
+            self.reopened += 1
+        if id(item) in self._items: self._items.move_to_end(id(item))
+        else: self.register(item)
+        return item.original_pil_image
+
+    def _enforce(self, keep=None):
+        while self.used_bytes > self.budget_bytes and self._items:
+            item_key, item = next(iter(self._items.items()))
+            if item is keep:
+                if len(self._items) == 1: break
+                self._items.move_to_end(item_key); continue
+            del self._items[item_key]
+            self._release(item)
+            item.original_pil_image = None; self.dropped += 1
+
+    def usage_text(self):
+        mapped = sum(1 for image, nbytes, _ in self._images.values() if nbytes == 0)
+        text = f"元画像: {self.used_bytes / (1024 * 1024):.1f} / {self.budget_bytes / (1024 * 1024):.0f} MiB ({len(self._images)} 枚"
+        if mapped: text += f", うちメモリマップ {mapped}"
+        return text + f", 解放 {self.dropped} 回)"
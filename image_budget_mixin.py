@@ -0,0 +1,37 @@
+from tkinter import ttk, simpledialog
+
+from image_budget import OriginalImageBudget
+
+
+class ImageBudgetMixin:
+    # 画像アイテムの元画像をメモリ上限つきで持つ (image_budget.py)。使用量はツールボックスの下に出す
+    def _init_image_budget(self):
+        self.image_budget = OriginalImageBudget()
+        self._image_budget_label = None
+
+    def _build_image_budget_status(self, parent):
+        self._image_budget_label = ttk.Label(parent, wraplength=180, justify="left")
+        self._image_budget_label.pack(side="bottom", fill="x", padx=10, pady=5)
+        self.refresh_image_budget_status()
+
+    def refresh_image_budget_status(self):
+        if self._image_budget_label is not None: self._image_budget_label.config(text=self.image_budget.usage_text())
+
+    def retain_original_image(self, item):
+        self.image_budget.register(item); self.refresh_image_budget_status()
+
+    def original_image_for(self, item):
+        image = self.image_budget.original(item)
+        self.refresh_image_budget_status()
+        return image
+
+    def release_original_images(self, items):
+        for item in items: self.image_budget.discard(item)
+        self.refresh_image_budget_status()
+
+    def set_image_budget(self):
+        budget_mb = simpledialog.askinteger("元画像のメモリ上限", "上限 (MiB):", initialvalue=self.image_budget.budget_bytes // (1024 * 1024),
+                                            minvalue=0, parent=self)
+        if budget_mb is None: return
+        self.image_budget.set_budget_mb(budget_mb)
+        self.refresh_image_budget_status()
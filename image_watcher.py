@@ -0,0 +1,101 @@
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+
+# 画像アイテムのファイルの変更を見張る。
+# - Linux では inotify でファイルのあるディレクトリを見張り、タイマーごとに溜まったイベントを1回の read で読む
+# - それ以外 (または inotify が使えないとき) は、タイマーごとに最大 STAT_BATCH 件ずつ os.stat して更新時刻・サイズを比べる
+# どちらも changed_paths(paths) が前回から変わったファイルの絶対パスの集合を返す。
+
+POLL_INTERVAL_MS = 2000
+STAT_BATCH = 500
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO # 書き終わったとき・置き換えられたとき (エディタの保存は多くが別名で書いて rename)
+EVENT_HEADER = struct.Struct("iIII") # wd, mask, cookie, len
+
+_MISSING = object()
+
+
+def file_stamp(path):
+    try: stat = os.stat(path)
+    except OSError: return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class StatWatcher:
+    def __init__(self, batch=STAT_BATCH):
+        self.batch = batch
+        self._stamps = {} # 絶対パス -> (更新時刻, サイズ) または None (無い)
+        self._queue = [] # この周で残っているパス
+
+    def changed_paths(self, paths):
+        if not self._queue:
+            current = {os.path.abspath(path) for path in paths}
+            for path in [path for path in self._stamps if path not in current]: del self._stamps[path]
+            self._queue = sorted(current)
+        changed = set()
+        for path in self._queue[:self.batch]:
+            stamp = file_stamp(path); previous = self._stamps.get(path, _MISSING)
+            self._stamps[path] = stamp
+            # 初めて見たファイルは基準にするだけ。消えている間は読み直さず、戻ってきたら読み直す
+            if previous is not _MISSING and stamp is not None and stamp != previous: changed.add(path)
+        del self._queue[:self.batch]
+        return changed
+
+    def close(self):
+        self._stamps.clear(); self._queue = []
+
+
+class InotifyWatcher:
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0: raise OSError(ctypes.get_errno(), "inotify_init1 に失敗しました")
+        self._directories = {} # ディレクトリ -> wd
+        self._by_wd = {} # wd -> ディレクトリ
+
+    def _watch_directories(self, directories):
+        for directory in [d for d in self._directories if d not in directories]:
+            wd = self._directories.pop(directory); del self._by_wd[wd]
+            self._libc.inotify_rm_watch(self.fd, wd)
+        for directory in directories:
+            if directory in self._directories: continue
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0: continue # 無いディレクトリ (次の周でまた試す)
+            self._directories[directory] = wd; self._by_wd[wd] = directory
+
+    def changed_paths(self, paths):
+        current = {os.path.abspath(path) for path in paths}
+        self._watch_directories({os.path.dirname(path) for path in current})
+        changed = set()
+        while True:
+            try: data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError: break
+            offset = 0
+            while offset < len(data):
+                wd, mask, cookie, name_length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + name_length].rstrip(b"\0")); offset += name_length
+                directory = self._by_wd.get(wd)
+                if directory is not None and name:
+                    path = os.path.join(directory, name)
+                    if path in current: changed.add(path)
+            if len(data) < 64 * 1024: break
+        return changed
+
+    def close(self):
+        if self.fd >= 0: os.close(self.fd); self.fd = -1
+        self._directories.clear(); self._by_wd.clear()
+
+
+def create_watcher():
+    if sys.platform.startswith("linux"):
+        try: return InotifyWatcher()
+        except (OSError, AttributeError) as e: print(f"inotify が使えないので os.stat で見張ります: {e}")
+    return StatWatcher()
@@ -0,0 +1,53 @@
+import os
+import tkinter as tk
+from PIL import Image
+
+from image_budget import open_original
+from image_watcher import create_watcher, POLL_INTERVAL_MS
+from tiled_image import TiledImageSource
+
+
+class ImageWatcherMixin:
+    # 画像アイテムのファイルが書き換えられたら、そのアイテムだけを読み直す (image_watcher.py)
+    def _init_image_watcher(self):
+        self.watch_image_files = tk.BooleanVar(value=True)
+        self._image_watcher = create_watcher()
+        self.after(POLL_INTERVAL_MS, self._poll_image_files)
+
+    def _poll_image_files(self):
+        try:
+            if self.watch_image_files.get():
+                changed = self._image_watcher.changed_paths({item.path for item in self.canvas_items if item.type == 'image'})
+                if changed: self.reload_changed_images(changed)
+        except Exception as e: print(f"画像ファイルの監視エラー: {e}")
+        self.after(POLL_INTERVAL_MS, self._poll_image_files)
+
+    def reload_changed_images(self, changed_paths):
+        # 同じファイルのアイテムはまとめて1回だけ展開する。他のアイテムとキャンバスはそのまま
+        items_by_path = {}
+        for item in self.canvas_items:
+            if item.type == 'image' and os.path.abspath(item.path) in changed_paths: items_by_path.setdefault(item.path, []).append(item)
+        reloaded = 0
+        for path, items in items_by_path.items():
+            try:
+                self._reload_image_items(path, items); reloaded += len(items)
+                self.mark_live_preview_dirty([item.id for item in items], refresh=True)
+            except Exception as e: print(f"画像の読み直しエラー ({path}): {e}")
+        if reloaded: self.refresh_image_budget_status()
+
+    def _reload_image_items(self, path, items):
+        self.tile_cache.discard_path(path); self.frame_cache.discard_path(path)
+        original = None
+        for item in items:
+            if item.tiled:
+                item.source = TiledImageSource(path)
+                item.drawn_tiles = set()
+                self._draw_visible_tiles(item)
+            elif item.animated:
+                self.resize_animated_item(item, item.width, item.height)
+            else:
+                if original is None: original = open_original(path)
+                self.image_budget.discard(item)
+                item.original_pil_image = original
+                self._update_canvas_image(item.id, original.resize((int(item.width), int(item.height)), Image.Resampling.LANCZOS))
+                self.image_budget.register(item)
@@ -0,0 +1,104 @@
+import sys
+import tracemalloc
+
+# canvas_items の1件分。辞書の代わりに __slots__ のクラスにして、1件あたりのメモリと属性アクセスの手間を減らす。
+#   python item_records.py [件数]   辞書と比べたメモリ使用量を表示する
+
+
+class CanvasItem:
+    __slots__ = ("id", "obj", "width", "height", "uid", "component", "member", "style")
+    type = None
+    tiled = False
+    animated = False
+
+    def __init__(self, id, obj, width, height, uid, component=None, member=None, style=None):
+        self.id = id; self.obj = obj
+        self.width = width; self.height = height
+        self.uid = uid
+        self.component = component # 部品のインスタンスの uid (部品のメンバーのとき)
+        self.member = member # 部品の定義の中の番号
+        self.style = style # パレットのスタイル名
+
+    def __repr__(self):
+        return f"{type(self).__name__}(id={self.id!r}, uid={self.uid!r}, size={self.width}x{self.height})"
+
+
+class WidgetItem(CanvasItem):
+    __slots__ = ("widget_type",)
+    type = "widget"
+
+    def __init__(self, id, obj, widget_type, width, height, uid, **kwargs):
+        super().__init__(id, obj, width, height, uid, **kwargs)
+        self.widget_type = widget_type
+
+
+class ImageItem(CanvasItem):
+    __slots__ = ("path", "original_pil_image")
+    type = "image"
+
+    def __init__(self, id, obj, path, width, height, uid, original_pil_image=None, **kwargs):
+        super().__init__(id, obj, width, height, uid, **kwargs)
+        self.path = path
+        self.original_pil_image = original_pil_image
+
+
+class AnimatedImageItem(ImageItem):
+    # アニメーション GIF / APNG。コマは frames (animated_image.AnimationFrames) を同じファイル・サイズのアイテムと共有する
+    __slots__ = ("frames",)
+    animated = True
+
+    def __init__(self, id, obj, path, width, height, uid, frames, **kwargs):
+        super().__init__(id, obj, path, width, height, uid, **kwargs)
+        self.frames = frames
+
+
+class TiledImageItem(ImageItem):
+    # 巨大な画像。元画像は持たず、見えているタイルだけを source (tiled_image.TiledImageSource) から描く
+    __slots__ = ("source", "drawn_tiles")
+    tiled = True
+
+    def __init__(self, id, obj, source, width, height, uid, **kwargs):
+        super().__init__(id, obj, source.path, width, height, uid, **kwargs)
+        self.source = source
+        self.drawn_tiles = set() # obj (表示サイズの PhotoImage) に貼り済みのタイル (列, 行)
+
+
+def _measure(factory, count):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    items = [factory(index) for index in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return items, size
+
+
+def memory_report(count=10000, image_ratio=0.1):
+    # Tk のウィジェットや画像は共通なので除き、レコード自体の大きさだけを比べる
+    image_every = max(1, int(round(1 / image_ratio))) if image_ratio else 0
+    def is_image(index): return image_every and index % image_every == 0
+    def as_dict(index):
+        if is_image(index):
+            return {'id': index, 'type': 'image', 'obj': None, 'path': "image.png", 'width': 64, 'height': 64,
+                    'original_pil_image': None, 'uid': f"{index:032x}"}
+        return {'id': index, 'type': 'widget', 'obj': None, 'widget_type': "button", 'width': 80, 'height': 24, 'uid': f"{index:032x}"}
+    def as_record(index):
+        if is_image(index): return ImageItem(index, None, "image.png", 64, 64, f"{index:032x}")
+        return WidgetItem(index, None, "button", 80, 24, f"{index:032x}")
+    _, dict_size = _measure(as_dict, count)
+    _, record_size = _measure(as_record, count)
+    return {"items": count, "dict_bytes": dict_size, "record_bytes": record_size}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    count = int(argv[0]) if argv else 10000
+    report = memory_report(count)
+    print(f"{report['items']} 件: 辞書 {report['dict_bytes'] / 1024:.1f} KiB ({report['dict_bytes'] / count:.0f} B/件) -> "
+          f"__slots__ {report['record_bytes'] / 1024:.1f} KiB ({report['record_bytes'] / count:.0f} B/件), "
+          f"{(1 - report['record_bytes'] / report['dict_bytes']) * 100:.0f}% 減")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
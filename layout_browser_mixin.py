@@ -0,0 +1,99 @@
+import multiprocessing
+import os
+import tkinter as tk
+from tkinter import ttk, filedialog
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageTk
+
+from layout_thumbnail import submit_thumbnails, render_thumbnails, DEFAULT_CACHE_DIR
+
+BROWSER_THUMBNAIL_SIZE = (200, 150)
+BROWSER_COLUMNS = 4
+BROWSER_POLL_MS = 100
+
+
+class LayoutBrowserMixin:
+    # フォルダ内のレイアウト JSON をサムネイルの一覧から開く。サムネイルは別プロセスで描き、ディスクにキャッシュする
+    def _init_layout_browser(self):
+        self._browser_window = None
+        self._browser_executor = None
+        self._browser_pending = [] # [(Future, ラベル), ...]
+        self._browser_photos = []
+
+    def open_layout_with_previews(self):
+        directory = filedialog.askdirectory(title="レイアウトのフォルダを選択",
+                                            initialdir=os.path.dirname(getattr(self, '_current_layout_path', '') or '') or None)
+        if not directory: return
+        layout_paths = sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.lower().endswith(".json"))
+        self._close_layout_browser()
+        window = self._browser_window = tk.Toplevel(self); window.title(f"プレビューから開く - {directory}"); window.geometry("900x600")
+        window.protocol("WM_DELETE_WINDOW", self._close_layout_browser)
+        ttk.Label(window, text=f"{len(layout_paths)} 件 (クリックで開く)").pack(side="top", anchor="w", padx=5, pady=(5, 0))
+        scroll_canvas = tk.Canvas(window, highlightthickness=0)
+        scrollbar = ttk.Scrollbar(window, command=scroll_canvas.yview)
+        scroll_canvas.config(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y"); scroll_canvas.pack(expand=True, fill="both", padx=(5, 0), pady=5)
+        grid_frame = ttk.Frame(scroll_canvas)
+        scroll_canvas.create_window(0, 0, window=grid_frame, anchor=tk.NW)
+        grid_frame.bind("<Configure>", lambda e: scroll_canvas.config(scrollregion=scroll_canvas.bbox("all")))
+        scroll_canvas.bind("<MouseWheel>", lambda e: scroll_canvas.yview_scroll(-1 if e.delta > 0 else 1, "units"))
+        if not layout_paths: return
+
+        labels = {}
+        for index, layout_path in enumerate(layout_paths):
+            cell = ttk.Frame(grid_frame, padding=4); cell.grid(row=index // BROWSER_COLUMNS, column=index % BROWSER_COLUMNS, sticky="n")
+            label = tk.Label(cell, text="描画中...", width=BROWSER_THUMBNAIL_SIZE[0] // 8, height=BROWSER_THUMBNAIL_SIZE[1] // 16,
+                             relief="groove", cursor="hand2")
+            label.pack()
+            ttk.Label(cell, text=os.path.basename(layout_path)).pack()
+            for widget in (cell, label):
+                widget.bind("<Button-1>", lambda e, path=layout_path: self._open_from_browser(path))
+            labels[layout_path] = label
+        try:
+            # Tk を持ったプロセスを fork しないように spawn で起動する (子は layout_thumbnail だけを読み込む)
+            self._browser_executor = ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn"))
+            futures = submit_thumbnails(self._browser_executor, layout_paths, DEFAULT_CACHE_DIR, BROWSER_THUMBNAIL_SIZE)
+        except Exception as e:
+            # プロセスを作れない環境では順番に描く
+            print(f"サムネイルの並列描画を開始できません: {e}")
+            self._browser_executor = None; futures = None
+            for path, (thumbnail, error) in render_thumbnails(layout_paths, DEFAULT_CACHE_DIR, BROWSER_THUMBNAIL_SIZE, jobs=1).items():
+                self._show_browser_thumbnail(labels[path], thumbnail, error)
+        if futures is not None:
+            self._browser_pending = [(future, labels[path]) for future, path in zip(futures, layout_paths)]
+            window.after(BROWSER_POLL_MS, self._poll_browser_thumbnails)
+
+    def _poll_browser_thumbnails(self):
+        if self._browser_window is None: return
+        still_pending = []
+        for future, label in self._browser_pending:
+            if not future.done(): still_pending.append((future, label)); continue
+            try: _, thumbnail, error = future.result()
+            except Exception as e: thumbnail, error = None, str(e)
+            self._show_browser_thumbnail(label, thumbnail, error)
+        self._browser_pending = still_pending
+        if still_pending: self._browser_window.after(BROWSER_POLL_MS, self._poll_browser_thumbnails)
+
+    def _show_browser_thumbnail(self, label, thumbnail, error):
+        if not label.winfo_exists(): return
+        if error or not thumbnail:
+            label.config(text="描画できません", fg="red"); print(f"サムネイル描画エラー: {error}"); return
+        try:
+            with Image.open(thumbnail) as image: photo = ImageTk.PhotoImage(image)
+        except Exception as e:
+            label.config(text="描画できません", fg="red"); print(f"サムネイル読み込みエラー ({thumbnail}): {e}"); return
+        self._browser_photos.append(photo) # 参照を残さないと表示が消える
+        label.config(image=photo, text="", width=photo.width(), height=photo.height())
+
+    def _open_from_browser(self, layout_path):
+        self._close_layout_browser()
+        self.open_layout(layout_path)
+
+    def _close_layout_browser(self):
+        for future, _ in self._browser_pending: future.cancel()
+        self._browser_pending = []
+        if self._browser_executor is not None:
+            self._browser_executor.shutdown(wait=False, cancel_futures=True); self._browser_executor = None
+        if self._browser_window is not None and self._browser_window.winfo_exists(): self._browser_window.destroy()
+        self._browser_window = None
+        self._browser_photos = []
@@ -0,0 +1,211 @@
+import argparse
+import json
+import sys
+import uuid
+
+# 保存済みレイアウト JSON の差分と3方向マージ。
+# アイテムは uid で突き合わせる (辞書を1回引くだけなので、アイテム数に対して線形時間)。
+# uid の無い古いファイルは items 内の順番をキーにする。
+#   python layout_diff.py diff old.json new.json [--json]
+#   python layout_diff.py merge base.json ours.json theirs.json [-o merged.json]
+# git のマージドライバとして使う場合: driver = python layout_diff.py merge %O %A %B -o %A
+
+POSITION_FIELDS = ("x", "y")
+# 比較しないフィールド (z は並び順で扱う。id_on_canvas は古いファイルに残っているキャンバス上の番号)
+IGNORED_FIELDS = {"uid", "z", "id_on_canvas"}
+# items 以外にキーを付けた辞書として保存している部分 (部品の定義、グループ、スタイルのパレット)
+KEYED_SECTIONS = ("components", "groups", "palette")
+ITEM_REASSIGNED_FIELDS = ("uid", "z") # マージ結果で振り直すアイテムのフィールド
+_MISSING = object()
+
+
+def new_item_uid():
+    return uuid.uuid4().hex
+
+
+def item_key(item, index):
+    return item.get("uid") or f"#{index}"
+
+
+def index_items(layout_data):
+    # {キー: アイテム} (挿入順 = z 順)
+    items = sorted(enumerate(layout_data.get("items", [])), key=lambda pair: (pair[1].get("z", pair[0]), pair[0]))
+    return {item_key(item, index): item for index, item in items}
+
+
+def changed_fields(old_item, new_item):
+    # {フィールド名: (旧値, 新値)} (片方にしか無いフィールドは None との差として扱う)
+    fields = {}
+    for name in old_item.keys() | new_item.keys():
+        if name in IGNORED_FIELDS: continue
+        old_value, new_value = old_item.get(name), new_item.get(name)
+        if old_value != new_value: fields[name] = (old_value, new_value)
+    return fields
+
+
+def diff_layouts(old_data, new_data):
+    old_items, new_items = index_items(old_data), index_items(new_data)
+    diff = {"added": [], "removed": [], "moved": [], "changed": [], "settings": {}, "sections": {}}
+    for key, old_item in old_items.items():
+        new_item = new_items.get(key)
+        if new_item is None:
+            diff["removed"].append(key); continue
+        fields = changed_fields(old_item, new_item)
+        if any(name in fields for name in POSITION_FIELDS):
+            diff["moved"].append({"uid": key, "from": [old_item.get("x"), old_item.get("y")], "to": [new_item.get("x"), new_item.get("y")]})
+        other_fields = {name: list(values) for name, values in fields.items() if name not in POSITION_FIELDS}
+        if other_fields: diff["changed"].append({"uid": key, "fields": other_fields})
+    diff["added"] = [key for key in new_items if key not in old_items]
+    diff["settings"] = {name: list(values) for name, values in
+                        changed_fields(old_data.get("general_settings", {}), new_data.get("general_settings", {})).items()}
+    for section in KEYED_SECTIONS:
+        changed = {key: list(values) for key, values in changed_fields(old_data.get(section, {}), new_data.get(section, {})).items()}
+        if changed: diff["sections"][section] = changed
+    return diff
+
+
+def diff_is_empty(diff):
+    return not any(diff.values())
+
+
+def _merge_values(base, ours, theirs):
+    # (値, 競合したか)。値が _MISSING ならフィールドを削除する
+    if ours == theirs or theirs == base: return ours, False
+    if ours == base: return theirs, False
+    return ours, True
+
+
+def _merge_dicts(key, base, ours, theirs, conflicts, skipped=()):
+    # skipped: マージ後に振り直すフィールド (アイテムの uid と z)。パレットなどのセクションでは普通のキーなので飛ばさない
+    merged = {}
+    names = list(ours.keys()) + [name for name in theirs.keys() if name not in ours] + \
+            [name for name in base.keys() if name not in ours and name not in theirs]
+    for name in names:
+        if name in skipped: continue
+        value, conflict = _merge_values(base.get(name, _MISSING), ours.get(name, _MISSING), theirs.get(name, _MISSING))
+        if conflict:
+            conflicts.append({"uid": key, "field": name, "base": base.get(name), "ours": ours.get(name), "theirs": theirs.get(name)})
+        if value is not _MISSING: merged[name] = value
+    return merged
+
+
+def _merged_order(ours_keys, theirs_keys, merged_keys):
+    # 自分側の並び順を基準に、相手側だけにあるアイテムは相手側で直前にあったアイテムの後ろに入れる
+    after = {}
+    previous = None
+    for key in theirs_keys:
+        if key in merged_keys and key not in ours_keys: after.setdefault(previous, []).append(key)
+        elif key in merged_keys: previous = key
+    order = list(after.get(None, []))
+    for key in ours_keys:
+        if key not in merged_keys: continue
+        order.append(key)
+        order.extend(after.get(key, []))
+    return order
+
+
+def merge_layouts(base_data, ours_data, theirs_data):
+    # 戻り値: (マージ結果, 競合のリスト)。競合したフィールドは自分側 (ours) の値を採る
+    base_items, ours_items, theirs_items = index_items(base_data), index_items(ours_data), index_items(theirs_data)
+    conflicts = []
+    merged_items = {}
+    for key in list(ours_items) + [key for key in theirs_items if key not in ours_items] + \
+               [key for key in base_items if key not in ours_items and key not in theirs_items]:
+        base, ours, theirs = base_items.get(key), ours_items.get(key), theirs_items.get(key)
+        if ours is not None and theirs is not None:
+            merged_items[key] = _merge_dicts(key, base or {}, ours, theirs, conflicts, skipped=ITEM_REASSIGNED_FIELDS)
+        elif ours is not None or theirs is not None:
+            present = ours if ours is not None else theirs
+            if base is None: merged_items[key] = dict(present) # 片側で追加
+            elif changed_fields(base, present):
+                # 片側で削除、もう片側で変更 -> 変更を残して競合として報告
+                conflicts.append({"uid": key, "field": None, "base": base, "ours": ours, "theirs": theirs})
+                merged_items[key] = dict(present)
+            # 片側で削除、もう片側は変更なし -> 削除
+        # 両側で削除 -> 削除
+
+    merged_settings = _merge_dicts(None, base_data.get("general_settings", {}), ours_data.get("general_settings", {}),
+                                   theirs_data.get("general_settings", {}), conflicts)
+    items = []
+    for z_index, key in enumerate(_merged_order(ours_items, theirs_items, merged_items)):
+        item = merged_items[key]
+        if not key.startswith("#"): item["uid"] = key
+        item["z"] = z_index
+        items.append(item)
+    merged = {"general_settings": merged_settings, "items": items}
+    for section in KEYED_SECTIONS:
+        if any(section in data for data in (base_data, ours_data, theirs_data)):
+            # 定義・グループ単位で3方向マージする (同じ定義を両側で変えた場合は競合)
+            merged_section = _merge_dicts(section, base_data.get(section, {}), ours_data.get(section, {}),
+                                          theirs_data.get(section, {}), conflicts)
+            if merged_section: merged[section] = merged_section
+    return merged, conflicts
+
+
+def ensure_item_uids(layout_data):
+    # uid の無いアイテムに uid を振る (振った数を返す)
+    count = 0
+    for item in layout_data.get("items", []):
+        if not item.get("uid"):
+            item["uid"] = new_item_uid(); count += 1
+    return count
+
+
+def format_diff(diff, new_data=None):
+    lines = []
+    new_items = index_items(new_data) if new_data is not None else {}
+    for name, (old_value, new_value) in diff["settings"].items():
+        lines.append(f"* general_settings.{name}: {old_value!r} -> {new_value!r}")
+    for section, changed in diff["sections"].items():
+        for key, (old_value, new_value) in changed.items():
+            state = "+" if old_value is None else "-" if new_value is None else "*"
+            lines.append(f"{state} {section}.{key}")
+    for key in diff["removed"]: lines.append(f"- {key}")
+    for key in diff["added"]:
+        item = new_items.get(key, {})
+        lines.append(f"+ {key} {item.get('widget_class_name') or item.get('type', '')} {item.get('text') or item.get('path') or ''}".rstrip())
+    for move in diff["moved"]: lines.append(f"~ {move['uid']} {tuple(move['from'])} -> {tuple(move['to'])}")
+    for change in diff["changed"]:
+        for name, (old_value, new_value) in change["fields"].items():
+            lines.append(f"* {change['uid']} {name}: {old_value!r} -> {new_value!r}")
+    return lines
+
+
+def _load(filepath):
+    with open(filepath, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="レイアウト JSON の差分表示と3方向マージ")
+    sub = parser.add_subparsers(dest="command", required=True)
+    diff_parser = sub.add_parser("diff")
+    diff_parser.add_argument("old"); diff_parser.add_argument("new")
+    diff_parser.add_argument("--json", action="store_true", help="結果を JSON で出力する")
+    merge_parser = sub.add_parser("merge")
+    merge_parser.add_argument("base"); merge_parser.add_argument("ours"); merge_parser.add_argument("theirs")
+    merge_parser.add_argument("-o", "--output", help="マージ結果の出力先 (省略時は標準出力)")
+    args = parser.parse_args(argv)
+
+    if args.command == "diff":
+        old_data, new_data = _load(args.old), _load(args.new)
+        diff = diff_layouts(old_data, new_data)
+        if args.json: print(json.dumps(diff, indent=2, ensure_ascii=False))
+        else:
+            for line in format_diff(diff, new_data): print(line)
+        return 0 if diff_is_empty(diff) else 1
+
+    merged, conflicts = merge_layouts(_load(args.base), _load(args.ours), _load(args.theirs))
+    text = json.dumps(merged, indent=4, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f: f.write(text)
+    else: print(text)
+    for conflict in conflicts:
+        target = conflict["uid"] or "general_settings"
+        if conflict["field"] is None: print(f"競合: {target} は片側で削除、もう片側で変更されています (変更を残しました)", file=sys.stderr)
+        else: print(f"競合: {target}.{conflict['field']} ours={conflict['ours']!r} theirs={conflict['theirs']!r} (ours を採用)", file=sys.stderr)
+    return 1 if conflicts else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+import argparse
+import json
+import os
+import random
+import uuid
+
+from PIL import Image
+
+# save_layout と同じスキーマの大規模レイアウト JSON を生成する
+#   python layout_generator.py --items 5000 --output big_layout.json --image-dir big_layout_assets
+
+WIDGET_CLASS_WEIGHTS = [("Button", 30), ("TLabel", 25), ("TEntry", 15), ("TCombobox", 15),
+                        ("Checkbutton", 8), ("Radiobutton", 7)]
+ANCHOR_WIDGET_CLASSES = {"Button", "TLabel", "Checkbutton", "Radiobutton"}
+FONT_FAMILIES = ["Helvetica", "Courier", "Times", "Yu Gothic UI", "Meiryo"]
+FONT_SIZES = [8, 9, 10, 12, 14, 18]
+ANCHORS = ["center", "w", "e", "nw", "ne", "sw", "se", "n", "s"]
+COLORS = ["#000000", "#333333", "#1f4e79", "#c00000", "#006100", "#7030a0", "#ffffff"]
+BG_COLORS = ["#f0f0f0", "#ffffff", "#dde8f5", "#fff2cc", "#e2efda"]
+
+
+def write_sample_images(image_dir, count=8, seed=0):
+    os.makedirs(image_dir, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        w, h = rng.randrange(24, 400), rng.randrange(24, 300)
+        path = os.path.join(image_dir, f"sample_{i}.png")
+        Image.new("RGB", (w, h), (rng.randrange(256), rng.randrange(256), rng.randrange(256))).save(path)
+        paths.append(path)
+    return paths
+
+
+def _make_uid(rng):
+    # seed が同じなら同じ uid になるように乱数から作る
+    return uuid.UUID(int=rng.getrandbits(128), version=4).hex
+
+
+def _make_widget_item(rng, index, x, y):
+    class_names = [name for name, _ in WIDGET_CLASS_WEIGHTS]
+    weights = [weight for _, weight in WIDGET_CLASS_WEIGHTS]
+    class_name = rng.choices(class_names, weights)[0]
+    item = {"type": "widget", "x": x, "y": y, "width": rng.randrange(60, 180), "height": rng.randrange(20, 40),
+            "widget_class_name": class_name, "widget_module": "ttk" if class_name.startswith("T") else "tk",
+            "text": f"{class_name.lstrip('T')} {index}",
+            "font": {"family": rng.choice(FONT_FAMILIES), "size": rng.choice(FONT_SIZES),
+                     "weight": rng.choice(["normal", "normal", "bold"]), "slant": rng.choice(["roman", "roman", "italic"])}}
+    if class_name in ANCHOR_WIDGET_CLASSES:
+        item["anchor"] = rng.choice(ANCHORS)
+    colors = {"fg": rng.choice(COLORS)}
+    if class_name in ("Button", "Checkbutton", "Radiobutton"):
+        colors["bg"] = rng.choice(BG_COLORS)
+    item["colors"] = colors
+    if class_name == "TCombobox":
+        item["values"] = [f"Item {n}" for n in range(1, rng.randrange(2, 8))]
+        item["text"] = item["values"][0]
+    elif class_name == "TEntry":
+        item["text"] = "" if rng.random() < 0.3 else f"entry {index}"
+    return item
+
+
+def make_synthetic_layout(num_items, image_paths, seed=0, image_ratio=0.1, canvas_size=(1600, 1200), grid_spacing=20):
+    rng = random.Random(seed)
+    items = []
+    for i in range(num_items):
+        x, y = rng.randrange(0, canvas_size[0] - 100), rng.randrange(0, canvas_size[1] - 40)
+        if image_paths and rng.random() < image_ratio:
+            items.append({"uid": _make_uid(rng), "type": "image", "x": x, "y": y, "width": rng.randrange(16, 160), "height": rng.randrange(16, 160),
+                          "path": rng.choice(image_paths)})
+        else:
+            items.append(dict(uid=_make_uid(rng), **_make_widget_item(rng, i, x, y)))
+    return {"general_settings": {"grid_spacing": grid_spacing, "canvas_size": list(canvas_size)}, "items": items}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="性能試験用の大規模レイアウト JSON を生成する")
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--image-dir", help="画像アイテム用のサンプル画像の出力先 (省略時は画像なし)")
+    parser.add_argument("--image-count", type=int, default=8)
+    parser.add_argument("--image-ratio", type=float, default=0.1)
+    parser.add_argument("--canvas-size", default="1600x1200")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    canvas_w, canvas_h = (int(v) for v in args.canvas_size.lower().split("x"))
+    image_paths = write_sample_images(args.image_dir, args.image_count, args.seed) if args.image_dir else []
+    layout = make_synthetic_layout(args.items, image_paths, seed=args.seed, image_ratio=args.image_ratio,
+                                   canvas_size=(canvas_w, canvas_h))
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(layout, f, indent=4, ensure_ascii=False)
+    print(f"{args.output}: {len(layout['items'])} items")
+
+
+if __name__ == "__main__":
+    main()
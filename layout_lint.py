@@ -0,0 +1,102 @@
+import argparse
+import bisect
+import heapq
+import json
+import sys
+
+from components import expand_layout_components
+
+# レイアウトの検査: アイテム同士の重なり、ウィンドウ外へのはみ出し、幅・高さ 0 のアイテム。
+# 重なりは x 方向の掃引線で調べる (開始 x でソートし、終了 x のヒープで区間を外す)。
+# 活動中の区間は y1 でソートして持つので、O(n log n + 候補数) で済む。
+#   python layout_lint.py layout.json [more.json ...] [--window-size 800x600] [--json]
+
+ISSUE_OVERLAP = "overlap"
+ISSUE_OFF_CANVAS = "off_canvas"
+ISSUE_ZERO_SIZE = "zero_size"
+ISSUE_LABELS = {ISSUE_OVERLAP: "重なり", ISSUE_OFF_CANVAS: "ウィンドウ外", ISSUE_ZERO_SIZE: "サイズ0"}
+
+
+def find_overlaps(bounds):
+    # bounds: [(キー, x1, y1, x2, y2), ...] -> [(キー1, キー2, 重なり部分の bbox), ...] (辺が接するだけは重なりとしない)
+    entries = sorted(bounds, key=lambda b: b[1])
+    expiry = [] # (x2, 登録順)
+    active_keys = [] # (y1, 登録順) をソートしたもの
+    active = {}
+    overlaps = []
+    for serial, (key, x1, y1, x2, y2) in enumerate(entries):
+        while expiry and expiry[0][0] <= x1:
+            _, old_serial = heapq.heappop(expiry)
+            old = active.pop(old_serial)
+            del active_keys[bisect.bisect_left(active_keys, (old[2], old_serial))]
+        # y1 が y2 より小さい活動中の区間だけが候補
+        for _, other_serial in active_keys[:bisect.bisect_left(active_keys, (y2,))]:
+            other_key, ox1, oy1, ox2, oy2 = active[other_serial]
+            if oy2 > y1:
+                overlaps.append((other_key, key, (max(x1, ox1), max(y1, oy1), min(x2, ox2), min(y2, oy2))))
+        active[serial] = (key, x1, y1, x2, y2)
+        bisect.insort(active_keys, (y1, serial))
+        heapq.heappush(expiry, (x2, serial))
+    return overlaps
+
+
+def lint_bounds(bounds, window_size=None):
+    issues = []
+    sized = []
+    for key, x1, y1, x2, y2 in bounds:
+        if x2 - x1 <= 0 or y2 - y1 <= 0:
+            issues.append({"kind": ISSUE_ZERO_SIZE, "items": [key], "bbox": (x1, y1, x2, y2)}); continue
+        sized.append((key, x1, y1, x2, y2))
+        if window_size and (x1 < 0 or y1 < 0 or x2 > window_size[0] or y2 > window_size[1]):
+            issues.append({"kind": ISSUE_OFF_CANVAS, "items": [key], "bbox": (x1, y1, x2, y2)})
+    for key_a, key_b, region in find_overlaps(sized):
+        issues.append({"kind": ISSUE_OVERLAP, "items": [key_a, key_b], "bbox": region})
+    return issues
+
+
+def layout_bounds(layout_data):
+    # 保存済みレイアウトの各アイテムを (番号, x1, y1, x2, y2) に (番号は items 内の順番。部品は展開してから渡す)
+    bounds = []
+    for index, item in enumerate(layout_data.get("items", [])):
+        x, y = item.get("x"), item.get("y")
+        if x is None or y is None: continue
+        bounds.append((index, x, y, x + (item.get("width") or 0), y + (item.get("height") or 0)))
+    return bounds
+
+
+def lint_layout_file(filepath, window_size=None):
+    with open(filepath, "r", encoding="utf-8") as f:
+        layout_data = json.load(f)
+    if window_size is None:
+        window_size = layout_data.get("general_settings", {}).get("canvas_size")
+    return lint_bounds(layout_bounds(expand_layout_components(layout_data)), window_size)
+
+
+def format_issue(issue, describe_item=str):
+    items = " / ".join(describe_item(key) for key in issue["items"])
+    return f"[{ISSUE_LABELS[issue['kind']]}] {items} {tuple(issue['bbox'])}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="保存済みレイアウト JSON の重なり・はみ出し・サイズ0を検査する")
+    parser.add_argument("layouts", nargs="+")
+    parser.add_argument("--window-size", help="ウィンドウサイズ (例: 800x600)。省略時はレイアウトの canvas_size")
+    parser.add_argument("--json", action="store_true", help="結果を JSON で出力する")
+    args = parser.parse_args(argv)
+
+    window_size = tuple(int(v) for v in args.window_size.lower().split("x")) if args.window_size else None
+    results = {}
+    for filepath in args.layouts:
+        results[filepath] = lint_layout_file(filepath, window_size)
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+    else:
+        for filepath, issues in results.items():
+            print(f"{filepath}: {len(issues)} 件")
+            for issue in issues:
+                print("  " + format_issue(issue, lambda index: f"items[{index}]"))
+    return 1 if any(results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
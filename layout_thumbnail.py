@@ -0,0 +1,248 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageDraw, ImageFont
+
+from asset_baker import file_digest
+from components import expand_layout_components
+from style_palette import TK_BG_CLASSES
+
+# 保存済みレイアウト JSON を Tk なしで PIL の画像に描く (一覧のプレビューや CI のスクリーンショット用)。
+# ウィジェットは矩形と文字、画像アイテムは縮小した画像で描く。
+# サムネイルは「レイアウト JSON の内容 + 参照している画像ファイルの内容 + 大きさ」のハッシュをキーにディスクへキャッシュする。
+#   python layout_thumbnail.py a.json b.json ... [--out DIR] [--size 320x240] [--jobs N]
+
+RENDERER_VERSION = 1 # 描き方を変えたら上げる (古いキャッシュを使わないように)
+DEFAULT_THUMBNAIL_SIZE = (320, 240)
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "layoutdesigner", "thumbnails")
+BACKGROUND_COLOR = "white"
+OUTLINE_COLOR = "#7a7a7a"
+WIDGET_FILLS = {"Button": "#e1e1e1", "TButton": "#e1e1e1", "Entry": "white", "TEntry": "white",
+                "Combobox": "white", "TCombobox": "white"}
+TEXT_COLOR = "black"
+DEFAULT_FONT_SIZE = 9
+TEXT_PADDING = 3
+
+
+def layout_image_paths(layout_data, base_dir=None):
+    # 画像アイテムが参照しているファイル (重複なし、見つからないものは元のパスのまま)
+    paths = []
+    for item in expand_layout_components(layout_data).get("items", []):
+        if item.get("type") == "image" and item.get("path"):
+            path = resolve_image_path(item["path"], base_dir)
+            if path not in paths: paths.append(path)
+    return paths
+
+
+def resolve_image_path(path, base_dir=None):
+    # 相対パスや、レイアウトと一緒に移動された画像はレイアウトのフォルダから探す
+    if os.path.exists(path) or base_dir is None: return path
+    for candidate in (os.path.join(base_dir, path), os.path.join(base_dir, os.path.basename(path))):
+        if os.path.exists(candidate): return candidate
+    return path
+
+
+def layout_canvas_size(layout_data):
+    size = layout_data.get("general_settings", {}).get("canvas_size")
+    if size and size[0] > 1 and size[1] > 1: return int(size[0]), int(size[1])
+    # 古いファイルは全アイテムが収まる大きさにする
+    items = layout_data.get("items", [])
+    width = max([(item.get("x") or 0) + (item.get("width") or 0) for item in items] or [1])
+    height = max([(item.get("y") or 0) + (item.get("height") or 0) for item in items] or [1])
+    return max(1, int(width)), max(1, int(height))
+
+
+def _load_font(size):
+    try: return ImageFont.load_default(size=max(1, size))
+    except TypeError: return ImageFont.load_default() # 古い Pillow は大きさを指定できない
+
+
+def _text_position(draw, text, font, box, anchor):
+    # Tk の anchor (n, ne, e, ..., center) に合わせて文字の左上を決める
+    x1, y1, x2, y2 = box
+    left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+    text_w, text_h = right - left, bottom - top
+    anchor = anchor or "center"
+    if "w" in anchor: x = x1 + TEXT_PADDING
+    elif "e" in anchor: x = x2 - TEXT_PADDING - text_w
+    else: x = (x1 + x2 - text_w) / 2
+    if anchor.startswith("n"): y = y1 + TEXT_PADDING
+    elif anchor.startswith("s"): y = y2 - TEXT_PADDING - text_h
+    else: y = (y1 + y2 - text_h) / 2
+    return x - left, y - top
+
+
+def _draw_widget(draw, item, scale, fonts):
+    x1, y1 = item["x"] * scale, item["y"] * scale
+    x2, y2 = x1 + max(1, (item.get("width") or 0) * scale), y1 + max(1, (item.get("height") or 0) * scale)
+    class_name = item.get("widget_class_name", "")
+    colors = item.get("colors", {})
+    fill = colors.get("bg") or WIDGET_FILLS.get(class_name)
+    outline = OUTLINE_COLOR if class_name in WIDGET_FILLS else None
+    if fill or outline:
+        draw.rectangle((x1, y1, x2, y2), fill=fill, outline=outline)
+    text_x1 = x1
+    if class_name in ("Checkbutton", "TCheckbutton", "Radiobutton", "TRadiobutton"):
+        # チェック欄・ラジオボタンの丸
+        mark = max(3, min(y2 - y1 - 2, 12 * scale))
+        mark_box = (x1 + 1, (y1 + y2 - mark) / 2, x1 + 1 + mark, (y1 + y2 + mark) / 2)
+        if "Radio" in class_name: draw.ellipse(mark_box, fill="white", outline=OUTLINE_COLOR)
+        else: draw.rectangle(mark_box, fill="white", outline=OUTLINE_COLOR)
+        text_x1 = mark_box[2] + 2
+    elif class_name in ("Combobox", "TCombobox"):
+        # 右端の ▼ ボタン
+        arrow = min(x2 - x1, y2 - y1)
+        draw.rectangle((x2 - arrow, y1, x2, y2), fill="#e1e1e1", outline=OUTLINE_COLOR)
+        center_x, center_y, half = x2 - arrow / 2, (y1 + y2) / 2, arrow / 5
+        draw.polygon([(center_x - half, center_y - half / 2), (center_x + half, center_y - half / 2), (center_x, center_y + half / 2)], fill=TEXT_COLOR)
+        x2 -= arrow
+    text = item.get("text") or ""
+    if not text: return
+    font_size = max(1, int(round(abs((item.get("font") or {}).get("size") or DEFAULT_FONT_SIZE) * scale * 4 / 3))) # pt -> px
+    font = fonts.get(font_size)
+    if font is None: font = fonts[font_size] = _load_font(font_size)
+    anchor = "w" if class_name in ("Entry", "TEntry", "Combobox", "TCombobox") else item.get("anchor")
+    position = _text_position(draw, text, font, (text_x1, y1, x2, y2), anchor)
+    draw.text(position, text, fill=colors.get("fg") or TEXT_COLOR, font=font)
+
+
+def _with_style(item, palette):
+    # スタイルを使うウィジェットはパレットの色・フォントで描く
+    spec = palette.get(item.get("style"))
+    if not spec: return item
+    colors = dict(item.get("colors", {}))
+    if spec.get("fg"): colors["fg"] = spec["fg"]
+    if spec.get("bg") and item.get("widget_class_name") in TK_BG_CLASSES: colors["bg"] = spec["bg"]
+    return dict(item, colors=colors, font=spec.get("font") or item.get("font"))
+
+
+def _draw_image(canvas, draw, item, scale, base_dir, decoded):
+    x, y = int(round(item["x"] * scale)), int(round(item["y"] * scale))
+    width = max(1, int(round((item.get("width") or 1) * scale))); height = max(1, int(round((item.get("height") or 1) * scale)))
+    path = resolve_image_path(item.get("path", ""), base_dir)
+    try:
+        source = decoded.get(path)
+        if source is None:
+            source = Image.open(path)
+            source.draft("RGB", canvas.size) # JPEG はサムネイル程度の大きさに縮小しながらデコードする
+            source = decoded[path] = source.convert("RGBA")
+        resized = source.resize((width, height), Image.Resampling.BILINEAR)
+        canvas.paste(resized, (x, y), resized)
+    except Exception as e:
+        # 読めない画像は × 印の枠にする
+        print(f"サムネイル用画像の読み込みエラー ({path}): {e}")
+        draw.rectangle((x, y, x + width, y + height), outline="red")
+        draw.line((x, y, x + width, y + height), fill="red"); draw.line((x, y + height, x + width, y), fill="red")
+
+
+def render_layout(layout_data, max_size=DEFAULT_THUMBNAIL_SIZE, base_dir=None):
+    # レイアウト全体を max_size に収まる大きさで描く (縦横比は保つ)
+    canvas_w, canvas_h = layout_canvas_size(layout_data)
+    scale = min(max_size[0] / canvas_w, max_size[1] / canvas_h)
+    canvas = Image.new("RGB", (max(1, int(round(canvas_w * scale))), max(1, int(round(canvas_h * scale)))), BACKGROUND_COLOR)
+    draw = ImageDraw.Draw(canvas)
+    fonts = {}; decoded = {}
+    palette = layout_data.get("palette", {})
+    for item in expand_layout_components(layout_data).get("items", []): # z 順に並んでいる
+        if item.get("x") is None or item.get("y") is None: continue
+        if item.get("type") == "widget": _draw_widget(draw, _with_style(item, palette), scale, fonts)
+        elif item.get("type") == "image": _draw_image(canvas, draw, item, scale, base_dir, decoded)
+    return canvas
+
+
+class ThumbnailCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_size=DEFAULT_THUMBNAIL_SIZE):
+        self.cache_dir = cache_dir
+        self.max_size = tuple(max_size)
+        self._image_digests = {} # 画像パス -> (mtime, サイズ, ハッシュ)。同じ画像を使うレイアウトが多いので使い回す
+        self.stats = {"hits": 0, "rendered": 0}
+
+    def _image_digest(self, path):
+        try: stat = os.stat(path)
+        except OSError: return f"missing:{path}"
+        cached = self._image_digests.get(path)
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size): return cached[2]
+        digest = file_digest(path)
+        self._image_digests[path] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+
+    def key_for(self, layout_bytes, layout_data, base_dir):
+        digest = hashlib.sha1(f"v{RENDERER_VERSION} {self.max_size[0]}x{self.max_size[1]}\n".encode())
+        digest.update(layout_bytes)
+        for path in layout_image_paths(layout_data, base_dir): digest.update(self._image_digest(path).encode())
+        return digest.hexdigest()
+
+    def thumbnail_path(self, layout_path):
+        # キャッシュ済みならそのまま、無ければ描いて保存する。戻り値は PNG のパス
+        with open(layout_path, "rb") as f: layout_bytes = f.read()
+        layout_data = json.loads(layout_bytes.decode("utf-8"))
+        base_dir = os.path.dirname(os.path.abspath(layout_path))
+        key = self.key_for(layout_bytes, layout_data, base_dir)
+        target = os.path.join(self.cache_dir, key[:2], f"{key}.png")
+        if os.path.exists(target):
+            self.stats["hits"] += 1; return target
+        image = render_layout(layout_data, self.max_size, base_dir)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # 途中まで書いたファイルを他のプロセスが読まないように、書き終えてから名前を変える
+        temp_path = f"{target}.{os.getpid()}.tmp"
+        image.save(temp_path, format="PNG")
+        os.replace(temp_path, target)
+        self.stats["rendered"] += 1
+        return target
+
+
+_worker_cache = None
+
+
+def _render_in_worker(layout_path, cache_dir, max_size):
+    global _worker_cache
+    if _worker_cache is None or _worker_cache.cache_dir != cache_dir or _worker_cache.max_size != tuple(max_size):
+        _worker_cache = ThumbnailCache(cache_dir, max_size)
+    try: return layout_path, _worker_cache.thumbnail_path(layout_path), None
+    except Exception as e: return layout_path, None, str(e)
+
+
+def submit_thumbnails(executor, layout_paths, cache_dir=DEFAULT_CACHE_DIR, max_size=DEFAULT_THUMBNAIL_SIZE):
+    # 戻り値: Future のリスト (結果は (レイアウトのパス, サムネイルのパス または None, エラー または None))
+    return [executor.submit(_render_in_worker, path, cache_dir, tuple(max_size)) for path in layout_paths]
+
+
+def render_thumbnails(layout_paths, cache_dir=DEFAULT_CACHE_DIR, max_size=DEFAULT_THUMBNAIL_SIZE, jobs=None):
+    # 複数のレイアウトをプロセスを分けて描く。戻り値は {レイアウトのパス: (サムネイルのパス, エラー)}
+    if jobs == 1 or len(layout_paths) < 2:
+        return {path: _render_in_worker(path, cache_dir, max_size)[1:] for path in layout_paths}
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return {path: (thumbnail, error) for path, thumbnail, error in
+                (future.result() for future in submit_thumbnails(executor, layout_paths, cache_dir, max_size))}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="レイアウト JSON のサムネイルを描く")
+    parser.add_argument("layouts", nargs="+")
+    parser.add_argument("--out", help="サムネイルを <レイアウト名>.png としてコピーする出力先 (CI のスクリーンショット用)")
+    parser.add_argument("--size", default=f"{DEFAULT_THUMBNAIL_SIZE[0]}x{DEFAULT_THUMBNAIL_SIZE[1]}", help="最大の大きさ (例: 320x240)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--jobs", type=int, default=None, help="並列に描くプロセス数 (省略時は CPU 数)")
+    args = parser.parse_args(argv)
+    max_size = tuple(int(v) for v in args.size.lower().split("x"))
+
+    results = render_thumbnails(args.layouts, args.cache_dir, max_size, args.jobs)
+    failed = 0
+    for layout_path, (thumbnail, error) in results.items():
+        if error:
+            failed += 1; print(f"{layout_path}: エラー: {error}", file=sys.stderr); continue
+        if args.out:
+            os.makedirs(args.out, exist_ok=True)
+            target = os.path.join(args.out, os.path.splitext(os.path.basename(layout_path))[0] + ".png")
+            with open(thumbnail, "rb") as src, open(target, "wb") as dst: dst.write(src.read())
+            thumbnail = target
+        print(f"{layout_path}: {thumbnail}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,7 @@ import tkinter as tk
 from tkinter import ttk
 from tkinter import filedialog
 import json
+import os
 import tkinter.font as tkfont
 from tkinter import colorchooser
 from PIL import Image, ImageTk
@@ -9,12 +10,43 @@ import tkinter.messagebox
 
 # --- Mixinクラスのインポート ---
 from event_handlers_mixin import EventHandlersMixin
+from multi_edit_mixin import MultiEditMixin
+from undo_mixin import UndoMixin
+from perf_hud_mixin import PerfHudMixin
+from perf_monitor import PerfMonitor, perf_timed
+from session_recording_mixin import SessionRecordingMixin
+from zorder_mixin import ZOrderMixin, SELECTION_LAYER_TAG
+from smart_guides_mixin import SmartGuidesMixin
+from align_mixin import AlignMixin
+from lint_mixin import LintMixin
+from component_mixin import ComponentMixin
+from group_mixin import GroupMixin
+from layout_browser_mixin import LayoutBrowserMixin
+from document_tabs_mixin import DocumentTabsMixin
+from style_palette_mixin import StylePaletteMixin
+from image_budget_mixin import ImageBudgetMixin
+from tiled_image_mixin import TiledImageMixin
+from tiled_image import is_huge_image
+from animated_image_mixin import AnimatedImageMixin
+from animated_image import is_animated_image, animation_code_lines
+from image_watcher_mixin import ImageWatcherMixin
+from live_preview_mixin import LivePreviewMixin
+from style_palette import styled_widget_options, palette_code_lines
+from components import COMPONENT_ITEM_TYPE, component_code_lines, component_app_method_lines
+from layout_diff import new_item_uid
+from item_records import WidgetItem, ImageItem
+from asset_baker import AssetBaker
+from codegen_table import TableCodeBuilder, LAZY_BATCH_SIZE
+from sprite_atlas import build_atlas_photos, is_sprite_size, bake_atlas_sheets, atlas_code_lines
 # from file_operations_mixin import FileOperationsMixin # 将来的に追加する場合
 # from ui_setup_mixin import UISetupMixin # 将来的に追加する場合
 
-class LayoutDesigner(tk.Tk, EventHandlersMixin):
+class LayoutDesigner(tk.Tk, EventHandlersMixin, MultiEditMixin, UndoMixin, PerfHudMixin, SessionRecordingMixin, ZOrderMixin, SmartGuidesMixin, AlignMixin, LintMixin, ComponentMixin, GroupMixin, LayoutBrowserMixin, DocumentTabsMixin, StylePaletteMixin, ImageBudgetMixin, TiledImageMixin, AnimatedImageMixin, ImageWatcherMixin, LivePreviewMixin):
     def __init__(self):
         super().__init__()
+        # --- 計測 (ウィジェット生成前に Tcl 呼び出しカウンタを組み込む) ---
+        self.perf_monitor = PerfMonitor()
+        self.perf_monitor.install_tcl_counter(self)
         self.title("GUI Layout Designer")
         self.geometry("1000x700")
 
@@ -28,6 +60,7 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
         self.grid_spacing = 20
         self.prop_grid_size = tk.IntVar(value=self.grid_spacing)
         self.canvas_items = []
+        self._image_press_bindings = {} # 画像アイテムID -> tag_bind が返した funcid
         
         self.selected_item_ids = set() 
         self.selected_widget = None 
@@ -48,6 +81,29 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
         self.resize_original_pil_image = None 
         self._updating_font_properties_internally = False
         self._updating_properties_internally = False
+        self._init_multi_edit_state()
+        self._init_undo_history()
+        self._init_perf_hud()
+        self._init_session_recording()
+        self._init_align_commands()
+        self._init_layout_lint()
+        self._init_components()
+        self._init_groups()
+        self._init_layout_browser()
+        self._init_document_tabs()
+        self._init_style_palette()
+        self._init_image_budget()
+        self._init_tiled_images()
+        self._init_animations()
+        self._init_image_watcher()
+        self._init_live_preview()
+        # --- コード生成オプション ---
+        self.codegen_bake_assets = tk.BooleanVar(value=False)
+        self.codegen_without_pil = tk.BooleanVar(value=False)
+        self.codegen_table_mode = tk.BooleanVar(value=False)
+        self.codegen_lazy_mode = tk.BooleanVar(value=False)
+        self.codegen_sprite_atlas = tk.BooleanVar(value=False)
+        self.use_sprite_atlas = tk.BooleanVar(value=True) # 読み込み時に小さい画像をアトラスにまとめる
 
         # --- Style Definitions for Anchor Buttons ---
         self.selected_anchor_style_name = "SelectedAnchor.TButton"
@@ -57,11 +113,14 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
 
         # --- UI Setup ---
         self.create_menu()
+        self._build_document_tabs()
         self.toolbox_frame = ttk.Frame(self, width=200, relief="sunken", borderwidth=2)
         self.toolbox_frame.pack(side="left", fill="y", padx=5, pady=5); self.toolbox_frame.pack_propagate(False)
         
         self.canvas_frame = tk.Canvas(self, bg="white", relief="sunken", borderwidth=2)
         self.canvas_frame.pack(side="left", expand=True, fill="both", padx=5, pady=5)
+        self._init_z_layers(self.canvas_frame)
+        self._init_smart_guides(self.canvas_frame)
         
         self.property_frame = ttk.Frame(self, width=250, relief="sunken", borderwidth=2)
         self.property_frame.pack(side="right", fill="y", padx=10, pady=5); self.property_frame.pack_propagate(False)
@@ -74,6 +133,9 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
         self.after(100, self.draw_grid)
 
         self.bind("<Delete>", self.on_delete_key_press)
+        self.bind("<Control-z>", self.undo_last_action)
+        self.bind("<Control-g>", lambda e: self.group_selection())
+        self.bind("<Control-G>", lambda e: self.ungroup_selection())
 
     def _set_font_ui_state(self, state):
         self.font_family_combo.config(state=state); self.font_size_spin.config(state=state)
@@ -102,9 +164,46 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
     def create_menu(self):
         menubar = tk.Menu(self); self.config(menu=menubar)
         file_menu = tk.Menu(menubar, tearoff=0); menubar.add_cascade(label="ファイル", menu=file_menu)
+        file_menu.add_command(label="新しいタブ", command=self.new_document, accelerator="Ctrl+T")
         file_menu.add_command(label="レイアウトを開く...", command=self.open_layout)
+        file_menu.add_command(label="プレビューから開く...", command=self.open_layout_with_previews)
         file_menu.add_command(label="レイアウトを保存...", command=self.save_layout)
+        file_menu.add_command(label="タブを閉じる", command=self.close_document, accelerator="Ctrl+W")
+        file_menu.add_separator()
+        file_menu.add_checkbutton(label="小さい画像をアトラスにまとめて読み込む", variable=self.use_sprite_atlas)
+        file_menu.add_command(label="元画像のメモリ上限...", command=self.set_image_budget)
+        file_menu.add_checkbutton(label="画像ファイルの変更を監視して読み直す", variable=self.watch_image_files)
         file_menu.add_separator(); file_menu.add_command(label="終了", command=self.quit)
+        edit_menu = tk.Menu(menubar, tearoff=0); menubar.add_cascade(label="編集", menu=edit_menu)
+        edit_menu.add_command(label="元に戻す", accelerator="Ctrl+Z", command=self.undo_last_action)
+        edit_menu.add_separator()
+        edit_menu.add_command(label="最前面へ移動", command=self.promote_selection)
+        edit_menu.add_command(label="最背面へ移動", command=self.send_selection_to_back)
+        edit_menu.add_separator()
+        edit_menu.add_checkbutton(label="スマートガイドに吸着", variable=self.smart_guides_enabled)
+        self._build_align_menu(edit_menu)
+        edit_menu.add_separator()
+        edit_menu.add_command(label="レイアウトを検査...", command=self.run_layout_lint)
+        self._build_component_menu(edit_menu)
+        self._build_group_menu(edit_menu)
+        self._build_style_menu(edit_menu)
+        perf_menu = tk.Menu(menubar, tearoff=0); menubar.add_cascade(label="計測", menu=perf_menu)
+        perf_menu.add_checkbutton(label="パフォーマンスHUDを表示", variable=self.show_perf_hud, command=self.toggle_perf_hud)
+        perf_menu.add_command(label="計測結果をJSONで保存...", command=self.export_perf_stats)
+        perf_menu.add_command(label="計測結果をリセット", command=self.reset_perf_stats)
+        perf_menu.add_separator()
+        perf_menu.add_checkbutton(label="操作を記録", variable=self.recording_session, command=self.toggle_session_recording)
+        perf_menu.add_command(label="記録した操作を再生...", command=self.replay_session_recording)
+        codegen_menu = tk.Menu(menubar, tearoff=0); menubar.add_cascade(label="コード生成", menu=codegen_menu)
+        codegen_menu.add_command(label="コード生成", command=self.generate_code)
+        codegen_menu.add_separator()
+        codegen_menu.add_checkbutton(label="画像をリサイズ済みPNGとして書き出す", variable=self.codegen_bake_assets)
+        codegen_menu.add_checkbutton(label="書き出した画像をPILなしで読み込む", variable=self.codegen_without_pil)
+        codegen_menu.add_checkbutton(label="テーブル形式で出力 (大規模レイアウト向け)", variable=self.codegen_table_mode)
+        codegen_menu.add_checkbutton(label="初期表示外のウィジェットを遅延生成 (テーブル形式)", variable=self.codegen_lazy_mode)
+        codegen_menu.add_checkbutton(label="小さい画像をスプライトアトラスにまとめる (画像書き出し時)", variable=self.codegen_sprite_atlas)
+        codegen_menu.add_separator()
+        codegen_menu.add_checkbutton(label="ライブプレビュー (別プロセスで生成アプリを表示)", variable=self.live_preview_enabled, command=self.toggle_live_preview)
 
     def setup_toolbox(self):
         ttk.Label(self.toolbox_frame, text="ツールボックス", font=("Helvetica", 14)).pack(pady=10)
@@ -130,6 +229,7 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
 
         ttk.Separator(self.toolbox_frame, orient='horizontal').pack(fill='x', pady=10, padx=5)
         ttk.Button(self.toolbox_frame, text="コード生成", command=self.generate_code).pack(fill="x", padx=10, pady=5)
+        self._build_image_budget_status(self.toolbox_frame)
         
     def setup_properties(self):
         ttk.Label(self.property_frame, text="プロパティエディタ", font=("Helvetica", 14)).pack(pady=10)
@@ -167,10 +267,10 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
         style_frame = ttk.Frame(font_frame); style_frame.pack(fill="x", pady=2)
         ttk.Label(style_frame, text="Style:", width=7).pack(side="left")
         self.prop_font_bold = tk.BooleanVar()
-        self.font_bold_check = ttk.Checkbutton(style_frame, text="Bold", variable=self.prop_font_bold, command=self.on_font_property_change)
+        self.font_bold_check = ttk.Checkbutton(style_frame, text="Bold", variable=self.prop_font_bold, command=lambda: self.on_font_style_toggle(self.font_bold_check))
         self.font_bold_check.pack(side="left")
         self.prop_font_italic = tk.BooleanVar()
-        self.font_italic_check = ttk.Checkbutton(style_frame, text="Italic", variable=self.prop_font_italic, command=self.on_font_property_change)
+        self.font_italic_check = ttk.Checkbutton(style_frame, text="Italic", variable=self.prop_font_italic, command=lambda: self.on_font_style_toggle(self.font_italic_check))
         self.font_italic_check.pack(side="left")
 
         ttk.Separator(self.property_frame, orient='horizontal').pack(fill='x', pady=10, padx=5)
@@ -241,44 +341,86 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
         self._set_color_ui_state("disabled")
 
     def add_image_to_canvas(self): 
-        filepath = filedialog.askopenfilename(
+        filepaths = filedialog.askopenfilenames(
             title="画像ファイルを選択",
             filetypes=[("画像ファイル", "*.png *.jpg *.jpeg *.gif *.bmp"), ("すべてのファイル", "*.*")]
         )
-        if not filepath: return
+        if not filepaths: return
+        max_dim = 200 
+        loaded_images = []
+        for filepath in filepaths:
+            try:
+                if is_huge_image(filepath):
+                    loaded_images.append((filepath, None, None)); continue # タイル表示 (全体は展開しない)
+                pil_image = Image.open(filepath)
+                current_pil_image = pil_image.copy() 
+                if current_pil_image.width > max_dim or current_pil_image.height > max_dim:
+                    current_pil_image.thumbnail((max_dim, max_dim), Image.Resampling.LANCZOS)
+                loaded_images.append((filepath, pil_image, current_pil_image))
+            except Exception as e: 
+                print(f"画像処理エラー: {e}")
+                tkinter.messagebox.showerror("画像エラー", f"画像の読み込みまたは処理中にエラーが発生しました:\n{e}")
+        atlas_photos = self._build_atlas_photo_map({i: current for i, (_, pil_image, current) in enumerate(loaded_images)
+                                                    if current is not None and not is_animated_image(pil_image)}) if len(loaded_images) > 1 else {}
+
+        for offset, (filepath, pil_image, current_pil_image) in enumerate(loaded_images):
+            try:
+                # 複数選択時はグリッド間隔ずつずらして重ねる
+                raw_x = self.canvas_frame.winfo_width() / 2 + offset * self.grid_spacing
+                raw_y = self.canvas_frame.winfo_height() / 2 + offset * self.grid_spacing
+                snapped_x, snapped_y = self._snap_to_grid(raw_x, raw_y)
+                if pil_image is None:
+                    self.create_tiled_image_item(filepath, snapped_x, snapped_y, max_dim=max_dim); continue
+                if is_animated_image(pil_image):
+                    self.retain_original_image(self.create_animated_image_item(filepath, snapped_x, snapped_y, current_pil_image.width,
+                                                                               current_pil_image.height, original_pil_image=pil_image))
+                    continue
+                tk_photo_image = atlas_photos.get(offset) or ImageTk.PhotoImage(current_pil_image)
+                
+                image_item_id = self.canvas_frame.create_image(snapped_x, snapped_y, image=tk_photo_image, anchor=tk.NW)
+                self.add_to_content_layer(image_item_id)
+                
+                item_info = ImageItem(image_item_id, tk_photo_image, filepath, current_pil_image.width, current_pil_image.height,
+                                      new_item_uid(), original_pil_image=pil_image)
+                self.canvas_items.append(item_info)
+                self.retain_original_image(item_info)
+                self.bind_image_item_press(image_item_id)
+            except Exception as e: 
+                print(f"画像処理エラー: {e}")
+                tkinter.messagebox.showerror("画像エラー", f"画像の読み込みまたは処理中にエラーが発生しました:\n{e}")
+        self.mark_live_preview_dirty() # 追加したアイテムはプレビューに送っていない ID として見つかる
+
+    def _build_atlas_photo_map(self, display_images):
+        # display_images: {キー: 表示サイズの PIL 画像}。小さい画像だけをアトラス経由の PhotoImage にする
+        if not self.use_sprite_atlas.get(): return {}
+        keys = [key for key, image in display_images.items() if is_sprite_size(*image.size)]
+        if len(keys) < 2: return {}
         try:
-            pil_image = Image.open(filepath)
-            max_dim = 200 
-            
-            current_pil_image = pil_image.copy() 
-            if current_pil_image.width > max_dim or current_pil_image.height > max_dim:
-                current_pil_image.thumbnail((max_dim, max_dim), Image.Resampling.LANCZOS)
+            return dict(zip(keys, build_atlas_photos(self, [display_images[key] for key in keys])))
+        except Exception as e:
+            print(f"アトラス作成エラー (個別に読み込みます): {e}"); return {}
 
-            tk_photo_image = ImageTk.PhotoImage(current_pil_image)
-            
-            raw_x = self.canvas_frame.winfo_width() / 2
-            raw_y = self.canvas_frame.winfo_height() / 2
-            snapped_x, snapped_y = self._snap_to_grid(raw_x, raw_y)
-            
-            image_item_id = self.canvas_frame.create_image(snapped_x, snapped_y, image=tk_photo_image, anchor=tk.NW)
-            
-            item_info = {
-                'id': image_item_id, 
-                'type': 'image', 
-                'obj': tk_photo_image, 
-                'path': filepath, 
-                'width': current_pil_image.width, 
-                'height': current_pil_image.height, 
-                'original_pil_image': pil_image 
-            }
-            self.canvas_items.append(item_info)
-            self.canvas_frame.tag_bind(image_item_id, "<ButtonPress-1>", 
-                                       lambda e, i_id=image_item_id: self.on_canvas_item_press(e, i_id))
-        except Exception as e: 
-            print(f"画像処理エラー: {e}")
-            tkinter.messagebox.showerror("画像エラー", f"画像の読み込みまたは処理中にエラーが発生しました:\n{e}")
-
-    def add_widget(self, widget_type, text=None, x=None, y=None, values=None, font_info=None, colors=None, width=None, height=None, anchor=None):
+    def _load_layout_images(self, items_data):
+        # 同じファイルは1回だけ開く。戻り値は {items_data の番号: (元画像, 表示サイズ画像)、例外、またはタイル表示なら None}
+        decoded_by_path = {}; loaded = {}
+        for index, info in enumerate(items_data):
+            if info.get('type') != 'image': continue
+            try:
+                if is_huge_image(info['path']):
+                    loaded[index] = None; continue # タイル表示 (load_layout_data で作る)
+                pil_image_orig = decoded_by_path.get(info['path'])
+                if pil_image_orig is None:
+                    pil_image_orig = decoded_by_path[info['path']] = Image.open(info['path'])
+                load_w, load_h = info.get('width'), info.get('height')
+                saved_pil_width = int(load_w if load_w is not None else pil_image_orig.width)
+                saved_pil_height = int(load_h if load_h is not None else pil_image_orig.height)
+                loaded[index] = (pil_image_orig, pil_image_orig.resize((saved_pil_width, saved_pil_height), Image.Resampling.LANCZOS))
+            except Exception as e: loaded[index] = e
+        return loaded
+
+    def add_widget(self, widget_type, text=None, x=None, y=None, values=None, font_info=None, colors=None, width=None, height=None, anchor=None, uid=None, style=None):
+        if style not in self.palette: style = None
+        if style: font_info = colors = None # 見た目はスタイルから取る
         font_tuple = None
         if font_info:
             family = font_info.get('family', tkfont.nametofont("TkDefaultFont").actual()["family"])
@@ -333,6 +475,7 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
         canvas_y = y if y is not None else self.canvas_frame.winfo_height() / 2
         
         canvas_id = self.canvas_frame.create_window(canvas_x, canvas_y, window=w)
+        self.add_to_content_layer(canvas_id)
         
         if width is not None and height is not None:
             try:
@@ -354,20 +497,16 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
         final_center_y = snapped_tl_y + actual_widget_height / 2
         self.canvas_frame.coords(canvas_id, final_center_x, final_center_y)
 
-        item_info = {
-            'id': canvas_id, 
-            'type': 'widget', 
-            'obj': w, 
-            'widget_type': widget_type,
-            'width': actual_widget_width, 
-            'height': actual_widget_height
-            }
+        item_info = WidgetItem(canvas_id, w, widget_type, actual_widget_width, actual_widget_height, uid or new_item_uid())
         self.canvas_items.append(item_info)
+        if style: self._apply_style_to_widgets(style, [item_info])
+        self.mark_live_preview_dirty([canvas_id])
         
         w.bind("<ButtonPress-1>", lambda e, i_id=canvas_id: [self.canvas_frame.focus_set(), self.on_canvas_item_press(e, i_id)])
         # --- 追加: widgetにもドラッグ・リリースイベントをバインド ---
         w.bind("<B1-Motion>", lambda e, i_id=canvas_id: self.on_multi_item_drag(e))
         w.bind("<ButtonRelease-1>", lambda e, i_id=canvas_id: self.on_multi_item_release(e))
+        return canvas_id
 
 
     def update_property_editor_for_selection(self):
@@ -376,15 +515,16 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
 
         if len(self.selected_item_ids) == 1:
             single_id = list(self.selected_item_ids)[0]
-            item_info = next((item for item in self.canvas_items if item['id'] == single_id), None)
+            item_info = next((item for item in self.canvas_items if item.id == single_id), None)
             if item_info:
                 self.selected_item_info = item_info 
-                if item_info['type'] == 'widget':
-                    self.selected_widget = item_info['obj']
+                if item_info.type == 'widget':
+                    self.selected_widget = item_info.obj
         
         self.update_property_editor()
 
 
+    @perf_timed()
     def on_multi_item_drag(self, event):
         if not self._dragged_item_id or not self.selected_item_ids or self.active_resize_handle:
             print(f"[DEBUG] on_multi_item_drag: drag条件不成立 _dragged_item_id={self._dragged_item_id}, selected_item_ids={self.selected_item_ids}, active_resize_handle={self.active_resize_handle}")
@@ -420,6 +560,10 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
             print(f"[DEBUG] on_multi_item_drag: snapped_primary_tl_x={snapped_primary_tl_x}, snapped_primary_tl_y={snapped_primary_tl_y}")
             print(f"[DEBUG] on_multi_item_drag: effective_delta_x={effective_delta_x}, effective_delta_y={effective_delta_y}")
 
+        # 他のアイテムの辺・中心線が近ければグリッドより優先して吸着する
+        effective_delta_x, effective_delta_y = self.snap_drag_delta(self._drag_selected_items_start_bboxes,
+                                                                    (drag_delta_x, drag_delta_y), (effective_delta_x, effective_delta_y))
+
         for item_id in self.selected_item_ids:
             if item_id in self._drag_selected_items_start_bboxes:
                 start_bbox = self._drag_selected_items_start_bboxes[item_id]
@@ -428,22 +572,25 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
                 new_top_left_y = start_bbox[1] + effective_delta_y
                 print(f"[DEBUG] on_multi_item_drag: item_id={item_id}, new_top_left_x={new_top_left_x}, new_top_left_y={new_top_left_y}")
 
-                item_info = next((item for item in self.canvas_items if item['id'] == item_id), None)
+                item_info = next((item for item in self.canvas_items if item.id == item_id), None)
                 if item_info:
-                    if item_info['type'] == 'widget':
-                        w = item_info['obj']
-                        width = item_info.get('width', start_bbox[2] - start_bbox[0])
-                        height = item_info.get('height', start_bbox[3] - start_bbox[1])
+                    if item_info.type == 'widget':
+                        w = item_info.obj
+                        width = item_info.width
+                        height = item_info.height
                         center_x = new_top_left_x + width / 2
                         center_y = new_top_left_y + height / 2
                         self.canvas_frame.coords(item_id, center_x, center_y)
-                    elif item_info['type'] == 'image':
+                    elif item_info.type == 'image':
                         self.canvas_frame.coords(item_id, new_top_left_x, new_top_left_y)
         
         self.update_highlight()
 
     def on_multi_item_release(self, event):
         print(f"[DEBUG] on_multi_item_release: selected_item_ids={self.selected_item_ids}, _dragged_item_id={self._dragged_item_id}")
+        self.end_guide_drag()
+        self.end_group_drag(self._dragged_item_id, self._drag_selected_items_start_bboxes)
+        self.mark_live_preview_dirty(self._drag_selected_items_start_bboxes)
         self._dragged_item_id = None
         self._drag_selected_items_start_bboxes.clear()
         
@@ -460,12 +607,12 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
 
         if num_selected == 1:
             single_id = list(self.selected_item_ids)[0]
-            single_selected_item_info = next((item for item in self.canvas_items if item['id'] == single_id), None)
-            if single_selected_item_info and single_selected_item_info['type'] == 'widget':
-                widget_obj = single_selected_item_info['obj']
+            single_selected_item_info = next((item for item in self.canvas_items if item.id == single_id), None)
+            if single_selected_item_info and single_selected_item_info.type == 'widget':
+                widget_obj = single_selected_item_info.obj
         
-        is_single_widget_selected = (num_selected == 1 and single_selected_item_info and single_selected_item_info['type'] == 'widget')
-        is_single_image_selected = (num_selected == 1 and single_selected_item_info and single_selected_item_info['type'] == 'image')
+        is_single_widget_selected = (num_selected == 1 and single_selected_item_info and single_selected_item_info.type == 'widget')
+        is_single_image_selected = (num_selected == 1 and single_selected_item_info and single_selected_item_info.type == 'image')
         is_multi_selected = num_selected > 1
 
         self.text_entry.config(state="normal" if is_single_widget_selected else "disabled")
@@ -477,6 +624,7 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
         
         self._set_color_ui_state("normal" if is_single_widget_selected else "disabled", widget_obj)
         self.delete_button.config(state="normal" if num_selected > 0 else "disabled")
+        self._set_font_indeterminate(False, False)
 
         if is_single_widget_selected and widget_obj and widget_obj.winfo_exists():
             self._updating_properties_internally = True 
@@ -529,16 +677,19 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
         elif is_single_image_selected:
             self.prop_text.set("[Image Selected]"); self.prop_values.set(""); self.prop_anchor.set("")
         elif is_multi_selected:
-            self.prop_text.set(f"[{num_selected} items selected]"); self.prop_values.set(""); self.prop_anchor.set("")
+            self.populate_multi_selection_editor(num_selected)
         else: 
             self.prop_text.set(""); self.prop_values.set(""); self.prop_anchor.set("")
 
 
+    @perf_timed()
     def update_highlight(self):
         for rect_id in self.highlight_rects.values():
             self.canvas_frame.delete(rect_id)
         self.highlight_rects.clear()
         self.canvas_frame.delete(self.ALL_RESIZE_HANDLES_TAG)
+        self._draw_group_frames()
+        self._schedule_tile_refresh() # 移動で見えるようになったタイルを描き足す
 
         if not self.selected_item_ids:
             return
@@ -550,11 +701,13 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
                 x1, y1, x2, y2 = coords
                 rect_id = self.canvas_frame.create_rectangle(
                     x1 - 1, y1 - 1, x2 + 1, y2 + 1, 
-                    outline="gray", dash=(3,3), tags="multi_highlight_rect" 
+                    outline="gray", dash=(3,3), tags=("multi_highlight_rect", SELECTION_LAYER_TAG)
                 )
                 self.highlight_rects[item_id] = rect_id
             except tk.TclError:
                 pass 
+        if len(self.selected_item_ids) > 1:
+            self.place_selection_overlays()
 
         if len(self.selected_item_ids) == 1:
             single_id = list(self.selected_item_ids)[0]
@@ -568,12 +721,12 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
                 x1, y1, x2, y2 = coords
                 primary_highlight_id = self.canvas_frame.create_rectangle(
                     x1 - 2, y1 - 2, x2 + 2, y2 + 2, 
-                    outline="blue", width=1, tags="primary_highlight_rect"
+                    outline="blue", width=1, tags=("primary_highlight_rect", SELECTION_LAYER_TAG)
                 )
                 self.highlight_rects[single_id] = primary_highlight_id 
 
-                item_info = next((item for item in self.canvas_items if item['id'] == single_id), None)
-                if item_info and (item_info['type'] == 'image' or item_info['type'] == 'widget'):
+                item_info = next((item for item in self.canvas_items if item.id == single_id), None)
+                if item_info and (item_info.type == 'image' or item_info.type == 'widget'):
                     s = self.RESIZE_HANDLE_SIZE / 2
                     handle_defs = {
                         'nw': (x1,y1), 'n': ((x1+x2)/2,y1), 'ne': (x2,y1),
@@ -589,9 +742,8 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
                         self.canvas_frame.tag_bind(handle_id, "<Enter>", lambda e, ht=h_type: self.on_handle_enter(e, ht))
                         self.canvas_frame.tag_bind(handle_id, "<Leave>", self.on_handle_leave)
                         self.canvas_frame.tag_bind(handle_id, "<ButtonPress-1>", lambda e, ht=h_type: self.on_resize_handle_press(e, ht))
-                    
-                    self.canvas_frame.tag_raise(self.ALL_RESIZE_HANDLES_TAG)
-                    self.canvas_frame.tag_raise(primary_highlight_id)
+
+                self.place_selection_overlays()
             except tk.TclError: 
                 self.deselect_all() 
 
@@ -601,6 +753,8 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
         if not self.selected_widget or not self.selected_widget.winfo_exists() or len(self.selected_item_ids) != 1:
             return
 
+        self.invalidate_smart_guides(self.selected_item_ids) # テキストでウィジェットの大きさが変わる
+        self.invalidate_group_bounds(self.selected_item_ids)
         new_text_from_prop_editor = self.prop_text.get()
         new_values_from_prop_editor = self.prop_values.get()
 
@@ -627,11 +781,16 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
 
     def on_font_property_change(self, *args):
         if self._updating_properties_internally or self._updating_font_properties_internally: return
+        if len(self.selected_item_ids) > 1:
+            self.apply_multi_font_change(); return
         if not self.selected_widget or not self.selected_widget.winfo_exists() or len(self.selected_item_ids) != 1:
             return
         
         family = self.prop_font_family.get(); size = self.prop_font_size.get()
         if not family or size <= 0: return 
+        self.detach_widget_styles(self.selected_item_ids)
+        self.invalidate_smart_guides(self.selected_item_ids)
+        self.invalidate_group_bounds(self.selected_item_ids)
         style_parts = []
         if self.prop_font_bold.get(): style_parts.append("bold")
         if self.prop_font_italic.get(): style_parts.append("italic")
@@ -642,6 +801,8 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
 
     def on_anchor_button_click(self, new_anchor_value):
         if self._updating_properties_internally: return
+        if len(self.selected_item_ids) > 1:
+            self.apply_multi_anchor_change(new_anchor_value); return
         if not self.selected_widget or not self.selected_widget.winfo_exists() or len(self.selected_item_ids) != 1:
             return
         
@@ -649,6 +810,7 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
             try:
                 self.selected_widget.config(anchor=new_anchor_value)
                 self.prop_anchor.set(new_anchor_value) 
+                self.mark_live_preview_dirty(self.selected_item_ids)
 
                 for r_idx, row_buttons_dict in self.anchor_buttons.items():
                     for c_idx, button_widget in row_buttons_dict.items():
@@ -659,31 +821,46 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
 
 
     def on_fg_color_change(self, *args):
-        if self._updating_properties_internally or not self.selected_widget or not self.selected_widget.winfo_exists() or len(self.selected_item_ids) != 1: return
+        if self._updating_properties_internally: return
+        if len(self.selected_item_ids) > 1:
+            color = self.prop_fg_color.get()
+            if len(color) >= 4 and color.startswith('#'): self.apply_multi_color_change('fg', color)
+            return
+        if not self.selected_widget or not self.selected_widget.winfo_exists() or len(self.selected_item_ids) != 1: return
         color = self.prop_fg_color.get()
         if len(color) >= 4 and color.startswith('#'): 
+            self.detach_widget_styles(self.selected_item_ids)
             try:
                 opt_name = 'foreground' if isinstance(self.selected_widget, (ttk.Label, ttk.Entry, ttk.Combobox)) else 'fg'
                 self.selected_widget.config(**{opt_name: color}); self.fg_color_preview.config(bg=color)
+                self.mark_live_preview_dirty(self.selected_item_ids)
             except tk.TclError: pass 
 
     def on_bg_color_change(self, *args):
-        if self._updating_properties_internally or not self.selected_widget or not self.selected_widget.winfo_exists() or len(self.selected_item_ids) != 1: return
+        if self._updating_properties_internally: return
+        if len(self.selected_item_ids) > 1:
+            color = self.prop_bg_color.get()
+            if len(color) >= 4 and color.startswith('#'): self.apply_multi_color_change('bg', color)
+            return
+        if not self.selected_widget or not self.selected_widget.winfo_exists() or len(self.selected_item_ids) != 1: return
         if isinstance(self.selected_widget, (tk.Button, tk.Checkbutton, tk.Radiobutton)):
             color = self.prop_bg_color.get()
             if len(color) >= 4 and color.startswith('#'):
-                try: self.selected_widget.config(background=color); self.bg_color_preview.config(bg=color)
+                self.detach_widget_styles(self.selected_item_ids)
+                try:
+                    self.selected_widget.config(background=color); self.bg_color_preview.config(bg=color)
+                    self.mark_live_preview_dirty(self.selected_item_ids)
                 except tk.TclError: pass
         else: pass
 
     def open_fg_color_chooser(self):
-        if self.selected_widget and self.fg_color_button['state'] != 'disabled' and len(self.selected_item_ids) == 1:
+        if self.fg_color_button['state'] != 'disabled' and (len(self.selected_item_ids) > 1 or (self.selected_widget and len(self.selected_item_ids) == 1)):
             init_color = self.prop_fg_color.get() if self.prop_fg_color.get() else "#000000"
             code = colorchooser.askcolor(title="文字色を選択", initialcolor=init_color)
             if code and code[1]: self.prop_fg_color.set(code[1])
 
     def open_bg_color_chooser(self):
-        if self.selected_widget and self.bg_color_button['state'] != 'disabled' and len(self.selected_item_ids) == 1:
+        if self.bg_color_button['state'] != 'disabled' and (len(self.selected_item_ids) > 1 or (self.selected_widget and len(self.selected_item_ids) == 1)):
             init_color = self.prop_bg_color.get() if self.prop_bg_color.get() else "#F0F0F0"
             code = colorchooser.askcolor(title="背景色を選択", initialcolor=init_color)
             if code and code[1]: self.prop_bg_color.set(code[1])
@@ -701,7 +878,7 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
         if len(self.selected_item_ids) != 1: return 
         
         single_id = list(self.selected_item_ids)[0]
-        self.selected_item_info = next((item for item in self.canvas_items if item['id'] == single_id), None)
+        self.selected_item_info = next((item for item in self.canvas_items if item.id == single_id), None)
         if not self.selected_item_info: return
 
         self.active_resize_handle = handle_type
@@ -711,17 +888,17 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
         self.resize_start_mouse_y = event.y_root - self.canvas_frame.winfo_rooty()
         self.resize_start_item_bbox = self.canvas_frame.bbox(single_id)
         
-        if self.selected_item_info['type'] == 'image':
-            if 'original_pil_image' in self.selected_item_info:
-                 self.resize_original_pil_image = self.selected_item_info['original_pil_image'].copy()
-            else: 
-                try:
-                    self.resize_original_pil_image = Image.open(self.selected_item_info['path'])
-                except Exception as e:
-                    print(f"リサイズ用元画像読み込みエラー: {e}")
-                    tkinter.messagebox.showerror("リサイズエラー", f"リサイズ用の元画像を読み込めませんでした:\n{e}")
-                    self.active_resize_handle = None; return
-        elif self.selected_item_info['type'] == 'widget':
+        if self.selected_item_info.tiled:
+            self.resize_original_pil_image = None # タイル表示の画像は見えているタイルだけを描き直す
+        elif self.selected_item_info.type == 'image':
+            # 手放した元画像は開き直す (リサイズは元画像を書き換えないので複製はしない)
+            try:
+                self.resize_original_pil_image = self.original_image_for(self.selected_item_info)
+            except Exception as e:
+                print(f"リサイズ用元画像読み込みエラー: {e}")
+                tkinter.messagebox.showerror("リサイズエラー", f"リサイズ用の元画像を読み込めませんでした:\n{e}")
+                self.active_resize_handle = None; return
+        elif self.selected_item_info.type == 'widget':
             self.resize_original_pil_image = None 
         
         self.canvas_frame.unbind("<B1-Motion>")
@@ -729,13 +906,14 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
         self.canvas_frame.bind("<B1-Motion>", self.on_resize_handle_drag)
         self.canvas_frame.bind("<ButtonRelease-1>", self.on_resize_handle_release)
 
+    @perf_timed()
     def on_resize_handle_drag(self, event): 
         if not all([self.active_resize_handle, self.selected_item_info, self.resize_start_item_bbox]):
-            if not (self.selected_item_info and self.selected_item_info['type'] == 'image' and self.resize_original_pil_image) and \
-               not (self.selected_item_info and self.selected_item_info['type'] == 'widget'):
+            if not (self.selected_item_info and self.selected_item_info.type == 'image' and self.resize_original_pil_image) and \
+               not (self.selected_item_info and self.selected_item_info.type == 'widget'):
                  return
         
-        single_id = self.selected_item_info['id']
+        single_id = self.selected_item_info.id
 
         mouse_x_canvas = event.x_root - self.canvas_frame.winfo_rootx()
         mouse_y_canvas = event.y_root - self.canvas_frame.winfo_rooty()
@@ -787,9 +965,8 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
 
         item_info = self.selected_item_info 
 
-        if item_info['type'] == 'image':
-            orig_pil_w = self.resize_original_pil_image.width 
-            orig_pil_h = self.resize_original_pil_image.height
+        if item_info.type == 'image':
+            orig_pil_w, orig_pil_h = item_info.source.size if item_info.tiled else self.resize_original_pil_image.size
             aspect_ratio = orig_pil_w / orig_pil_h if orig_pil_h > 0 else 1.0
             final_pil_w, final_pil_h = new_bbox_w, new_bbox_h
             if len(handle) == 2: 
@@ -809,25 +986,35 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
             elif handle == 'w': new_x1_calc = new_x2 - final_pil_w; new_y1_calc = new_y1 + (new_bbox_h - final_pil_h) / 2
             elif handle == 'e': new_x1_calc = new_x1; new_y1_calc = new_y1 + (new_bbox_h - final_pil_h) / 2
             try:
-                resized_pil = self.resize_original_pil_image.resize((final_pil_w, final_pil_h), Image.Resampling.LANCZOS)
-                self._update_canvas_image(single_id, resized_pil) 
-                self.canvas_frame.coords(single_id, int(round(new_x1_calc)), int(round(new_y1_calc)))
-                item_info['width'] = final_pil_w; item_info['height'] = final_pil_h
+                if item_info.tiled:
+                    self.canvas_frame.coords(single_id, int(round(new_x1_calc)), int(round(new_y1_calc)))
+                    self.render_tiled_item(item_info, final_pil_w, final_pil_h)
+                else:
+                    resized_pil = self.resize_original_pil_image.resize((final_pil_w, final_pil_h), Image.Resampling.LANCZOS)
+                    self._update_canvas_image(single_id, resized_pil) 
+                    self.canvas_frame.coords(single_id, int(round(new_x1_calc)), int(round(new_y1_calc)))
+                item_info.width = final_pil_w; item_info.height = final_pil_h
             except Exception as e: print(f"Image resize drag error: {e}")
 
-        elif item_info['type'] == 'widget':
+        elif item_info.type == 'widget':
             final_center_x = new_x1 + new_bbox_w / 2
             final_center_y = new_y1 + new_bbox_h / 2
             try:
                 self.canvas_frame.itemconfig(single_id, width=int(new_bbox_w), height=int(new_bbox_h))
                 self.canvas_frame.coords(single_id, final_center_x, final_center_y)
-                item_info['width'] = int(new_bbox_w)
-                item_info['height'] = int(new_bbox_h)
+                item_info.width = int(new_bbox_w)
+                item_info.height = int(new_bbox_h)
             except Exception as e: print(f"Widget resize drag error: {e}")
         
         self.update_highlight() 
 
     def on_resize_handle_release(self, event):
+        if self.selected_item_info and self.selected_item_info.animated and self.active_resize_handle:
+            # ドラッグ中は1コマ目だけを縮尺して描いているので、新しいサイズのコマに差し替える
+            try: self.resize_animated_item(self.selected_item_info, self.selected_item_info.width, self.selected_item_info.height)
+            except Exception as e: print(f"アニメーション画像のリサイズエラー: {e}")
+        self.invalidate_smart_guides(self.selected_item_ids)
+        self.invalidate_group_bounds(self.selected_item_ids)
         self.active_resize_handle = None
         self.resize_original_pil_image = None 
         self.resize_start_item_bbox = None
@@ -845,14 +1032,14 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
 
     def _update_canvas_image(self, item_id_to_update, new_pil_image):
         if not item_id_to_update or not new_pil_image: return 
-        item_info = next((item for item in self.canvas_items if item['id'] == item_id_to_update and item['type'] == 'image'), None)
+        item_info = next((item for item in self.canvas_items if item.id == item_id_to_update and item.type == 'image'), None)
         if not item_info: 
             print(f"Error: Could not find image item_info for ID {item_id_to_update}")
             return
         try:
             new_tk_photo = ImageTk.PhotoImage(new_pil_image)
             self.canvas_frame.itemconfig(item_id_to_update, image=new_tk_photo)
-            item_info['obj'] = new_tk_photo 
+            item_info.obj = new_tk_photo 
         except Exception as e:
             print(f"キャンバス画像の更新エラー (_update_canvas_image): {e}")
             tkinter.messagebox.showerror("画像更新エラー", f"画像の更新中にエラーが発生しました:\n{e}")
@@ -875,7 +1062,7 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
             print(f"グリッドサイズ変更エラー: {e}")
             if hasattr(self, 'grid_spacing'):
                 self.prop_grid_size.set(self.grid_spacing)
-    def on_canvas_resize(self, event): self.draw_grid()
+    def on_canvas_resize(self, event): self.draw_grid(); self._schedule_tile_refresh(); self.mark_live_preview_dirty()
 
     def on_delete_key_press(self, event):
         widget_with_focus = self.focus_get()
@@ -887,24 +1074,31 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
 
     def delete_selected_item(self): # Now deletes all in self.selected_item_ids
         if not self.selected_item_ids: return
-
-        ids_to_delete = list(self.selected_item_ids) 
-        for item_id in ids_to_delete:
-            item_to_delete_info = None
-            item_index = -1
-            for i, item_info_iter in enumerate(self.canvas_items):
-                if item_info_iter['id'] == item_id:
-                    item_to_delete_info = item_info_iter
-                    item_index = i
-                    break
-            
-            if item_to_delete_info:
-                self.canvas_frame.delete(item_id)
-                if item_index != -1:
-                    del self.canvas_items[item_index]
-        
+        ids_to_delete = set(self.selected_item_ids)
+        self.invalidate_smart_guides(ids_to_delete)
+        self.forget_group_items(ids_to_delete)
+        items_to_delete = [item for item in self.canvas_items if item.id in ids_to_delete]
+        self.canvas_items[:] = [item for item in self.canvas_items if item.id not in ids_to_delete]
+        self.destroy_canvas_items(items_to_delete)
         self.deselect_all() 
 
+    def destroy_canvas_items(self, items):
+        # キャンバスから消すアイテムの Tk 側の資源も手放す。ウィジェットは消しても canvas_frame の子として残るので destroy し、
+        # 画像の tag_bind のコールバック (Tcl コマンド) も項目を消しただけでは残るので、覚えておいた funcid で外す
+        for item in items:
+            if item.type == 'widget': item.obj.destroy()
+            else:
+                funcid = self._image_press_bindings.pop(item.id, None)
+                if funcid: self.canvas_frame.tag_unbind(item.id, "<ButtonPress-1>", funcid)
+            self.canvas_frame.delete(item.id)
+        self.release_original_images(items); self.stop_animations(items)
+        for item in items: item.obj = None # PhotoImage を手放す
+
+    def bind_image_item_press(self, image_id):
+        self._image_press_bindings[image_id] = self.canvas_frame.tag_bind(
+            image_id, "<ButtonPress-1>", lambda e, i_id=image_id: self.on_canvas_item_press(e, i_id))
+
+    @perf_timed()
     def draw_grid(self):
         self.canvas_frame.delete("grid_line")
         w, h = self.canvas_frame.winfo_width(), self.canvas_frame.winfo_height()
@@ -931,88 +1125,132 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
                  except Exception: pass 
             return []
 
-    def save_layout(self):
-        filepath = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON Files", "*.json")], title="レイアウトを保存")
-        if not filepath: return
-        
-        full_layout_data = {"general_settings": {"grid_spacing": self.grid_spacing}, "items": []}
-        
-        for item_info_loop in self.canvas_items: 
-            item_id = item_info_loop['id']
-            item_type = item_info_loop['type']
-            
-            bbox = self.canvas_frame.bbox(item_id) 
-            if not bbox: continue
+    def _serialize_item(self, item_info_loop):
+        # save_layout 形式のアイテム (z 以外)。bbox が取れなければ None
+        item_id = item_info_loop.id
+        item_type = item_info_loop.type
 
-            top_left_x, top_left_y = bbox[0], bbox[1]
-            item_width = item_info_loop.get('width', bbox[2] - bbox[0]) 
-            item_height = item_info_loop.get('height', bbox[3] - bbox[1])
-            
-            item_data = {"id_on_canvas": item_id, "type": item_type, "x": top_left_x, "y": top_left_y,
-                         "width": int(item_width), "height": int(item_height)}
+        bbox = self.canvas_frame.bbox(item_id) 
+        if not bbox: return None
 
-            if item_type == 'widget':
-                widget_obj = item_info_loop['obj'] 
-                item_data['widget_class_name'] = widget_obj.winfo_class() 
-                item_data['widget_module'] = 'tk' if not item_data['widget_class_name'].startswith('T') else 'ttk'
-                
-                text_val = ""; 
-                if isinstance(widget_obj, (ttk.Entry, ttk.Combobox)): text_val = widget_obj.get()
-                elif hasattr(widget_obj, "cget"):
-                    try: text_val = widget_obj.cget("text")
-                    except tk.TclError: pass
-                item_data['text'] = str(text_val)
-                
-                try:
-                    font_actual = tkfont.Font(font=widget_obj.cget("font")).actual()
-                    item_data['font'] = {'family': str(font_actual['family']), 
-                                         'size': abs(font_actual['size']), 
-                                         'weight': str(font_actual['weight']), 
-                                         'slant': str(font_actual['slant'])}
-                except tk.TclError: pass 
-                
-                if hasattr(widget_obj, 'cget') and 'anchor' in widget_obj.keys():
-                    try: item_data['anchor'] = str(widget_obj.cget('anchor'))
-                    except tk.TclError: pass
-
-                colors = {}; 
-                try: 
-                    fg_opt = 'foreground' if isinstance(widget_obj, (ttk.Label, ttk.Entry, ttk.Combobox)) else 'fg'
-                    colors['fg'] = str(widget_obj.cget(fg_opt))
+        top_left_x, top_left_y = bbox[0], bbox[1]
+        item_width = item_info_loop.width 
+        item_height = item_info_loop.height
+
+        item_data = {"uid": item_info_loop.uid, "type": item_type, "x": top_left_x, "y": top_left_y,
+                     "width": int(item_width), "height": int(item_height)}
+
+        if item_type == 'widget':
+            widget_obj = item_info_loop.obj 
+            item_data['widget_class_name'] = widget_obj.winfo_class() 
+            item_data['widget_module'] = 'tk' if not item_data['widget_class_name'].startswith('T') else 'ttk'
+
+            text_val = ""; 
+            if isinstance(widget_obj, (ttk.Entry, ttk.Combobox)): text_val = widget_obj.get()
+            elif hasattr(widget_obj, "cget"):
+                try: text_val = widget_obj.cget("text")
                 except tk.TclError: pass
-                try:
-                    if isinstance(widget_obj, (tk.Button, tk.Checkbutton, tk.Radiobutton)): 
-                         colors['bg'] = str(widget_obj.cget('bg'))
+            item_data['text'] = str(text_val)
+
+            try:
+                font_actual = tkfont.Font(font=widget_obj.cget("font")).actual()
+                item_data['font'] = {'family': str(font_actual['family']), 
+                                     'size': abs(font_actual['size']), 
+                                     'weight': str(font_actual['weight']), 
+                                     'slant': str(font_actual['slant'])}
+            except tk.TclError: pass 
+
+            if hasattr(widget_obj, 'cget') and 'anchor' in widget_obj.keys():
+                try: item_data['anchor'] = str(widget_obj.cget('anchor'))
                 except tk.TclError: pass
-                if colors: item_data['colors'] = colors
 
-                if isinstance(widget_obj, ttk.Combobox):
-                    item_data['values'] = self._get_python_list_from_tcl_list(widget_obj.cget('values'))
-            
-            elif item_type == 'image':
-                item_data['path'] = str(item_info_loop['path'])
-            
+            colors = {}; 
+            try: 
+                fg_opt = 'foreground' if isinstance(widget_obj, (ttk.Label, ttk.Entry, ttk.Combobox)) else 'fg'
+                colors['fg'] = str(widget_obj.cget(fg_opt))
+            except tk.TclError: pass
+            try:
+                if isinstance(widget_obj, (tk.Button, tk.Checkbutton, tk.Radiobutton)): 
+                     colors['bg'] = str(widget_obj.cget('bg'))
+            except tk.TclError: pass
+            if colors: item_data['colors'] = colors
+
+            if isinstance(widget_obj, ttk.Combobox):
+                item_data['values'] = self._get_python_list_from_tcl_list(widget_obj.cget('values'))
+            if item_info_loop.style: item_data['style'] = item_info_loop.style
+
+        elif item_type == 'image':
+            item_data['path'] = str(item_info_loop.path)
+
+        return item_data
+
+    def build_layout_data(self):
+        # 現在のキャンバスを save_layout 形式の辞書にする (タブを閉じるときのモデルとしても使う)
+        full_layout_data = {"general_settings": {"grid_spacing": self.grid_spacing,
+                                                 "canvas_size": [self.canvas_frame.winfo_width(), self.canvas_frame.winfo_height()]},
+                            "items": []}
+        
+        saved_instances = set()
+        for item_info_loop in self.canvas_items_in_z_order(): 
+            instance_uid = item_info_loop.component
+            if instance_uid is not None:
+                # 部品のメンバーはインスタンス1件 (定義への参照と上書き) にまとめる
+                if instance_uid in saved_instances: continue
+                saved_instances.add(instance_uid)
+                item_data = self._component_layout_entry(instance_uid)
+            else: item_data = self._serialize_item(item_info_loop)
+            if item_data is None: continue
+            item_data['z'] = len(full_layout_data["items"])
             full_layout_data["items"].append(item_data)
+        if self.component_definitions: full_layout_data["components"] = self.component_definitions
+        if self.palette: full_layout_data["palette"] = self.palette
+        if len(self.group_tree): full_layout_data["groups"] = self.group_tree.to_data({item.id: item.uid for item in self.canvas_items})
+        return full_layout_data
+
+    def save_layout(self):
+        filepath = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON Files", "*.json")], title="レイアウトを保存")
+        if not filepath: return
+        self._current_layout_path = filepath
+        full_layout_data = self.build_layout_data()
+        self.update_document_tab()
             
         try:
             with open(filepath, 'w', encoding='utf-8') as f: 
                 json.dump(full_layout_data, f, indent=4, ensure_ascii=False)
+            self.mark_document_saved(full_layout_data)
         except TypeError as e:
             print(f"レイアウト保存エラー (TypeError): {e}"); tkinter.messagebox.showerror("保存エラー", f"レイアウトの保存中に型エラー: {e}")
         except Exception as e:
             print(f"レイアウト保存エラー: {e}"); tkinter.messagebox.showerror("保存エラー", f"レイアウトの保存中にエラー: {e}")
 
-    def open_layout(self):
-        filepath = filedialog.askopenfilename(filetypes=[("JSON Files", "*.json")], title="レイアウトを開く")
+    @perf_timed()
+    def open_layout(self, filepath=None):
+        if filepath is None: filepath = filedialog.askopenfilename(filetypes=[("JSON Files", "*.json")], title="レイアウトを開く")
         if not filepath: return
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f: 
+                full_layout_data = json.load(f)
+        except Exception as e:
+            print(f"レイアウトファイル読み込みエラー: {e}"); tkinter.messagebox.showerror("オープンエラー", f"レイアウトファイルの読み込み中にエラー: {e}"); return
+        # 開いていないファイルは新しいタブに、開いているファイルはそのタブに読み直す
+        self.open_document(filepath, full_layout_data)
+
+    def clear_layout(self):
+        self.invalidate_smart_guides()
         
         # Clear existing items and selection state
-        for item_info_to_delete in list(self.canvas_items): 
-            self.canvas_frame.delete(item_info_to_delete['id'])
+        self.destroy_canvas_items(list(self.canvas_items))
         self.canvas_items.clear()
+        self.image_budget.clear(); self.refresh_image_budget_status()
+        self.clear_tiled_images()
+        self.clear_animations()
         self.selected_item_ids.clear() # Use new multi-selection set
+        self.forget_selected_content_tags()
         self.selected_widget = None
         self.selected_item_info = None
+        self.component_definitions.clear(); self.component_instances.clear()
+        self.group_tree.clear()
+        self.clear_palette()
         
         # Clear visual feedback
         for rect_id in self.highlight_rects.values():
@@ -1020,21 +1258,23 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
         self.highlight_rects.clear()
         self.canvas_frame.delete(self.ALL_RESIZE_HANDLES_TAG)
         
+        self._undo_stack.clear() # 削除したアイテムを指す操作は戻せない
         self.update_property_editor() # Update editor to reflect no selection
 
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f: 
-                full_layout_data = json.load(f)
-        except Exception as e:
-            print(f"レイアウトファイル読み込みエラー: {e}"); tkinter.messagebox.showerror("オープンエラー", f"レイアウトファイルの読み込み中にエラー: {e}"); return
-
+    def load_layout_data(self, full_layout_data):
+        # clear_layout した後のキャンバスに save_layout 形式の辞書を読み込む
         general_settings = full_layout_data.get("general_settings", {})
         loaded_grid_spacing = general_settings.get("grid_spacing", 20) 
         self.grid_spacing = loaded_grid_spacing; self.prop_grid_size.set(loaded_grid_spacing) 
         self.draw_grid() 
 
-        items_data = full_layout_data.get("items", [])
-        for info in items_data:
+        self.load_palette(full_layout_data.get("palette", {}))
+        self.component_definitions.update(full_layout_data.get("components", {}))
+        items_data = self.sort_layout_items_by_z(full_layout_data.get("items", []))
+        layout_images = self._load_layout_images(items_data)
+        atlas_photos = self._build_atlas_photo_map({index: loaded[1] for index, loaded in layout_images.items()
+                                                    if loaded is not None and not isinstance(loaded, Exception) and not is_animated_image(loaded[0])})
+        for index, info in enumerate(items_data):
             item_type = info.get('type')
             load_x, load_y = info.get('x'), info.get('y')
             load_w, load_h = info.get('width'), info.get('height') 
@@ -1044,85 +1284,181 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
                 load_anchor = info.get('anchor', 'center') 
                 self.add_widget(widget_type=widget_type_simple, text=info.get('text'), x=load_x, y=load_y,
                                 values=info.get('values'), font_info=info.get('font'), colors=info.get('colors'),
-                                width=load_w, height=load_h, anchor=load_anchor)
+                                width=load_w, height=load_h, anchor=load_anchor, uid=info.get('uid'), style=info.get('style'))
+            elif item_type == COMPONENT_ITEM_TYPE:
+                if info.get('component') not in self.component_definitions:
+                    print(f"部品の定義が見つかりません: {info.get('component')}"); continue
+                self.place_component(info['component'], load_x, load_y, instance_uid=info.get('uid'),
+                                     overrides=info.get('overrides'), member_uids=info.get('member_uids'))
             elif item_type == 'image':
                 try:
-                    pil_image_orig = Image.open(info['path'])
-                    saved_pil_width = int(load_w if load_w is not None else pil_image_orig.width)
-                    saved_pil_height = int(load_h if load_h is not None else pil_image_orig.height)
-                    pil_image_resized = pil_image_orig.resize((saved_pil_width, saved_pil_height), Image.Resampling.LANCZOS)
-                    tk_photo = ImageTk.PhotoImage(pil_image_resized)
+                    loaded = layout_images[index]
+                    if isinstance(loaded, Exception): raise loaded
+                    if loaded is None:
+                        self.create_tiled_image_item(info['path'], load_x, load_y, load_w, load_h, uid=info.get('uid')); continue
+                    pil_image_orig, pil_image_resized = loaded
+                    if is_animated_image(pil_image_orig):
+                        self.retain_original_image(self.create_animated_image_item(info['path'], load_x, load_y, pil_image_resized.width, pil_image_resized.height,
+                                                                                   uid=info.get('uid'), original_pil_image=pil_image_orig))
+                        continue
+                    tk_photo = atlas_photos.get(index) or ImageTk.PhotoImage(pil_image_resized)
                     img_id = self.canvas_frame.create_image(load_x, load_y, image=tk_photo, anchor=tk.NW)
-                    new_item_info = {'id': img_id, 'type': 'image', 'obj': tk_photo, 'path': info['path'], 
-                                     'width': pil_image_resized.width, 'height': pil_image_resized.height, 
-                                     'original_pil_image': pil_image_orig }
+                    self.add_to_content_layer(img_id)
+                    new_item_info = ImageItem(img_id, tk_photo, info['path'], pil_image_resized.width, pil_image_resized.height,
+                                              info.get('uid') or new_item_uid(), original_pil_image=pil_image_orig)
                     self.canvas_items.append(new_item_info)
-                    self.canvas_frame.tag_bind(img_id, "<ButtonPress-1>", lambda e, i_id=img_id: self.on_canvas_item_press(e, i_id))
+                    self.retain_original_image(new_item_info)
+                    self.bind_image_item_press(img_id)
                 except FileNotFoundError: tkinter.messagebox.showwarning("画像読み込みエラー", f"画像ファイルが見つかりません:\n{info.get('path')}")
                 except Exception as e: print(f"Error image {info.get('path')}: {e}"); tkinter.messagebox.showwarning("画像読み込みエラー", f"画像 {info.get('path')} 再作成失敗:\n{e}")
+        self.group_tree.load_data(full_layout_data.get("groups", {}), {item.uid: item.id for item in self.canvas_items})
+        self._schedule_live_preview_sync()
+
+    def _bake_codegen_atlas(self, asset_baker):
+        # 小さい画像アイテムをシートに詰めて書き出す。戻り値は {アイテムID: (シート番号, x, y)} と 'sheets'
+        sprite_keys = {}; sprite_images = []; item_keys = {}
+        for item_info in self.canvas_items:
+            if item_info.type != 'image' or item_info.animated: continue
+            size = (int(item_info.width), int(item_info.height))
+            if not is_sprite_size(*size): continue
+            try:
+                key = (asset_baker.source_digest(item_info.path, item_info.original_pil_image),) + size
+                if key not in sprite_keys:
+                    source_image = self.source_image_for_size(item_info, size)
+                    if source_image is None: source_image = Image.open(item_info.path)
+                    sprite_keys[key] = len(sprite_images)
+                    sprite_images.append(source_image.resize(size, Image.Resampling.LANCZOS) if source_image.size != size else source_image)
+                item_keys[item_info.id] = key
+            except Exception as e: print(f"アトラス用画像の読み込みエラー ({item_info.path}): {e}")
+        if not sprite_images: return None
+        try:
+            sheet_names, placements = bake_atlas_sheets(sprite_images, asset_baker.asset_dir)
+        except Exception as e:
+            print(f"アトラス書き出しエラー (個別の画像で出力します): {e}"); return None
+        result = {item_id: placements[sprite_keys[key]] for item_id, key in item_keys.items()}
+        result['sheets'] = sheet_names
+        return result
+
+    def _widget_codegen_spec(self, item_info):
+        # 生成コード用に、ウィジェットのクラスとオプションを Python の値として取り出す
+        widget_obj = item_info.obj
+        class_name = widget_obj.winfo_class()
+        module_name = 'tk' if not class_name.startswith('T') else 'ttk'
+        actual_class_name = class_name.replace('T','') if module_name == 'ttk' else class_name
+        options = {}
+        text_val = widget_obj.get() if isinstance(widget_obj, (ttk.Entry, ttk.Combobox)) else widget_obj.cget("text")
+        style = item_info.style if item_info.style in self.palette else None
+        try:
+            if style: raise tk.TclError # フォントと色はスタイルで指定する
+            font_actual = tkfont.Font(font=widget_obj.cget("font")).actual()
+            f_sty = []
+            if font_actual['weight'] == 'bold': f_sty.append('bold')
+            if font_actual['slant'] == 'italic': f_sty.append('italic')
+            options['font'] = (font_actual['family'], abs(font_actual['size']), ' '.join(f_sty))
+        except tk.TclError: pass
+        if hasattr(widget_obj, 'cget') and 'anchor' in widget_obj.keys():
+            try:
+                anchor_val = str(widget_obj.cget('anchor'))
+                if anchor_val and anchor_val != "center": options['anchor'] = anchor_val
+            except tk.TclError: pass
+        if style: options.update(styled_widget_options(style, self.palette[style], class_name))
+        else:
+            try:
+                fg_opt_name = 'foreground' if isinstance(widget_obj, (ttk.Label, ttk.Entry, ttk.Combobox)) else 'fg'
+                options[fg_opt_name] = str(widget_obj.cget(fg_opt_name))
+            except tk.TclError: pass
+            try: 
+                if isinstance(widget_obj, (tk.Button, tk.Checkbutton, tk.Radiobutton)):
+                    options['background'] = str(widget_obj.cget('bg'))
+            except tk.TclError: pass
+        values = self._get_python_list_from_tcl_list(widget_obj.cget('values')) if isinstance(widget_obj, ttk.Combobox) else None
+        return module_name, actual_class_name, options, str(text_val), values
 
     def generate_code(self):
-        code_window = tk.Toplevel(self); code_window.title("Generated Code"); code_window.geometry("700x750")
-        text_area = tk.Text(code_window, wrap="word", font=("Courier New", 10))
-        scrollbar = ttk.Scrollbar(code_window, command=text_area.yview)
-        text_area.config(yscrollcommand=scrollbar.set)
-        scrollbar.pack(side="right", fill="y"); text_area.pack(expand=True, fill="both")
-        
+        # 画像の書き出しモードでは、生成コードとリサイズ済み画像 (<ファイル名>_assets/) を一緒に保存する
+        bake_assets = self.codegen_bake_assets.get()
+        use_pil = not (bake_assets and self.codegen_without_pil.get())
+        lazy_mode = self.codegen_lazy_mode.get()
+        table_mode = self.codegen_table_mode.get() or lazy_mode # 遅延生成はテーブルの行単位で行う
+        output_path = asset_baker = None
+        if bake_assets:
+            output_path = filedialog.asksaveasfilename(defaultextension=".py", filetypes=[("Python Files", "*.py")], title="生成コードと画像の保存先")
+            if not output_path: return
+            asset_baker = AssetBaker(os.path.splitext(output_path)[0] + "_assets")
+
         code_lines = [
             "import tkinter as tk", "from tkinter import ttk", "import tkinter.font as tkfont",
-            "from PIL import Image, ImageTk\n", "class App(tk.Tk):", "    def __init__(self):",
-            "        super().__init__()", f"        self.title('Generated Layout')",
-            f"        self.geometry('{self.canvas_frame.winfo_width()}x{self.canvas_frame.winfo_height()}')\n",
-            "        self._image_references_generated_app = []\n"
         ]
+        has_animations = any(item.animated for item in self.canvas_items)
+        if lazy_mode: code_lines = ["import bisect", "import time", "_START_TIME = time.perf_counter() # 起動から初回描画までの計測用"] + code_lines
+        elif has_animations: code_lines.insert(0, "import time")
+        if bake_assets: code_lines.append("import os")
+        if use_pil or has_animations: code_lines.append("from PIL import Image, ImageTk" + (", ImageSequence" if has_animations else ""))
+        if bake_assets:
+            asset_dir_name = os.path.basename(asset_baker.asset_dir).replace('\'', '\\\'')
+            code_lines.append(f"\nASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '{asset_dir_name}')")
+        code_lines[-1] += "\n"
+        atlas_placements = self._bake_codegen_atlas(asset_baker) if bake_assets and self.codegen_sprite_atlas.get() else None
+        if atlas_placements: code_lines += atlas_code_lines(atlas_placements.pop('sheets'))
+        # スタイルは PALETTE に1回だけ書き、ウィジェットはスタイル名・フォント名で参照する
+        if self.palette: code_lines += palette_code_lines(self.palette)
+        # アニメーション画像はコマをファイル・サイズごとに共有し、1つの時計で動かす (書き出しモードでも元ファイルから読む)
+        if has_animations: code_lines += animation_code_lines()
+        if lazy_mode: code_lines += ["REPORT_STARTUP_TIME = False", f"LAZY_BATCH_SIZE = {LAZY_BATCH_SIZE}"]
+        viewport = (self.canvas_frame.winfo_width(), self.canvas_frame.winfo_height())
+        geometry = f"{viewport[0]}x{viewport[1]}"
+        table_builder = TableCodeBuilder() if table_mode else None
+        # 部品は定義を1回だけ書き、インスタンスはループで置く (テーブル出力ではテーブル側で共有されるので展開する)
+        component_blocks, component_instances = self._component_codegen_blocks() if not table_mode else ({}, {})
+        emitted_instances = set()
+        for block in component_blocks.values():
+            code_lines += component_code_lines(block['const'], block['name'], block['members'], block['instances'])
+        if not table_mode:
+            code_lines += [
+                "class App(tk.Tk):", "    def __init__(self):",
+                "        super().__init__()", "        self.title('Generated Layout')",
+                f"        self.geometry('{geometry}')\n",
+                "        self._image_references_generated_app = []\n"
+            ]
+            if self.palette: code_lines.append("        setup_palette(self)\n")
+            if has_animations: code_lines.append("        self._animation_clock = AnimationClock(self)\n")
+            if component_blocks: code_lines.append("        self._component_widgets = []\n")
         widget_counter = 0
-        for item_info_loop in self.canvas_items: 
+        for item_info_loop in self.canvas_items_in_z_order(): 
             widget_counter += 1; var_name = f"self.item_{widget_counter}"
-            item_id = item_info_loop['id']; item_type = item_info_loop['type']
+            item_id = item_info_loop.id; item_type = item_info_loop.type
             bbox = self.canvas_frame.bbox(item_id)
             if not bbox: continue
             place_x, place_y = int(bbox[0]), int(bbox[1])
-            item_w = item_info_loop.get('width', bbox[2] - bbox[0])
-            item_h = item_info_loop.get('height', bbox[3] - bbox[1])
-
-            if item_type == 'widget':
-                widget_obj = item_info_loop['obj']
-                class_name = item_info_loop.get('widget_class_name', widget_obj.winfo_class())
-                module_name = 'tk' if not class_name.startswith('T') else 'ttk'
-                actual_class_name = class_name.replace('T','') if module_name == 'ttk' else class_name
+            item_w = item_info_loop.width
+            item_h = item_info_loop.height
+
+            if item_info_loop.component in component_instances:
+                # インスタンスは最初のメンバーの重なり順の位置で1回だけ置く (メンバーは連続しているので順序は変わらない)
+                if item_info_loop.component not in emitted_instances:
+                    emitted_instances.add(item_info_loop.component)
+                    const_name, instance_index = component_instances[item_info_loop.component]
+                    code_lines.append(f"        self._create_component({const_name}, *{const_name}_INSTANCES[{instance_index}])\n")
+                continue
+
+            if item_type == 'widget' and table_mode:
+                module_name, actual_class_name, options, text_val, values = self._widget_codegen_spec(item_info_loop)
+                table_builder.add_widget(module_name, actual_class_name, options, text_val, place_x, place_y, values, size=(bbox[2] - bbox[0], bbox[3] - bbox[1]))
+
+            elif item_type == 'widget':
+                widget_obj = item_info_loop.obj
+                module_name, actual_class_name, options, text_val, values = self._widget_codegen_spec(item_info_loop)
                 opts_list = []
-                text_val = widget_obj.get() if isinstance(widget_obj, (ttk.Entry, ttk.Combobox)) else widget_obj.cget("text")
-                if not isinstance(widget_obj, ttk.Entry): opts_list.append(f"text='{str(text_val).replace('\'', '\\\'')}'")
-                try:
-                    font_actual = tkfont.Font(font=widget_obj.cget("font")).actual()
-                    f_fam = font_actual['family'].replace('\'', '\\\''); f_siz = abs(font_actual['size']); f_sty = []
-                    if font_actual['weight'] == 'bold': f_sty.append('bold')
-                    if font_actual['slant'] == 'italic': f_sty.append('italic')
-                    opts_list.append(f"font=('{f_fam}', {f_siz}, '{' '.join(f_sty)}')")
-                except tk.TclError: pass
-                if hasattr(widget_obj, 'cget') and 'anchor' in widget_obj.keys():
-                    try:
-                        anchor_val = str(widget_obj.cget('anchor'))
-                        if anchor_val and anchor_val != "center": opts_list.append(f"anchor='{anchor_val}'")
-                    except tk.TclError: pass
-                try:
-                    fg_opt_name = 'foreground' if isinstance(widget_obj, (ttk.Label, ttk.Entry, ttk.Combobox)) else 'fg'
-                    opts_list.append(f"{fg_opt_name}='{widget_obj.cget(fg_opt_name)}'")
-                except tk.TclError: pass
-                try: 
-                    if isinstance(widget_obj, (tk.Button, tk.Checkbutton, tk.Radiobutton)):
-                        opts_list.append(f"background='{widget_obj.cget('bg')}'")
-                except tk.TclError: pass
-                if isinstance(widget_obj, ttk.Combobox):
-                    opts_list.append(f"values={self._get_python_list_from_tcl_list(widget_obj.cget('values'))}")
+                if not isinstance(widget_obj, ttk.Entry): opts_list.append(f"text={text_val!r}")
+                opts_list.extend(f"{name}={value!r}" for name, value in options.items())
+                if values is not None: opts_list.append(f"values={values!r}")
                 
                 opt_str = ", ".join(opts_list)
                 code_lines.append(f"        {var_name} = {module_name}.{actual_class_name}(self{', ' if opt_str else ''}{opt_str})")
-                if isinstance(widget_obj, ttk.Entry) and text_val: code_lines.append(f"        {var_name}.insert(0, '{str(text_val).replace('\'', '\\\'')}')")
+                if isinstance(widget_obj, ttk.Entry) and text_val: code_lines.append(f"        {var_name}.insert(0, {text_val!r})")
                 if isinstance(widget_obj, ttk.Combobox) and text_val: 
-                    python_current_values = self._get_python_list_from_tcl_list(widget_obj.cget('values'))
-                    if text_val in python_current_values: code_lines.append(f"        {var_name}.set('{str(text_val).replace('\'', '\\\'')}')")
-                    elif python_current_values: code_lines.append(f"        {var_name}.current(0)")
+                    if text_val in values: code_lines.append(f"        {var_name}.set({text_val!r})")
+                    elif values: code_lines.append(f"        {var_name}.current(0)")
                 
                 place_opts_list = [f"x={place_x}", f"y={place_y}"]
                 # If forcing pixel dimensions in generated code via place:
@@ -1130,9 +1466,53 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
                 # place_opts_list.append(f"height={int(item_h)}")
                 code_lines.append(f"        {var_name}.place({', '.join(place_opts_list)})\n")
 
+            elif item_type == 'image' and item_info_loop.animated and table_mode:
+                table_builder.add_animation(item_info_loop.path, item_w, item_h, place_x, place_y)
+            elif item_type == 'image' and item_info_loop.animated:
+                img_w, img_h = int(item_w), int(item_h)
+                code_lines.extend([
+                    f"        # Animation: {item_info_loop.path} ({img_w}x{img_h})", "        try:",
+                    f"            {var_name} = tk.Label(self, borderwidth=0)",
+                    f"            self._animation_clock.add({var_name}, load_animation(self, {item_info_loop.path!r}, {img_w}, {img_h}))",
+                    f"            {var_name}.place(x={place_x}, y={place_y})",
+                    "        except Exception as e:",
+                    f"            print(f'Error loading animation {{e}} for {var_name}')\n"
+                ])
+            elif item_type == 'image' and bake_assets:
+                img_w, img_h = int(item_info_loop.width), int(item_info_loop.height)
+                atlas_position = atlas_placements.get(item_id) if atlas_placements else None
+                if atlas_position and table_mode:
+                    table_builder.add_image(atlas_position, img_w, img_h, place_x, place_y); continue
+                if atlas_position:
+                    code_lines.extend([
+                        f"        # Image: atlas {atlas_position} ({img_w}x{img_h})",
+                        f"        {var_name}_img_tk = atlas_image({', '.join(map(str, atlas_position))}, {img_w}, {img_h})",
+                        f"        self._image_references_generated_app.append({var_name}_img_tk)",
+                        f"        {var_name} = tk.Label(self, image={var_name}_img_tk, borderwidth=0)",
+                        f"        {var_name}.place(x={place_x}, y={place_y})\n",
+                    ]); continue
+                try:
+                    asset_name = asset_baker.bake(item_info_loop.path, (img_w, img_h), self.source_image_for_size(item_info_loop, (img_w, img_h)))
+                except Exception as e:
+                    print(f"画像書き出しエラー ({item_info_loop.path}): {e}"); continue
+                if table_mode:
+                    table_builder.add_image(asset_name, img_w, img_h, place_x, place_y); continue
+                load_expr = (f"ImageTk.PhotoImage(Image.open(os.path.join(ASSET_DIR, '{asset_name}')))" if use_pil
+                             else f"tk.PhotoImage(file=os.path.join(ASSET_DIR, '{asset_name}'))")
+                code_lines.extend([
+                    f"        # Image: {asset_name} ({img_w}x{img_h})", "        try:",
+                    f"            {var_name}_img_tk = {load_expr}",
+                    f"            self._image_references_generated_app.append({var_name}_img_tk)",
+                    f"            {var_name} = tk.Label(self, image={var_name}_img_tk, borderwidth=0)",
+                    f"            {var_name}.place(x={place_x}, y={place_y})",
+                    "        except Exception as e:",
+                    f"            print(f'Error loading image {{e}} for {var_name}')\n"
+                ])
+            elif item_type == 'image' and table_mode:
+                table_builder.add_image(item_info_loop.path, item_info_loop.width, item_info_loop.height, place_x, place_y)
             elif item_type == 'image':
-                img_path_escaped = item_info_loop['path'].replace('\\', '\\\\')
-                img_w, img_h = int(item_info_loop['width']), int(item_info_loop['height'])
+                img_path_escaped = item_info_loop.path.replace('\\', '\\\\')
+                img_w, img_h = int(item_info_loop.width), int(item_info_loop.height)
                 code_lines.extend([
                     f"        # Image: {img_path_escaped}", "        try:",
                     f"            pil_img_{widget_counter} = Image.open(r'{img_path_escaped}')",
@@ -1142,11 +1522,32 @@ class LayoutDesigner(tk.Tk, EventHandlersMixin):
                     f"            {var_name} = tk.Label(self, image={var_name}_img_tk, borderwidth=0)",
                     f"            {var_name}.image = {var_name}_img_tk ",
                     f"            {var_name}.place(x={place_x}, y={place_y})",
-                    f"        except Exception as e:",
+                    "        except Exception as e:",
                     f"            print(f'Error loading image {{e}} for {var_name}')\n"
                 ])
+        if table_mode:
+            if not bake_assets: image_load_expr = "ImageTk.PhotoImage(Image.open(source).resize((width, height), Image.Resampling.LANCZOS))"
+            elif use_pil: image_load_expr = "ImageTk.PhotoImage(Image.open(os.path.join(ASSET_DIR, source)))"
+            else: image_load_expr = "tk.PhotoImage(file=os.path.join(ASSET_DIR, source))"
+            if atlas_placements: image_load_expr = f"atlas_image(*source, width, height) if isinstance(source, tuple) else {image_load_expr}"
+            code_lines += (table_builder.table_lines(lazy_viewport=viewport if lazy_mode else None) + [""]
+                           + table_builder.app_lines(geometry, image_load_expr, lazy=lazy_mode,
+                                                     setup_lines=["        setup_palette(self)"] if self.palette else ()))
+        if component_blocks: code_lines += component_app_method_lines()
         code_lines.extend(["\nif __name__ == '__main__':", "    app = App()", "    app.mainloop()"])
-        text_area.insert("1.0", "\n".join(code_lines)); text_area.config(state="disabled")
+        code_text = "\n".join(code_lines)
+        if bake_assets:
+            try:
+                with open(output_path, 'w', encoding='utf-8') as f: f.write(code_text + "\n")
+            except Exception as e:
+                print(f"生成コードの保存エラー: {e}"); tkinter.messagebox.showerror("保存エラー", f"生成コードの保存中にエラー: {e}")
+
+        code_window = tk.Toplevel(self); code_window.title("Generated Code" + (f" - {os.path.basename(output_path)}" if output_path else "")); code_window.geometry("700x750")
+        text_area = tk.Text(code_window, wrap="word", font=("Courier New", 10))
+        scrollbar = ttk.Scrollbar(code_window, command=text_area.yview)
+        text_area.config(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y"); text_area.pack(expand=True, fill="both")
+        text_area.insert("1.0", code_text); text_area.config(state="disabled")
 
     def deselect_all(self):
         if self.selected_item_ids:
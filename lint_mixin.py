@@ -0,0 +1,99 @@
+import os
+import tkinter as tk
+from tkinter import ttk
+
+from layout_lint import lint_bounds, format_issue, ISSUE_OVERLAP, ISSUE_OFF_CANVAS, ISSUE_ZERO_SIZE
+from zorder_mixin import SELECTION_LAYER_TAG
+
+LINT_MARKER_TAG = "lint_marker"
+# 埋め込みウィジェットは常に最前面に描かれるので、対象アイテムの外周に枠を描いて示す
+LINT_MARKER_COLORS = {ISSUE_OVERLAP: "red", ISSUE_OFF_CANVAS: "#ff8c00", ISSUE_ZERO_SIZE: "#9932cc"}
+LINT_MARKER_PRIORITY = (ISSUE_ZERO_SIZE, ISSUE_OFF_CANVAS, ISSUE_OVERLAP)
+
+
+class LintMixin:
+    def _init_layout_lint(self):
+        self._lint_window = None
+        self._lint_issues = []
+
+    def _describe_lint_item(self, item_id):
+        item = next((it for it in self.canvas_items if it.id == item_id), None)
+        if item is None: return f"#{item_id}"
+        if item.type == 'image': return f"Image({os.path.basename(item.path)})"
+        widget = item.obj
+        try: text = widget.get() if isinstance(widget, (ttk.Entry, ttk.Combobox)) else widget.cget("text")
+        except tk.TclError: text = ""
+        return f"{widget.winfo_class()}('{text}')"
+
+    def _lint_item_bounds(self):
+        # bbox の取れないアイテム (サイズ 0 の画像など) も落とさず、座標と width/height から枠を作る (lint_bounds がサイズ 0 として報告する)
+        bounds = []
+        pairs = self._bboxes_for_ids([item.id for item in self.canvas_items], keep_empty=True)
+        for item, (item_id, bbox) in zip(self.canvas_items, pairs):
+            if bbox: bounds.append((item_id,) + bbox); continue
+            coords = self.canvas_frame.coords(item_id)
+            if not coords: continue
+            width, height = int(item.width), int(item.height)
+            x, y = coords[0], coords[1]
+            if item.type == 'widget': x, y = x - width / 2, y - height / 2 # ウィジェットは中心に置いている
+            bounds.append((item_id, int(x), int(y), int(x) + width, int(y) + height))
+        return bounds
+
+    def run_layout_lint(self):
+        self.clear_lint_markers()
+        bounds = self._lint_item_bounds()
+        window_size = (self.canvas_frame.winfo_width(), self.canvas_frame.winfo_height())
+        self._lint_issues = lint_bounds(bounds, window_size)
+        self._draw_lint_markers(dict((b[0], b[1:]) for b in bounds))
+        self._show_lint_results()
+
+    def _draw_lint_markers(self, bboxes):
+        marker_kind = {}
+        for issue in self._lint_issues:
+            for item_id in issue['items']:
+                current = marker_kind.get(item_id)
+                if current is None or LINT_MARKER_PRIORITY.index(issue['kind']) < LINT_MARKER_PRIORITY.index(current):
+                    marker_kind[item_id] = issue['kind']
+        for item_id, kind in marker_kind.items():
+            x1, y1, x2, y2 = bboxes[item_id]
+            self.canvas_frame.create_rectangle(x1 - 3, y1 - 3, x2 + 3, y2 + 3, outline=LINT_MARKER_COLORS[kind], width=2,
+                                               tags=(LINT_MARKER_TAG, SELECTION_LAYER_TAG))
+        if marker_kind: self.canvas_frame.tag_lower(LINT_MARKER_TAG, self._layer_top_marker("selection"))
+
+    def clear_lint_markers(self):
+        self.canvas_frame.delete(LINT_MARKER_TAG)
+
+    def _show_lint_results(self):
+        if self._lint_window is None or not self._lint_window.winfo_exists():
+            window = self._lint_window = tk.Toplevel(self); window.title("レイアウト検査"); window.geometry("520x320")
+            window.protocol("WM_DELETE_WINDOW", self._close_lint_window)
+            button_frame = ttk.Frame(window); button_frame.pack(side="bottom", fill="x", padx=5, pady=5)
+            ttk.Button(button_frame, text="再検査", command=self.run_layout_lint).pack(side="left")
+            ttk.Button(button_frame, text="閉じる", command=self._close_lint_window).pack(side="right")
+            self._lint_summary_label = ttk.Label(window); self._lint_summary_label.pack(side="top", anchor="w", padx=5, pady=(5, 0))
+            self._lint_listbox = tk.Listbox(window, activestyle="none")
+            scrollbar = ttk.Scrollbar(window, command=self._lint_listbox.yview)
+            self._lint_listbox.config(yscrollcommand=scrollbar.set)
+            scrollbar.pack(side="right", fill="y"); self._lint_listbox.pack(expand=True, fill="both", padx=(5, 0), pady=5)
+            self._lint_listbox.bind("<Double-Button-1>", self._on_lint_issue_activate)
+        counts = {kind: sum(1 for issue in self._lint_issues if issue['kind'] == kind) for kind in LINT_MARKER_PRIORITY}
+        self._lint_summary_label.config(text=f"重なり {counts[ISSUE_OVERLAP]} 件 / ウィンドウ外 {counts[ISSUE_OFF_CANVAS]} 件 / "
+                                             f"サイズ0 {counts[ISSUE_ZERO_SIZE]} 件 (ダブルクリックで選択)")
+        self._lint_listbox.delete(0, tk.END)
+        self._lint_listbox.insert(tk.END, *[format_issue(issue, self._describe_lint_item) for issue in self._lint_issues])
+        self._lint_window.lift()
+
+    def _on_lint_issue_activate(self, event=None):
+        selection = self._lint_listbox.curselection()
+        if not selection: return
+        existing_ids = {item.id for item in self.canvas_items}
+        item_ids = [item_id for item_id in self._lint_issues[selection[0]]['items'] if item_id in existing_ids]
+        if not item_ids: return
+        self.selected_item_ids.clear(); self.selected_item_ids.update(item_ids)
+        self.update_property_editor_for_selection()
+        self.update_highlight()
+
+    def _close_lint_window(self):
+        self.clear_lint_markers()
+        if self._lint_window is not None and self._lint_window.winfo_exists(): self._lint_window.destroy()
+        self._lint_window = None
@@ -0,0 +1,213 @@
+import json
+import os
+import queue
+import sys
+import threading
+import tkinter as tk
+from tkinter import ttk
+import tkinter.font as tkfont
+from PIL import Image, ImageTk
+
+from animated_image import AnimationClock, FrameCache, is_animated_image
+from components import member_codegen_spec
+from layout_diff import index_items, changed_fields, POSITION_FIELDS
+from style_palette import TTK_STYLED_CLASSES, PaletteRef, font_name, ttk_style_name, font_options
+from tiled_image import TiledImageSource, is_huge_image
+
+# 生成アプリのライブプレビュー。設計画面とは別のプロセスで動き、標準入力から1行1つの JSON を受け取る:
+#   {"op": "reset", "layout": レイアウト}   全部作り直す (開いたとき・レイアウトを読み込んだとき)
+#   {"op": "delta", "added": [[キー, アイテム], ...], "removed": [キー, ...], "moved": {キー: [x, y]},
+#    "changed": {キー: アイテム}, "order": [キー, ...] または null,
+#    "palette": パレット, "canvas_size": [幅, 高さ] (この2つは変わったときだけ)}   変わったウィジェットだけを直す
+# アイテムは save_layout 形式 (部品のメンバーもそれぞれ1アイテム) で、キーは uid。追加したアイテムは一番上に積む。
+# ウィジェットは generate_code と同じ規則 (member_codegen_spec) で作り、place(x, y) で置く。
+#   python live_preview.py   (通常は設計画面の「ライブプレビュー」から起動する)
+
+POLL_MS = 30
+DELTA_FIELDS = ("added", "removed", "moved", "changed", "order", "palette", "canvas_size")
+
+
+def items_delta(sent_items, dirty_items, removed_keys=(), refresh_keys=()):
+    # 設計画面側: 変わったかもしれないアイテム ({キー: アイテム}) を前に送った内容 sent_items と比べて delta にする。
+    # sent_items は送る内容に更新する。refresh_keys のアイテムは内容が同じでも作り直させる
+    delta = {"op": "delta", "added": [], "removed": [], "moved": {}, "changed": {}, "order": None}
+    for key in removed_keys:
+        if sent_items.pop(key, None) is not None: delta["removed"].append(key)
+    for key, item in dirty_items.items():
+        old_item = sent_items.get(key)
+        sent_items[key] = item
+        if old_item is None: delta["added"].append([key, item]); continue
+        fields = changed_fields(old_item, item)
+        if key in refresh_keys or any(name not in POSITION_FIELDS for name in fields): delta["changed"][key] = item
+        elif fields: delta["moved"][key] = [item.get("x"), item.get("y")]
+    return delta
+
+
+def delta_is_empty(delta):
+    return not any(delta.get(name) for name in DELTA_FIELDS) and "palette" not in delta # 空のパレットも変更として送る
+
+
+class LivePreviewApp(tk.Tk):
+    def __init__(self, stream=None):
+        super().__init__()
+        self.title("ライブプレビュー")
+        self.widgets = {} # キー -> ウィジェット
+        self.items = {} # キー -> 表示しているアイテム
+        self.order = [] # 重なり順 (背面から)
+        self.palette = {}
+        self._photos = {} # (パス, 幅, 高さ, 更新時刻) -> PhotoImage (変わっていない画像は作り直さない)
+        self._frame_cache = FrameCache()
+        self._animation_clock = AnimationClock(self, lambda label: label.winfo_viewable(), lambda label, photo: label.config(image=photo))
+        self._messages = queue.Queue()
+        threading.Thread(target=self._read_messages, args=(stream or sys.stdin,), daemon=True).start()
+        self.after(POLL_MS, self._poll_messages)
+
+    def _read_messages(self, stream):
+        try:
+            for line in stream:
+                if not line.strip(): continue
+                try: message = json.loads(line)
+                except ValueError as e:
+                    print(f"プレビューへのメッセージを読めません: {e}"); continue
+                if isinstance(message, dict): self._messages.put(message)
+        finally:
+            self._messages.put(None) # 設計画面が閉じた (読めなくなった)
+
+    def _poll_messages(self):
+        messages = []
+        while True:
+            try: messages.append(self._messages.get_nowait())
+            except queue.Empty: break
+        if None in messages: self.destroy(); return
+        # reset より前のメッセージは捨ててよい
+        resets = [index for index, message in enumerate(messages) if message.get("op") == "reset"]
+        for message in messages[resets[-1] if resets else 0:]:
+            try:
+                if message.get("op") == "reset": self.reset(message["layout"])
+                else: self.apply_delta(message)
+            except Exception as e: print(f"プレビューの更新エラー: {e}")
+        self.after(POLL_MS, self._poll_messages)
+
+    def reset(self, layout_data):
+        for key in list(self.widgets): self._destroy(key)
+        width, height = layout_data.get("general_settings", {}).get("canvas_size", (600, 400))
+        self.geometry(f"{width}x{height}")
+        self._setup_palette(layout_data.get("palette", {}))
+        self.order = []
+        for key, item in index_items(layout_data).items():
+            self._create(key, item); self.order.append(key)
+        self._prune_images()
+
+    def apply_delta(self, delta):
+        if delta.get("canvas_size"): self.geometry("{}x{}".format(*delta["canvas_size"]))
+        for key in delta["removed"]: self._destroy(key)
+        changed = dict(delta["changed"])
+        if "palette" in delta:
+            self._setup_palette(delta["palette"])
+            # tk のウィジェットはパレットの色を写して作っているので、スタイル付きのものは作り直す
+            for key, item in self.items.items():
+                if item.get("style") and key not in changed: changed[key] = item
+        for key, (x, y) in delta["moved"].items():
+            if key in self.widgets:
+                self.widgets[key].place_configure(x=x, y=y); self.items[key].update(x=x, y=y)
+        for key, item in changed.items():
+            self._destroy(key); self._create(key, item)
+        added = [key for key, _ in delta["added"]]
+        for key, item in delta["added"]:
+            self._destroy(key); self._create(key, item)
+        if delta["order"] is not None:
+            self.order = [key for key in delta["order"] if key in self.items]
+            for key in self.order: self.widgets[key].lift()
+        else:
+            added_keys = set(added)
+            self.order = [key for key in self.order if key in self.items and key not in added_keys] + [key for key in added if key in self.items]
+            for key in changed: self._restack(key)
+        self._prune_images()
+
+    def _restack(self, key):
+        # 作り直したウィジェットは一番上に来るので、重なり順で次にあるウィジェットのすぐ下に戻す
+        if key not in self.widgets: return
+        index = self.order.index(key)
+        above = next((self.widgets[other] for other in self.order[index + 1:] if other in self.widgets), None)
+        if above is not None: self.widgets[key].lower(above)
+
+    def _prune_images(self):
+        # どのラベルも使わなくなった画像 (大きさを変えた前の画像など) を手放す
+        in_use = {getattr(widget, "image_key", None) for widget in self.widgets.values()}
+        for key in [key for key in self._photos if key not in in_use]: del self._photos[key]
+        self._frame_cache.prune(in_use)
+
+    def _setup_palette(self, palette):
+        # generate_code の setup_palette と同じ: 名前付きフォントと ttk のスタイル
+        self.palette = palette
+        style = ttk.Style(self)
+        for name, spec in palette.items():
+            if spec.get("font"):
+                try: tkfont.nametofont(font_name(name)).configure(**font_options(spec["font"]))
+                except tk.TclError: tkfont.Font(self, name=font_name(name), **font_options(spec["font"]))
+            options = {}
+            if spec.get("fg"): options["foreground"] = spec["fg"]
+            if spec.get("font"): options["font"] = font_name(name)
+            for class_name in TTK_STYLED_CLASSES:
+                if options: style.configure(ttk_style_name(name, class_name), **options)
+
+    def _destroy(self, key):
+        self.items.pop(key, None)
+        widget = self.widgets.pop(key, None)
+        if widget is None: return
+        self._animation_clock.remove(widget)
+        widget.destroy()
+
+    def _create(self, key, item):
+        try: widget = self._create_image(item) if item.get("type") == "image" else self._create_widget(item)
+        except Exception as e:
+            print(f"プレビューのアイテム作成エラー ({key}): {e}"); return
+        if widget is None: return
+        widget.place(x=item.get("x", 0), y=item.get("y", 0))
+        self.widgets[key] = widget; self.items[key] = item
+
+    def _create_widget(self, item):
+        module_name, class_name, options, text, values = member_codegen_spec(item, self.palette)
+        style = item.get("style")
+        for name, value in options.items():
+            if isinstance(value, PaletteRef): options[name] = self.palette[style]["fg" if name == "fg" else "bg"]
+        # 生成コードの _create_component と同じ作り方
+        widget_class = getattr(ttk if module_name == "ttk" else tk, class_name)
+        if class_name == "Entry":
+            widget = widget_class(self, **options)
+            if text: widget.insert(0, text)
+        elif class_name == "Combobox":
+            widget = widget_class(self, values=values or [], **options)
+            if text: widget.set(text)
+        else: widget = widget_class(self, text=text, **options)
+        return widget
+
+    def _create_image(self, item):
+        path = item["path"]; size = (int(item["width"]), int(item["height"]))
+        key = (path, size[0], size[1], os.stat(path).st_mtime_ns)
+        photo = self._photos.get(key)
+        if photo is None:
+            # 巨大な画像は表示サイズに近い縮小段だけを展開する (tiled_image.py)
+            image = TiledImageSource(path).level(size) if is_huge_image(path) else Image.open(path)
+            with image:
+                if is_animated_image(image):
+                    frames = self._frame_cache.frames(self, path, size)
+                    label = tk.Label(self, image=frames.photos[0], borderwidth=0)
+                    label.image_key = frames.key
+                    self._animation_clock.add(label, frames)
+                    return label
+                resized = image.resize(size, Image.Resampling.LANCZOS) if image.size != size else image.copy()
+            photo = self._photos[key] = ImageTk.PhotoImage(resized, master=self)
+        label = tk.Label(self, image=photo, borderwidth=0)
+        label.image_key = key
+        return label
+
+
+def main():
+    app = LivePreviewApp()
+    app.mainloop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+import json
+import os
+import subprocess
+import sys
+import tkinter as tk
+from tkinter import messagebox
+
+from live_preview import items_delta, delta_is_empty
+from perf_monitor import perf_timed
+
+LIVE_PREVIEW_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "live_preview.py")
+SYNC_DELAY_MS = 250 # 最後の操作からこれだけ待ってから送る (ドラッグ中は送らない)
+
+
+class LivePreviewMixin:
+    # 生成アプリのライブプレビュー (live_preview.py) を別プロセスで動かし、標準入力のパイプに変わった所だけを送る。
+    # 変わったアイテムは Undo の item_ids や invalidate_smart_guides と同じ所で mark_live_preview_dirty に渡され、
+    # 送るときに辞書にするのはそのアイテムだけ (読み込み・クリアのときだけ全体を送り直す)
+    def _init_live_preview(self):
+        self.live_preview_enabled = tk.BooleanVar(value=False)
+        self._live_preview_process = None
+        self._live_preview_after_id = None
+        self._live_preview_sent = None # uid -> 最後に送ったアイテム (None なら次は reset を送る)
+        self._live_preview_keys = {} # 送ったアイテムの ID -> uid
+        self._live_preview_order = [] # 送った重なり順 (uid)
+        self._live_preview_palette = None
+        self._live_preview_canvas_size = None
+        self._live_preview_dirty_ids = set()
+        self._live_preview_refresh_ids = set()
+        self._live_preview_order_dirty = False
+
+    def toggle_live_preview(self):
+        if self.live_preview_enabled.get(): self.start_live_preview()
+        else: self.stop_live_preview()
+
+    def start_live_preview(self):
+        if self._live_preview_process is not None and self._live_preview_process.poll() is None: return
+        try:
+            self._live_preview_process = subprocess.Popen([sys.executable, LIVE_PREVIEW_SCRIPT], stdin=subprocess.PIPE,
+                                                          text=True, encoding="utf-8", bufsize=1)
+        except OSError as e:
+            print(f"ライブプレビューの起動エラー: {e}")
+            messagebox.showerror("エラー", f"ライブプレビューを起動できませんでした:\n{e}")
+            self.live_preview_enabled.set(False); return
+        self._live_preview_sent = None
+        self._sync_live_preview()
+
+    def stop_live_preview(self):
+        if self._live_preview_after_id is not None:
+            self.after_cancel(self._live_preview_after_id); self._live_preview_after_id = None
+        process, self._live_preview_process = self._live_preview_process, None
+        self._live_preview_sent = None
+        if process is None: return
+        try: process.stdin.close() # EOF でプレビューは自分で閉じる
+        except OSError: pass
+        try: process.wait(timeout=1)
+        except subprocess.TimeoutExpired: process.terminate()
+
+    def mark_live_preview_dirty(self, item_ids=(), order=False, refresh=False):
+        # item_ids: 変わったかもしれないアイテム (None なら全体を送り直す)。order: 重なり順が変わったかもしれない。
+        # refresh: 内容が同じでも作り直させる (画像ファイルが書き換わったとき)。追加されたアイテムは送っていない ID として見つかる
+        if self._live_preview_process is None: return
+        if item_ids is None: self._live_preview_sent = None
+        else:
+            self._live_preview_dirty_ids.update(item_ids)
+            if refresh: self._live_preview_refresh_ids.update(item_ids)
+        if order: self._live_preview_order_dirty = True
+        self._schedule_live_preview_sync()
+
+    def _schedule_live_preview_sync(self):
+        if self._live_preview_process is None: return
+        if self._live_preview_after_id is not None: self.after_cancel(self._live_preview_after_id)
+        self._live_preview_after_id = self.after(SYNC_DELAY_MS, self._sync_live_preview)
+
+    @staticmethod
+    def _live_preview_json(value):
+        return json.loads(json.dumps(value)) # 送る形 (タプルはリスト) にそろえて、前に送った内容と比べられるようにする
+
+    def _live_preview_item(self, item):
+        item_data = self._serialize_item(item)
+        return None if item_data is None else self._live_preview_json(item_data)
+
+    def _live_preview_reset_message(self):
+        self._live_preview_sent = {}; self._live_preview_keys = {}
+        items = []
+        for item in self.canvas_items_in_z_order():
+            item_data = self._live_preview_item(item)
+            if item_data is None: continue
+            item_data["z"] = len(items)
+            items.append(item_data)
+            self._live_preview_sent[item.uid] = item_data; self._live_preview_keys[item.id] = item.uid
+        self._live_preview_order = [item_data["uid"] for item_data in items]
+        return {"op": "reset", "layout": {"general_settings": {"canvas_size": self._live_preview_canvas_size},
+                                          "palette": self._live_preview_palette, "items": items}}
+
+    def _live_preview_delta_message(self):
+        keys = self._live_preview_keys
+        dirty = self._live_preview_dirty_ids
+        dirty_items = {}; found = set(); added_ids = []
+        for item in self.canvas_items:
+            if item.id not in dirty and item.id in keys: continue
+            item_data = self._live_preview_item(item)
+            if item_data is None: continue
+            dirty_items[item.uid] = item_data; found.add(item.id)
+            if item.id not in keys: added_ids.append(item.id); keys[item.id] = item.uid
+        removed = [keys.pop(item_id) for item_id in dirty if item_id in keys and item_id not in found]
+        refresh = {keys[item_id] for item_id in self._live_preview_refresh_ids if item_id in keys}
+        message = items_delta(self._live_preview_sent, dirty_items, removed, refresh)
+        removed_keys = set(removed)
+        expected = [key for key in self._live_preview_order if key not in removed_keys] + [key for key, _ in message["added"]]
+        if self._live_preview_order_dirty or added_ids:
+            # 追加したアイテムが一番上にそろっていて、他の前後も変わっていなければ順番は送らない
+            order = [item.uid for item in self.canvas_items_in_z_order() if item.id in keys]
+            if order != expected: message["order"] = order
+            expected = order
+        self._live_preview_order = expected
+        return message
+
+    @perf_timed()
+    def _sync_live_preview(self):
+        self._live_preview_after_id = None
+        process = self._live_preview_process
+        if process is None: return
+        if process.poll() is not None: # プレビューのウィンドウが閉じられた
+            self._live_preview_process = None; self.live_preview_enabled.set(False); return
+        palette = self._live_preview_json(self.palette)
+        canvas_size = [self.canvas_frame.winfo_width(), self.canvas_frame.winfo_height()]
+        if self._live_preview_sent is None:
+            self._live_preview_palette, self._live_preview_canvas_size = palette, canvas_size
+            message = self._live_preview_reset_message()
+        else:
+            message = self._live_preview_delta_message()
+            if palette != self._live_preview_palette: message["palette"] = self._live_preview_palette = palette
+            if canvas_size != self._live_preview_canvas_size: message["canvas_size"] = self._live_preview_canvas_size = canvas_size
+        self._live_preview_dirty_ids = set(); self._live_preview_refresh_ids = set(); self._live_preview_order_dirty = False
+        if message["op"] == "delta" and delta_is_empty(message): return
+        try:
+            process.stdin.write(json.dumps(message, ensure_ascii=False) + "\n"); process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            print(f"ライブプレビューへの送信エラー: {e}")
+            self.stop_live_preview(); self.live_preview_enabled.set(False)
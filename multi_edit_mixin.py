@@ -0,0 +1,202 @@
+import tkinter as tk
+from tkinter import ttk
+import tkinter.font as tkfont
+
+ANCHOR_WIDGET_CLASSES = (tk.Label, ttk.Label, tk.Button, tk.Checkbutton, tk.Radiobutton)
+BG_WIDGET_CLASSES = (tk.Button, tk.Checkbutton, tk.Radiobutton)
+TTK_FG_WIDGET_CLASSES = (ttk.Label, ttk.Entry, ttk.Combobox)
+
+
+class MultiEditMixin:
+    # 複数選択時のプロパティ一括編集
+    # - 値が揃っていない項目は空欄 / チェックボックスは alternate (不定) 表示
+    # - 変更した項目だけを全ウィジェットに適用し、Undo は1エントリ、ハイライト更新も1回
+
+    def _init_multi_edit_state(self):
+        self._multi_edit_widgets = []
+        self._multi_edit_snapshot = {}
+        self._multi_edit_token = 0
+        self._highlight_refresh_pending = False
+
+    def _selected_widget_infos(self):
+        selected_ids = self.selected_item_ids
+        return [item for item in self.canvas_items if item.type == 'widget' and item.id in selected_ids]
+
+    def _font_attrs_cached(self, font_spec, cache):
+        key = str(font_spec)
+        attrs = cache.get(key)
+        if attrs is None:
+            actual = tkfont.Font(font=font_spec).actual()
+            attrs = (actual['family'], abs(actual['size']), actual['weight'] == 'bold', actual['slant'] == 'italic')
+            cache[key] = attrs
+        return attrs
+
+    @staticmethod
+    def _fg_option_name(widget_obj):
+        return 'foreground' if isinstance(widget_obj, TTK_FG_WIDGET_CLASSES) else 'fg'
+
+    @staticmethod
+    def _common_value(values):
+        return next(iter(values)) if len(values) == 1 else None
+
+    def _schedule_highlight_refresh(self):
+        if self._highlight_refresh_pending: return
+        self._highlight_refresh_pending = True
+        def refresh():
+            self._highlight_refresh_pending = False
+            self.update_highlight()
+        self.after_idle(refresh)
+
+    def _set_font_indeterminate(self, bold_mixed, italic_mixed):
+        self.font_bold_check.state(['alternate'] if bold_mixed else ['!alternate'])
+        self.font_italic_check.state(['alternate'] if italic_mixed else ['!alternate'])
+
+    def on_font_style_toggle(self, check_widget):
+        check_widget.state(['!alternate'])  # クリックされた時点で不定表示を解除
+        self.on_font_property_change()
+
+    def _update_anchor_button_styles(self, current_anchor):
+        for row_buttons_dict in self.anchor_buttons.values():
+            for button_widget in row_buttons_dict.values():
+                button_text_lower = button_widget.cget('text').lower()
+                button_widget.config(style=self.selected_anchor_style_name if button_text_lower == current_anchor else self.default_anchor_style_name)
+
+    def populate_multi_selection_editor(self, num_selected):
+        widgets = [info.obj for info in self._selected_widget_infos()]
+        self._multi_edit_widgets = widgets
+        self._multi_edit_token += 1
+
+        families, sizes, bolds, italics = set(), set(), set(), set()
+        fgs, bgs, anchors = set(), set(), set()
+        font_cache = {}
+        for w in widgets:
+            try:
+                family, size, bold, italic = self._font_attrs_cached(w.cget("font"), font_cache)
+                families.add(family); sizes.add(size); bolds.add(bold); italics.add(italic)
+            except tk.TclError: pass
+            try: fgs.add(str(w.cget(self._fg_option_name(w))))
+            except tk.TclError: pass
+            if isinstance(w, BG_WIDGET_CLASSES):
+                try: bgs.add(str(w.cget('bg')))
+                except tk.TclError: pass
+            if isinstance(w, ANCHOR_WIDGET_CLASSES):
+                try: anchors.add(str(w.cget('anchor')))
+                except tk.TclError: pass
+
+        snapshot = {
+            'family': self._common_value(families), 'size': self._common_value(sizes),
+            'bold': self._common_value(bolds), 'italic': self._common_value(italics),
+            'fg': self._common_value(fgs), 'bg': self._common_value(bgs), 'anchor': self._common_value(anchors),
+        }
+        self._multi_edit_snapshot = snapshot
+
+        has_font = bool(families)
+        self._set_font_ui_state("normal" if has_font else "disabled")
+        self._set_anchor_ui_state("normal" if anchors else "disabled")
+        fg_state = "normal" if fgs else "disabled"
+        bg_state = "normal" if bgs else "disabled"
+        self.fg_color_entry.config(state=fg_state); self.fg_color_button.config(state=fg_state)
+        self.bg_color_entry.config(state=bg_state); self.bg_color_button.config(state=bg_state)
+
+        self._updating_properties_internally = True
+        try:
+            self.prop_text.set(f"[{num_selected} items selected]"); self.prop_values.set("")
+            self.prop_font_family.set(snapshot['family'] or "")
+            self.prop_font_size.set(snapshot['size'] if snapshot['size'] is not None else "")
+            self.prop_font_bold.set(bool(snapshot['bold'])); self.prop_font_italic.set(bool(snapshot['italic']))
+            if has_font:
+                self._set_font_indeterminate(snapshot['bold'] is None, snapshot['italic'] is None)
+
+            self.prop_anchor.set(snapshot['anchor'] or "")
+            if anchors: self._update_anchor_button_styles(snapshot['anchor'])
+
+            self.prop_fg_color.set(snapshot['fg'] or "")
+            self.fg_color_preview.config(bg=snapshot['fg'] if snapshot['fg'] else self.cget('bg'))
+            self.prop_bg_color.set(snapshot['bg'] or "")
+            self.bg_color_preview.config(bg=snapshot['bg'] if snapshot['bg'] else self.cget('bg'))
+        except tk.TclError as e:
+            print(f"複数選択プロパティ表示エラー: {e}")
+        finally:
+            self._updating_properties_internally = False
+
+    def apply_multi_font_change(self):
+        snapshot = self._multi_edit_snapshot
+        changes = {}
+        family = self.prop_font_family.get()
+        if family and family != snapshot.get('family'): changes['family'] = family
+        try:
+            size = self.prop_font_size.get()
+            if size > 0 and size != snapshot.get('size'): changes['size'] = size
+        except tk.TclError: pass  # 不定 (空欄) のまま
+        if not self.font_bold_check.instate(['alternate']):
+            bold = self.prop_font_bold.get()
+            if bold != snapshot.get('bold'): changes['bold'] = bold
+        if not self.font_italic_check.instate(['alternate']):
+            italic = self.prop_font_italic.get()
+            if italic != snapshot.get('italic'): changes['italic'] = italic
+        if not changes: return
+        self.invalidate_smart_guides(self.selected_item_ids)
+        self.invalidate_group_bounds(self.selected_item_ids)
+        self.detach_widget_styles(self.selected_item_ids)
+
+        font_cache = {}; new_font_cache = {}; records = []
+        for w in self._multi_edit_widgets:
+            try:
+                old_font = w.cget("font")
+                family, size, bold, italic = self._font_attrs_cached(old_font, font_cache)
+            except tk.TclError: continue
+            key = (changes.get('family', family), changes.get('size', size),
+                   changes.get('bold', bold), changes.get('italic', italic))
+            new_font = new_font_cache.get(key)
+            if new_font is None:
+                style_parts = []
+                if key[2]: style_parts.append("bold")
+                if key[3]: style_parts.append("italic")
+                new_font = new_font_cache[key] = (key[0], key[1], " ".join(style_parts))
+            try:
+                w.config(font=new_font)
+                records.append((w, 'font', old_font))
+            except tk.TclError as e:
+                print(f"Font Error: {e}"); break
+
+        snapshot.update(changes)
+        self.push_undo_entry("フォント一括変更", self._make_config_restore(records),
+                             merge_key=('font', self._multi_edit_token, tuple(sorted(changes))), item_ids=self.selected_item_ids)
+        self._schedule_highlight_refresh()
+
+    def apply_multi_anchor_change(self, new_anchor_value):
+        records = []
+        for w in self._multi_edit_widgets:
+            if not isinstance(w, ANCHOR_WIDGET_CLASSES): continue
+            try:
+                old_anchor = w.cget('anchor')
+                w.config(anchor=new_anchor_value)
+                records.append((w, 'anchor', old_anchor))
+            except tk.TclError as e:
+                print(f"Anchor Error: {e}")
+        self._multi_edit_snapshot['anchor'] = new_anchor_value
+        self.prop_anchor.set(new_anchor_value)
+        self._update_anchor_button_styles(new_anchor_value)
+        self.push_undo_entry("アンカー一括変更", self._make_config_restore(records), item_ids=self.selected_item_ids)
+
+    def apply_multi_color_change(self, role, color):
+        try: self.winfo_rgb(color)  # 無効な色はウィジェットごとに試さずここで弾く
+        except tk.TclError: return
+        self.detach_widget_styles(self.selected_item_ids)
+        records = []
+        for w in self._multi_edit_widgets:
+            if role == 'bg':
+                if not isinstance(w, BG_WIDGET_CLASSES): continue
+                opt_name = 'background'
+            else:
+                opt_name = self._fg_option_name(w)
+            try:
+                old_color = w.cget(opt_name)
+                w.config(**{opt_name: color})
+                records.append((w, opt_name, old_color))
+            except tk.TclError: pass
+        self._multi_edit_snapshot[role] = color
+        preview = self.fg_color_preview if role == 'fg' else self.bg_color_preview
+        preview.config(bg=color)
+        self.push_undo_entry("色の一括変更", self._make_config_restore(records),
+                             merge_key=(role, self._multi_edit_token), item_ids=self.selected_item_ids)
@@ -0,0 +1,58 @@
+import tkinter as tk
+from tkinter import filedialog
+import tkinter.messagebox
+
+PERF_HUD_TAG = "perf_hud"
+
+
+class PerfHudMixin:
+    PERF_HUD_REFRESH_MS = 500
+
+    def _init_perf_hud(self):
+        self.show_perf_hud = tk.BooleanVar(value=False)
+        self._perf_hud_after_id = None
+
+    def _perf_hud_canvases(self):
+        return [self.canvas_frame]
+
+    def _perf_hud_target_canvas(self):
+        return self.canvas_frame
+
+    def toggle_perf_hud(self):
+        self.perf_monitor.set_tcl_counting(self.show_perf_hud.get())
+        if self.show_perf_hud.get():
+            self._refresh_perf_hud()
+        else:
+            if self._perf_hud_after_id:
+                self.after_cancel(self._perf_hud_after_id); self._perf_hud_after_id = None
+            for canvas in self._perf_hud_canvases(): canvas.delete(PERF_HUD_TAG)
+
+    def _refresh_perf_hud(self):
+        self._perf_hud_after_id = None
+        if not self.show_perf_hud.get(): return
+        # HUD 自身の描画は計測対象外にする
+        monitor = self.perf_monitor
+        was_enabled = monitor.enabled; monitor.enabled = False
+        try:
+            for canvas in self._perf_hud_canvases(): canvas.delete(PERF_HUD_TAG)
+            canvas = self._perf_hud_target_canvas()
+            text_id = canvas.create_text(8, 8, anchor=tk.NW, text="\n".join(monitor.hud_lines()),
+                                         font=("Courier New", 9), fill="#00ff66", tags=PERF_HUD_TAG)
+            x1, y1, x2, y2 = canvas.bbox(text_id)
+            bg_id = canvas.create_rectangle(x1 - 4, y1 - 4, x2 + 4, y2 + 4, fill="#202020", outline="", tags=PERF_HUD_TAG)
+            canvas.tag_lower(bg_id, text_id)
+            canvas.tag_raise(PERF_HUD_TAG)
+        finally:
+            monitor.enabled = was_enabled
+        self._perf_hud_after_id = self.after(self.PERF_HUD_REFRESH_MS, self._refresh_perf_hud)
+
+    def reset_perf_stats(self):
+        self.perf_monitor.reset()
+
+    def export_perf_stats(self):
+        filepath = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON Files", "*.json")], title="計測結果を保存")
+        if not filepath: return
+        try:
+            self.perf_monitor.export_json(filepath)
+        except Exception as e:
+            print(f"計測結果の保存エラー: {e}"); tkinter.messagebox.showerror("保存エラー", f"計測結果の保存中にエラー: {e}")
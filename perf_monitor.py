@@ -0,0 +1,136 @@
+import functools
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class TclCallCounter:
+    # tkapp のプロキシ。root.tk を差し替えると、それ以降に作られたウィジェットの
+    # tk.call がすべてここを通るので、イベントごとの Tcl 呼び出し回数を数えられる。
+    # ウィジェットは作られたときの tk を持ち続けるので、プロキシは外さずに call だけを差し替える:
+    # 数えていない間の call は tkapp のメソッドそのもので、Python の関数呼び出しは増えない
+    def __init__(self, tkapp):
+        self._tkapp = tkapp
+        self.calls = 0
+        self.set_counting(False)
+
+    def set_counting(self, counting):
+        self.call = self._counted_call if counting else self._tkapp.call
+
+    def _counted_call(self, *args):
+        self.calls += 1
+        return self._tkapp.call(*args)
+
+    def __getattr__(self, name):
+        # 2回目からは __getattr__ を通らないように、tkapp のメソッドをインスタンスに置いておく
+        value = getattr(self._tkapp, name)
+        setattr(self, name, value)
+        return value
+
+
+class EventStats:
+    def __init__(self, window_size):
+        self.durations_ms = deque(maxlen=window_size)
+        self.tcl_calls = deque(maxlen=window_size)
+        self.total_count = 0
+        self.max_ms = 0.0
+
+    def add(self, elapsed_ms, tcl_calls):
+        self.durations_ms.append(elapsed_ms)
+        self.tcl_calls.append(tcl_calls)
+        self.total_count += 1
+        if elapsed_ms > self.max_ms: self.max_ms = elapsed_ms
+
+    def percentile(self, pct):
+        if not self.durations_ms: return 0.0
+        ordered = sorted(self.durations_ms)
+        index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+        return ordered[index]
+
+    def summary(self):
+        window_count = len(self.durations_ms)
+        return {
+            'count': self.total_count,
+            'window': window_count,
+            'p50_ms': round(self.percentile(50), 3),
+            'p95_ms': round(self.percentile(95), 3),
+            'p99_ms': round(self.percentile(99), 3),
+            'max_ms': round(self.max_ms, 3),
+            'tcl_calls_avg': round(sum(self.tcl_calls) / window_count, 1) if window_count else 0.0,
+            'tcl_calls_max': max(self.tcl_calls) if window_count else 0,
+        }
+
+
+class PerfMonitor:
+    DEFAULT_WINDOW_SIZE = 1000
+
+    def __init__(self, window_size=DEFAULT_WINDOW_SIZE):
+        self.window_size = window_size
+        self.stats = {}
+        self.tcl_counter = None
+        self.enabled = True
+
+    def install_tcl_counter(self, root):
+        # ウィジェット生成前 (Tk.__init__ 直後) に呼ぶこと
+        if not isinstance(root.tk, TclCallCounter):
+            root.tk = TclCallCounter(root.tk)
+        self.tcl_counter = root.tk
+
+    def set_tcl_counting(self, counting):
+        # Tcl 呼び出しを数えるのは HUD を表示している間だけ
+        if self.tcl_counter: self.tcl_counter.set_counting(counting)
+
+    def _tcl_call_count(self):
+        return self.tcl_counter.calls if self.tcl_counter else 0
+
+    @contextmanager
+    def measure(self, name):
+        if not self.enabled:
+            yield; return
+        start_calls = self._tcl_call_count()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000.0, self._tcl_call_count() - start_calls)
+
+    def record(self, name, elapsed_ms, tcl_calls=0):
+        event_stats = self.stats.get(name)
+        if event_stats is None:
+            event_stats = self.stats[name] = EventStats(self.window_size)
+        event_stats.add(elapsed_ms, tcl_calls)
+
+    def reset(self):
+        self.stats.clear()
+
+    def report(self):
+        return {name: event_stats.summary() for name, event_stats in sorted(self.stats.items())}
+
+    def export_json(self, filepath, extra=None):
+        data = {'generated_at': time.strftime("%Y-%m-%dT%H:%M:%S"), 'window_size': self.window_size,
+                'events': self.report()}
+        if extra: data.update(extra)
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+
+    def hud_lines(self):
+        lines = [f"{'event':<24}{'n':>6}{'p50':>8}{'p95':>8}{'p99':>8}{'tcl':>7}"]
+        for name, s in self.report().items():
+            lines.append(f"{name[:23]:<24}{s['count']:>6}{s['p50_ms']:>8.1f}{s['p95_ms']:>8.1f}{s['p99_ms']:>8.1f}{s['tcl_calls_avg']:>7.0f}")
+        return lines
+
+
+def perf_timed(name=None):
+    # self.perf_monitor を持つクラスのメソッドに付ける計測デコレータ
+    def decorator(func):
+        event_name = name or func.__name__
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            monitor = getattr(self, 'perf_monitor', None)
+            if monitor is None or not monitor.enabled:
+                return func(self, *args, **kwargs)
+            with monitor.measure(event_name):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
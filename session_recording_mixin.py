@@ -0,0 +1,43 @@
+import tkinter as tk
+from tkinter import filedialog
+import tkinter.messagebox
+
+from event_recorder import EventRecorder, EventReplayer, load_recording
+
+
+class SessionRecordingMixin:
+    def _init_session_recording(self):
+        self.recording_session = tk.BooleanVar(value=False)
+        self._event_recorder = None
+        self._current_layout_path = None
+
+    def toggle_session_recording(self):
+        if self.recording_session.get():
+            self._event_recorder = EventRecorder(self)
+            self._event_recorder.start()
+            return
+        if not self._event_recorder: return
+        events = self._event_recorder.stop()
+        if not events: return
+        filepath = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON Files", "*.json")], title="操作の記録を保存")
+        if not filepath: return
+        try:
+            self._event_recorder.save(filepath, layout_path=self._current_layout_path)
+        except Exception as e:
+            print(f"操作記録の保存エラー: {e}"); tkinter.messagebox.showerror("保存エラー", f"操作記録の保存中にエラー: {e}")
+
+    def replay_session_recording(self):
+        filepath = filedialog.askopenfilename(filetypes=[("JSON Files", "*.json")], title="操作の記録を再生")
+        if not filepath: return
+        try:
+            recording = load_recording(filepath)
+        except Exception as e:
+            print(f"操作記録の読み込みエラー: {e}"); tkinter.messagebox.showerror("オープンエラー", f"操作記録の読み込み中にエラー: {e}"); return
+        if recording.get("item_count") not in (None, len(self.canvas_items)):
+            if not tkinter.messagebox.askyesno("再生の確認", "記録時とアイテム数が異なります。このまま再生しますか？"): return
+        replayer = EventReplayer(self, recording)
+        timings = replayer.replay()
+        total_ms = sum(t["elapsed_ms"] for t in timings)
+        handler_lines = [f"{name}: {stats['count']} 回, 合計 {stats['total_ms']:.1f} ms, 最大 {stats['max_ms']:.1f} ms"
+                         for name, stats in sorted(replayer.summary().items())]
+        tkinter.messagebox.showinfo("再生完了", "\n".join([f"{len(timings)} イベントを再生しました (合計 {total_ms:.1f} ms)", ""] + handler_lines))
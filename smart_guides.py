@@ -0,0 +1,94 @@
+import bisect
+
+# スマートガイド用の辺インデックス。
+# 各軸ごとに (座標, アイテムID) をソート済み配列で持ち、最寄りの線を bisect で O(log n) で引く。
+# アイテムが動いたら、そのアイテムの線だけを削除・再挿入する。
+
+
+class EdgeIndex:
+    def __init__(self):
+        self._keys = [] # (座標, アイテムID) をソートしたもの
+
+    def __len__(self):
+        return len(self._keys)
+
+    def build(self, entries):
+        self._keys = sorted(entries)
+
+    def add(self, value, item_id):
+        bisect.insort(self._keys, (value, item_id))
+
+    def remove(self, value, item_id):
+        index = bisect.bisect_left(self._keys, (value, item_id))
+        if index < len(self._keys) and self._keys[index] == (value, item_id):
+            del self._keys[index]
+
+    def nearest(self, value, tolerance):
+        # tolerance 以内で最も近い線の座標 (無ければ None)
+        keys = self._keys
+        index = bisect.bisect_left(keys, (value,))
+        best = None
+        for candidate in (index - 1, index):
+            if 0 <= candidate < len(keys):
+                distance = abs(keys[candidate][0] - value)
+                if distance <= tolerance and (best is None or distance < abs(best - value)):
+                    best = keys[candidate][0]
+        return best
+
+
+def bbox_lines(bbox):
+    # (左, 中央, 右), (上, 中央, 下)
+    x1, y1, x2, y2 = bbox
+    return (x1, (x1 + x2) / 2, x2), (y1, (y1 + y2) / 2, y2)
+
+
+class GuideIndex:
+    def __init__(self):
+        self.x_edges = EdgeIndex()
+        self.y_edges = EdgeIndex()
+        self._bboxes = {}
+
+    def __len__(self):
+        return len(self._bboxes)
+
+    def __contains__(self, item_id):
+        return item_id in self._bboxes
+
+    def build(self, bboxes):
+        self._bboxes = dict(bboxes)
+        x_entries, y_entries = [], []
+        for item_id, bbox in self._bboxes.items():
+            xs, ys = bbox_lines(bbox)
+            x_entries.extend((x, item_id) for x in xs); y_entries.extend((y, item_id) for y in ys)
+        self.x_edges.build(x_entries); self.y_edges.build(y_entries)
+
+    def remove(self, item_id):
+        bbox = self._bboxes.pop(item_id, None)
+        if bbox is None: return None
+        xs, ys = bbox_lines(bbox)
+        for x in xs: self.x_edges.remove(x, item_id)
+        for y in ys: self.y_edges.remove(y, item_id)
+        return bbox
+
+    def set_bbox(self, item_id, bbox):
+        self.remove(item_id)
+        self._bboxes[item_id] = tuple(bbox)
+        xs, ys = bbox_lines(bbox)
+        for x in xs: self.x_edges.add(x, item_id)
+        for y in ys: self.y_edges.add(y, item_id)
+
+    @staticmethod
+    def _snap_axis(edges, lines, tolerance):
+        best_offset, best_line = None, None
+        for line in lines:
+            target = edges.nearest(line, tolerance)
+            if target is not None and (best_offset is None or abs(target - line) < abs(best_offset)):
+                best_offset, best_line = target - line, target
+        return best_offset, best_line
+
+    def snap(self, bbox, tolerance):
+        # bbox の左/中央/右・上/中央/下を最寄りの線に合わせるための (dx, dy, 縦ガイドx, 横ガイドy)
+        xs, ys = bbox_lines(bbox)
+        dx, guide_x = self._snap_axis(self.x_edges, xs, tolerance)
+        dy, guide_y = self._snap_axis(self.y_edges, ys, tolerance)
+        return dx, dy, guide_x, guide_y
@@ -0,0 +1,94 @@
+import tkinter as tk
+
+from smart_guides import GuideIndex
+from zorder_mixin import SELECTION_LAYER_TAG
+
+SMART_GUIDE_TAG = "smart_guide"
+SMART_GUIDE_TOLERANCE = 6 # この距離 (px) 以内なら他のアイテムの辺・中心線に吸着する
+SMART_GUIDE_COLOR = "#ff3399"
+
+
+class SmartGuidesMixin:
+    def _init_smart_guides(self, canvas):
+        self.smart_guides_enabled = tk.BooleanVar(value=True)
+        self._guide_index = None
+        self._guide_indexed_ids = set() # インデックスに反映済みのアイテム (bbox の無いものも含む)
+        self._guide_dirty_ids = set() # 次のドラッグまでに bbox を取り直すアイテム
+        self._guide_drag = None # ドラッグ中の状態 (最初の移動イベントで作る)
+        self._guide_lines = tuple(
+            canvas.create_line(0, 0, 0, 0, fill=SMART_GUIDE_COLOR, dash=(4, 2), state="hidden",
+                               tags=(SMART_GUIDE_TAG, SELECTION_LAYER_TAG))
+            for _ in range(2)) # (縦ガイド, 横ガイド)
+        canvas.tag_lower(SMART_GUIDE_TAG, self._layer_top_marker("selection"))
+
+    def invalidate_smart_guides(self, item_ids=None):
+        # 移動以外でアイテムの大きさ・位置が変わったとき (リサイズ、フォント変更など)。
+        # item_ids を渡せば次のドラッグでそのアイテムだけを取り直し、None なら作り直す (読み込み・クリア)
+        if item_ids is None: self._guide_index = None
+        elif self._guide_index is not None: self._guide_dirty_ids.update(item_ids)
+        self.mark_live_preview_dirty(item_ids)
+
+    def _ensure_guide_index(self):
+        if self._guide_index is None:
+            bboxes = {}
+            for item in self.canvas_items:
+                bbox = self.canvas_frame.bbox(item.id)
+                if bbox: bboxes[item.id] = bbox
+            self._guide_index = GuideIndex(); self._guide_index.build(bboxes)
+            self._guide_indexed_ids = {item.id for item in self.canvas_items}; self._guide_dirty_ids.clear()
+            return self._guide_index
+        # 追加・削除されたアイテムと invalidate されたアイテムだけを入れ替える (Tcl の bbox はその数だけ)
+        live_ids = {item.id for item in self.canvas_items}
+        dirty = self._guide_dirty_ids | (live_ids ^ self._guide_indexed_ids)
+        for item_id in dirty:
+            bbox = self.canvas_frame.bbox(item_id) if item_id in live_ids else None
+            if bbox: self._guide_index.set_bbox(item_id, bbox)
+            else: self._guide_index.remove(item_id)
+        self._guide_indexed_ids = live_ids; self._guide_dirty_ids.clear()
+        return self._guide_index
+
+    def _begin_guide_drag(self, start_bboxes):
+        self._guide_drag = {'bboxes': dict(start_bboxes), 'union': None, 'delta': (0, 0)}
+        boxes = [bbox for bbox in start_bboxes.values() if bbox]
+        if not self.smart_guides_enabled.get() or not boxes: return
+        # 動かすアイテムの線はインデックスから外し、動かないアイテムの線だけに吸着させる
+        index = self._ensure_guide_index()
+        for item_id in start_bboxes: index.remove(item_id)
+        self._guide_drag['union'] = (min(b[0] for b in boxes), min(b[1] for b in boxes),
+                                     max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+    def snap_drag_delta(self, start_bboxes, raw_delta, grid_delta):
+        # raw_delta: マウスの移動量、grid_delta: グリッド吸着後の移動量。ガイドに吸着した軸はガイドを優先する
+        if self._guide_drag is None: self._begin_guide_drag(start_bboxes)
+        drag = self._guide_drag
+        if drag['union'] is None:
+            drag['delta'] = grid_delta; return grid_delta
+        x1, y1, x2, y2 = drag['union']
+        moved = (x1 + raw_delta[0], y1 + raw_delta[1], x2 + raw_delta[0], y2 + raw_delta[1])
+        dx, dy, guide_x, guide_y = self._guide_index.snap(moved, SMART_GUIDE_TOLERANCE)
+        delta_x = raw_delta[0] + dx if dx is not None else grid_delta[0]
+        delta_y = raw_delta[1] + dy if dy is not None else grid_delta[1]
+        self._show_guides(guide_x, guide_y)
+        drag['delta'] = (delta_x, delta_y)
+        return delta_x, delta_y
+
+    def _show_guides(self, guide_x, guide_y):
+        vertical, horizontal = self._guide_lines
+        width, height = self.canvas_frame.winfo_width(), self.canvas_frame.winfo_height()
+        if guide_x is None: self.canvas_frame.itemconfigure(vertical, state="hidden")
+        else:
+            self.canvas_frame.coords(vertical, guide_x, 0, guide_x, height)
+            self.canvas_frame.itemconfigure(vertical, state="normal")
+        if guide_y is None: self.canvas_frame.itemconfigure(horizontal, state="hidden")
+        else:
+            self.canvas_frame.coords(horizontal, 0, guide_y, width, guide_y)
+            self.canvas_frame.itemconfigure(horizontal, state="normal")
+
+    def end_guide_drag(self):
+        drag, self._guide_drag = self._guide_drag, None
+        self._show_guides(None, None)
+        if not drag or drag['union'] is None or self._guide_index is None: return
+        # 移動後の位置でインデックスに戻す (Tcl 呼び出し無しで開始位置 + 移動量から計算)
+        delta_x, delta_y = drag['delta']
+        for item_id, bbox in drag['bboxes'].items():
+            if bbox: self._guide_index.set_bbox(item_id, (bbox[0] + delta_x, bbox[1] + delta_y, bbox[2] + delta_x, bbox[3] + delta_y))
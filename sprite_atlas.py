@@ -0,0 +1,91 @@
+import hashlib
+import os
+import tkinter as tk
+
+from PIL import Image, ImageTk
+
+# 小さな画像をまとめて1枚 (または数枚) のシートに詰め、各アイテムの画像は
+# シートから PhotoImage の copy -from で切り出す。
+# 画像ごとの PIL -> Tk 転送とファイル読み込みが、シート単位の1回にまとまる。
+
+MAX_SPRITE_SIZE = 128 # 幅・高さともにこれ以下の画像だけをアトラスに入れる
+ATLAS_SHEET_SIZE = 1024
+ATLAS_PADDING = 1
+
+
+def is_sprite_size(width, height):
+    return 0 < width <= MAX_SPRITE_SIZE and 0 < height <= MAX_SPRITE_SIZE
+
+
+def pack_shelves(sizes, sheet_size=ATLAS_SHEET_SIZE, padding=ATLAS_PADDING):
+    # 高さの大きい順に棚 (行) へ左から詰める。戻り値は入力順の (シート番号, x, y) と各シートの使用範囲
+    placements = [None] * len(sizes)
+    extents = []
+    sheet_index, x, y, shelf_height = 0, 0, 0, 0
+    for i in sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0])):
+        width, height = sizes[i]
+        if width > sheet_size or height > sheet_size:
+            raise ValueError(f"アトラスのシートより大きい画像です: {width}x{height}")
+        if x + width > sheet_size:
+            x, y, shelf_height = 0, y + shelf_height, 0
+        if y + height > sheet_size:
+            sheet_index, x, y, shelf_height = sheet_index + 1, 0, 0, 0
+        if sheet_index == len(extents): extents.append([0, 0])
+        placements[i] = (sheet_index, x, y)
+        extents[sheet_index][0] = max(extents[sheet_index][0], x + width)
+        extents[sheet_index][1] = max(extents[sheet_index][1], y + height)
+        x += width + padding
+        shelf_height = max(shelf_height, height + padding)
+    return placements, [tuple(extent) for extent in extents]
+
+
+def compose_sheets(pil_images):
+    placements, extents = pack_shelves([image.size for image in pil_images])
+    sheets = [Image.new("RGBA", extent, (0, 0, 0, 0)) for extent in extents]
+    for image, (sheet_index, x, y) in zip(pil_images, placements):
+        sheets[sheet_index].paste(image if image.mode == "RGBA" else image.convert("RGBA"), (x, y))
+    return sheets, placements
+
+
+def cut_sprite(master, sheet_photo, x, y, width, height):
+    photo = tk.PhotoImage(master=master, width=width, height=height)
+    photo.tk.call(photo, "copy", str(sheet_photo), "-from", x, y, x + width, y + height)
+    return photo
+
+
+def build_atlas_photos(master, pil_images):
+    # pil_images (表示サイズ済み) と同じ順番で、シートから切り出した PhotoImage を返す
+    if not pil_images: return []
+    sheets, placements = compose_sheets(pil_images)
+    sheet_photos = [ImageTk.PhotoImage(sheet, master=master) for sheet in sheets]
+    # 切り出した画像はシートと独立したデータを持つので、シートはこの関数を抜けると解放される
+    return [cut_sprite(master, sheet_photos[sheet_index], x, y, image.width, image.height)
+            for image, (sheet_index, x, y) in zip(pil_images, placements)]
+
+
+def bake_atlas_sheets(pil_images, asset_dir):
+    # generate_code 用: シートを内容ハッシュ名の PNG で書き出し、(ファイル名一覧, 入力順の配置) を返す
+    sheets, placements = compose_sheets(pil_images)
+    os.makedirs(asset_dir, exist_ok=True)
+    names = []
+    for sheet in sheets:
+        name = f"atlas_{hashlib.sha1(sheet.tobytes()).hexdigest()[:16]}_{sheet.width}x{sheet.height}.png"
+        target = os.path.join(asset_dir, name)
+        if not os.path.exists(target): sheet.save(target, format="PNG")
+        names.append(name)
+    return names, placements
+
+
+def atlas_code_lines(sheet_names):
+    # 生成アプリ側の切り出し関数 (PIL 不要)。シートは最初に使われたときに1回だけ読み込む
+    return [
+        "ATLAS_SHEETS = (" + "".join(f"{name!r}, " for name in sheet_names) + ")",
+        "_atlas_sheet_photos = {}\n",
+        "def atlas_image(sheet_index, x, y, width, height):",
+        "    sheet = _atlas_sheet_photos.get(sheet_index)",
+        "    if sheet is None:",
+        "        sheet = _atlas_sheet_photos[sheet_index] = tk.PhotoImage(file=os.path.join(ASSET_DIR, ATLAS_SHEETS[sheet_index]))",
+        "    photo = tk.PhotoImage(width=width, height=height)",
+        "    photo.tk.call(photo, 'copy', sheet, '-from', x, y, x + width, y + height)",
+        "    return photo\n",
+    ]
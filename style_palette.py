@@ -0,0 +1,72 @@
+# 名前付きスタイル (パレット)。
+# スタイルは {"fg": 色, "bg": 色, "font": {"family", "size", "weight", "slant"}} で、ウィジェットは名前だけを持つ。
+# - フォントは名前付きフォント palette_<スタイル名> にして、全ウィジェットから名前で参照する (フォントを変えると1回の設定で全部に反映される)
+# - ttk のウィジェットは <スタイル名>.TLabel などの ttk.Style で文字色を持つ
+# - tk のウィジェット (Button など) はスタイルを持てないので、色だけはウィジェットに設定する (設計画面では Tcl のループ1回でまとめて変える)
+# レイアウト JSON では "palette": {スタイル名: スタイル} に1回だけ書き、アイテムは "style": スタイル名 を持つ。
+
+STYLE_FIELDS = ("fg", "bg", "font")
+TTK_STYLED_CLASSES = ("TLabel", "TEntry", "TCombobox")
+TK_BG_CLASSES = ("Button", "Checkbutton", "Radiobutton")
+FONT_OPTION_NAMES = ("family", "size", "weight", "slant")
+
+
+def font_name(style_name):
+    return f"palette_{style_name}"
+
+
+def ttk_style_name(style_name, class_name):
+    return f"{style_name}.{class_name}"
+
+
+def font_options(font):
+    # tkfont.Font(...) に渡せる形 (サイズは正の値 = ポイント)
+    options = {name: font[name] for name in FONT_OPTION_NAMES if font.get(name) not in (None, "")}
+    if "size" in options: options["size"] = abs(int(options["size"]))
+    return options
+
+
+def style_from_item(item_data):
+    # save_layout 形式のウィジェットから、そのウィジェットの見た目をスタイルにする
+    colors = item_data.get("colors", {})
+    spec = {"fg": colors.get("fg") or None, "bg": colors.get("bg") or None,
+            "font": font_options(item_data["font"]) if item_data.get("font") else None}
+    return {name: value for name, value in spec.items() if value}
+
+
+class PaletteRef(str):
+    # 生成コードで値そのものではなく PALETTE を参照する式として書き出す (repr がそのまま式になる)
+    def __repr__(self):
+        return str(self)
+
+
+def styled_widget_options(style_name, spec, class_name):
+    # 生成コード用: スタイルを使うウィジェットのオプション (リテラルの代わりにスタイル名・フォント名・PALETTE の参照)
+    options = {}
+    if class_name in TTK_STYLED_CLASSES:
+        options["style"] = ttk_style_name(style_name, class_name)
+    else:
+        if spec.get("fg"): options["fg"] = PaletteRef(f"PALETTE[{style_name!r}]['fg']")
+        if spec.get("bg") and class_name in TK_BG_CLASSES: options["background"] = PaletteRef(f"PALETTE[{style_name!r}]['bg']")
+    if spec.get("font"): options["font"] = font_name(style_name)
+    return options
+
+
+def palette_code_lines(palette):
+    lines = ["PALETTE = {"]
+    lines += [f"    {name!r}: {spec!r}," for name, spec in palette.items()]
+    lines += [
+        "}", "",
+        "def setup_palette(root):",
+        "    # 名前付きフォントと ttk のスタイルを1回だけ作る (ウィジェットはスタイル名・フォント名で参照する)",
+        "    style = ttk.Style(root)",
+        "    for name, spec in PALETTE.items():",
+        "        if spec.get('font'): tkfont.Font(root, name=f'palette_{name}', **spec['font'])",
+        "        options = {}",
+        "        if spec.get('fg'): options['foreground'] = spec['fg']",
+        "        if spec.get('font'): options['font'] = f'palette_{name}'",
+        f"        for class_name in {TTK_STYLED_CLASSES!r}:",
+        "            if options: style.configure(f'{name}.{class_name}', **options)",
+        "",
+    ]
+    return lines
@@ -0,0 +1,202 @@
+import copy
+import tkinter as tk
+import tkinter.messagebox
+import tkinter.font as tkfont
+from tkinter import ttk, simpledialog, colorchooser
+
+from style_palette import (TTK_STYLED_CLASSES, TK_BG_CLASSES, font_name, ttk_style_name, font_options, style_from_item)
+
+
+class StylePaletteMixin:
+    def _init_style_palette(self):
+        self.palette = {} # スタイル名 -> {"fg", "bg", "font"}
+        self._palette_fonts = {} # スタイル名 -> 名前付きフォント
+        self._palette_window = None
+        # 複数ウィジェットの configure を Tcl のループ1回で行う
+        self.tk.eval("proc ::layoutdesigner_configure_widgets {widgets args} {foreach w $widgets {$w configure {*}$args}}")
+
+    def _configure_widgets_batched(self, widgets, **options):
+        if not widgets or not options: return
+        args = [value for name, option_value in options.items() for value in (f"-{name}", option_value)]
+        self.tk.call("::layoutdesigner_configure_widgets", tuple(str(w) for w in widgets), *args)
+
+    def _configure_style_resources(self, name):
+        # 名前付きフォントと ttk スタイルを palette[name] に合わせる (ウィジェット数によらず数回の呼び出し)
+        spec = self.palette[name]
+        font = font_options(spec["font"]) if spec.get("font") else None
+        if font:
+            named_font = self._palette_fonts.get(name)
+            if named_font is None: self._palette_fonts[name] = tkfont.Font(self, name=font_name(name), exists=False, **font)
+            else: named_font.configure(**font)
+        style = ttk.Style(self)
+        for class_name in TTK_STYLED_CLASSES:
+            # 指定の無い項目は元のクラスのスタイルの値に戻す
+            style.configure(ttk_style_name(name, class_name), foreground=spec.get("fg") or style.lookup(class_name, "foreground"),
+                            font=font_name(name) if font else (style.lookup(class_name, "font") or "TkDefaultFont"))
+
+    def _styled_widget_infos(self, name):
+        return [item for item in self.canvas_items if item.type == 'widget' and item.style == name]
+
+    def _apply_style_to_widgets(self, name, item_infos):
+        # スタイルの名前付きフォント・ttk スタイルを参照させ、tk のウィジェットには色をまとめて設定する
+        spec = self.palette[name]
+        ttk_widgets = {}; tk_widgets = []; tk_bg_widgets = []
+        for item in item_infos:
+            widget = item.obj; class_name = widget.winfo_class()
+            if class_name in TTK_STYLED_CLASSES: ttk_widgets.setdefault(class_name, []).append(widget)
+            else:
+                tk_widgets.append(widget)
+                if class_name in TK_BG_CLASSES: tk_bg_widgets.append(widget)
+            item.style = name
+        for class_name, widgets in ttk_widgets.items():
+            # ウィジェット個別の文字色を外してスタイルの色を使う
+            self._configure_widgets_batched(widgets, style=ttk_style_name(name, class_name), foreground="")
+        if spec.get("fg"): self._configure_widgets_batched(tk_widgets, fg=spec["fg"])
+        if spec.get("bg"): self._configure_widgets_batched(tk_bg_widgets, background=spec["bg"])
+        if spec.get("font"): self._configure_widgets_batched([item.obj for item in item_infos], font=font_name(name))
+
+    def define_palette_style(self, name, spec):
+        self.palette[name] = dict(spec)
+        self._configure_style_resources(name)
+
+    def load_palette(self, palette_data):
+        for name, spec in palette_data.items(): self.define_palette_style(name, spec)
+
+    def clear_palette(self):
+        self.palette.clear()
+        if self._palette_window is not None and self._palette_window.winfo_exists(): self._refresh_palette_window()
+
+    def _after_style_change(self, item_infos):
+        ids = [item.id for item in item_infos]
+        self.invalidate_smart_guides(ids); self.invalidate_group_bounds(ids)
+        self.update_property_editor_for_selection(); self._schedule_highlight_refresh()
+
+    def update_palette_style(self, name, **changes):
+        # パレットの1項目を変える。同じスタイルのウィジェットは名前付きフォント・ttk スタイル経由でまとめて変わる
+        previous = copy.deepcopy(self.palette[name])
+        had_font = name in self._palette_fonts
+        self.palette[name].update(changes)
+        self._configure_style_resources(name)
+        item_infos = self._styled_widget_infos(name)
+        if "fg" in changes or "bg" in changes: self._apply_style_to_widgets(name, [item for item in item_infos if item.obj.winfo_class() not in TTK_STYLED_CLASSES])
+        if changes.get("font") and not had_font: self._apply_style_to_widgets(name, item_infos) # 初めて名前付きフォントを作ったとき
+        def restore():
+            if name not in self.palette: return
+            self.palette[name] = previous; self._configure_style_resources(name)
+            self._apply_style_to_widgets(name, self._styled_widget_infos(name))
+            self._after_style_change(self._styled_widget_infos(name))
+        self.push_undo_entry(f"スタイルの変更 ({name})", restore, merge_key=('palette', name, tuple(sorted(changes))),
+                             item_ids=[item.id for item in item_infos])
+        self._after_style_change(item_infos)
+
+    def apply_style_to_selection(self, name):
+        item_infos = self._selected_widget_infos()
+        if not item_infos or name not in self.palette: return
+        records = []; previous_styles = [(item, item.style) for item in item_infos]
+        for item in item_infos:
+            widget = item.obj
+            for option in ('font', 'style', 'foreground', 'fg', 'background'):
+                if option in widget.keys(): records.append((widget, option, widget.cget(option)))
+        self._apply_style_to_widgets(name, item_infos)
+        config_restore = self._make_config_restore(records)
+        def restore():
+            config_restore()
+            for item, style in previous_styles:
+                item.style = style
+        self.push_undo_entry(f"スタイルを適用 ({name})", restore, item_ids=[item.id for item in item_infos])
+        self._after_style_change(item_infos)
+
+    def detach_widget_styles(self, item_ids):
+        # 個別に色やフォントを変えたウィジェットはスタイルから外す (今の見た目はウィジェット自身の値として残す)
+        if not self.palette: return
+        for item in self.canvas_items:
+            if item.id not in item_ids or not item.style: continue
+            widget = item.obj; spec = self.palette.get(item.style, {}); item.style = None
+            try:
+                actual = tkfont.Font(font=widget.cget("font")).actual()
+                styles = " ".join(part for part, on in (("bold", actual['weight'] == 'bold'), ("italic", actual['slant'] == 'italic')) if on)
+                widget.configure(font=(actual['family'], abs(actual['size']), styles))
+                if widget.winfo_class() in TTK_STYLED_CLASSES:
+                    widget.configure(style="", foreground=spec.get("fg") or "")
+            except tk.TclError as e: print(f"スタイル解除エラー: {e}")
+
+    def create_style_from_selection(self):
+        item_infos = self._selected_widget_infos()
+        if not item_infos:
+            tkinter.messagebox.showinfo("スタイルを作成", "ウィジェットを選択してください。"); return
+        name = simpledialog.askstring("スタイルを作成", "スタイル名 (英数字):", initialvalue=f"Style{len(self.palette) + 1}", parent=self)
+        if not name: return
+        name = name.strip().replace(" ", "_").replace(".", "_")
+        if name in self.palette:
+            tkinter.messagebox.showerror("スタイルを作成", f"スタイル {name} は既にあります。"); return
+        item_data = self._serialize_item(item_infos[0])
+        if item_data is None: return
+        self.define_palette_style(name, style_from_item(item_data))
+        self.apply_style_to_selection(name)
+
+    def _build_style_menu(self, parent_menu):
+        style_menu = tk.Menu(parent_menu, tearoff=0); parent_menu.add_cascade(label="スタイル", menu=style_menu)
+        style_menu.add_command(label="選択からスタイルを作成...", command=self.create_style_from_selection)
+        apply_menu = tk.Menu(style_menu, tearoff=0, postcommand=lambda: self._fill_apply_style_menu(apply_menu))
+        style_menu.add_cascade(label="スタイルを適用", menu=apply_menu)
+        style_menu.add_command(label="パレットを編集...", command=self.open_palette_editor)
+
+    def _fill_apply_style_menu(self, menu):
+        menu.delete(0, tk.END)
+        if not self.palette: menu.add_command(label="(スタイルがありません)", state="disabled"); return
+        for name in self.palette:
+            menu.add_command(label=name, command=lambda n=name: self.apply_style_to_selection(n))
+
+    def open_palette_editor(self):
+        if self._palette_window is None or not self._palette_window.winfo_exists():
+            window = self._palette_window = tk.Toplevel(self); window.title("パレット"); window.geometry("360x300")
+            button_frame = ttk.Frame(window); button_frame.pack(side="bottom", fill="x", padx=5, pady=5)
+            ttk.Button(button_frame, text="文字色...", command=lambda: self._choose_palette_color("fg")).pack(side="left")
+            ttk.Button(button_frame, text="背景色...", command=lambda: self._choose_palette_color("bg")).pack(side="left", padx=5)
+            ttk.Button(button_frame, text="フォント...", command=self._choose_palette_font).pack(side="left")
+            ttk.Button(button_frame, text="閉じる", command=window.destroy).pack(side="right")
+            self._palette_listbox = tk.Listbox(window, activestyle="none", exportselection=False)
+            self._palette_listbox.pack(expand=True, fill="both", padx=5, pady=(5, 0))
+        self._refresh_palette_window()
+        self._palette_window.lift()
+
+    def _refresh_palette_window(self):
+        selection = self._palette_listbox.curselection()
+        self._palette_listbox.delete(0, tk.END)
+        for name, spec in self.palette.items():
+            font = spec.get("font") or {}
+            font_text = " ".join(str(font[key]) for key in ("family", "size", "weight", "slant") if font.get(key) not in (None, "normal", "roman"))
+            count = len(self._styled_widget_infos(name))
+            self._palette_listbox.insert(tk.END, f"{name}: 文字 {spec.get('fg') or '-'} / 背景 {spec.get('bg') or '-'} / {font_text or '-'} ({count} 個)")
+        if selection and selection[0] < len(self.palette): self._palette_listbox.selection_set(selection[0])
+
+    def _selected_palette_name(self):
+        selection = self._palette_listbox.curselection()
+        return list(self.palette)[selection[0]] if selection else None
+
+    def _choose_palette_color(self, role):
+        name = self._selected_palette_name()
+        if name is None: return
+        code = colorchooser.askcolor(title="文字色を選択" if role == "fg" else "背景色を選択",
+                                     initialcolor=self.palette[name].get(role) or ("#000000" if role == "fg" else "#F0F0F0"), parent=self._palette_window)
+        if not code or not code[1]: return
+        self.update_palette_style(name, **{role: code[1]})
+        self._refresh_palette_window()
+
+    def _choose_palette_font(self):
+        name = self._selected_palette_name()
+        if name is None: return
+        font = dict(self.palette[name].get("font") or tkfont.nametofont("TkDefaultFont").actual())
+        text = simpledialog.askstring("フォント", "ファミリー, サイズ, 太字(bold)/斜体(italic) (例: Meiryo, 12, bold):",
+                                      initialvalue=f"{font.get('family', '')}, {abs(int(font.get('size', 9)))}" +
+                                                   "".join(f", {v}" for v in (font.get('weight'), font.get('slant')) if v in ("bold", "italic")),
+                                      parent=self._palette_window)
+        if not text: return
+        parts = [part.strip() for part in text.split(",")]
+        try: size = int(parts[1]) if len(parts) > 1 and parts[1] else abs(int(font.get('size', 9)))
+        except ValueError:
+            tkinter.messagebox.showerror("フォント", f"サイズが数値ではありません: {parts[1]}", parent=self._palette_window); return
+        self.update_palette_style(name, font={"family": parts[0] or font.get("family"), "size": size,
+                                              "weight": "bold" if "bold" in parts[2:] else "normal",
+                                              "slant": "italic" if "italic" in parts[2:] else "roman"})
+        self._refresh_palette_window()
@@ -0,0 +1,14 @@
+import copy
+
+
+def widget(uid, x, y, text, z):
+    return {"uid": uid, "type": "widget", "widget_class_name": "TLabel", "x": x, "y": y, "width": 40, "height": 20, "text": text, "z": z}
+
+
+BASE = {"general_settings": {"grid_spacing": 10, "canvas_size": [600, 400]},
+        "items": [widget("a", 0, 0, "A", 0), widget("b", 50, 0, "B", 1), widget("c", 100, 0, "C", 2)],
+        "palette": {"title": {"fg": "#000000"}}}
+
+
+def base_layout():
+    return copy.deepcopy(BASE)
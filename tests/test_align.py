@@ -0,0 +1,42 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import align_mixin
+from align_mixin import compute_align_deltas, compute_distribute_deltas
+
+BOXES = [(10, 0, 30, 20), (50, 40, 100, 60), (0, 15, 5, 25)]
+
+
+class AlignDeltasTest(unittest.TestCase):
+    # NumPy がある場合と無い場合 (リストで計算) で同じ結果になること
+    def check(self, function, *args, expected):
+        self.assertEqual(function(*args), expected)
+        with mock.patch.object(align_mixin, "np", None):
+            self.assertEqual(function(*args), expected)
+
+    def test_edges(self):
+        self.check(compute_align_deltas, BOXES, "left", expected=[(-10, 0), (-50, 0), (0, 0)])
+        self.check(compute_align_deltas, BOXES, "right", expected=[(70, 0), (0, 0), (95, 0)])
+        self.check(compute_align_deltas, BOXES, "top", expected=[(0, 0), (0, -40), (0, -15)])
+        self.check(compute_align_deltas, BOXES, "bottom", expected=[(0, 40), (0, 0), (0, 35)])
+
+    def test_centers(self):
+        self.check(compute_align_deltas, BOXES, "center_x", expected=[(30, 0), (-25, 0), (48, 0)])
+        self.check(compute_align_deltas, BOXES, "center_y", expected=[(0, 20), (0, -20), (0, 10)])
+
+    def test_distribute_keeps_ends_and_equalizes_gaps(self):
+        boxes = [(0, 0, 10, 10), (90, 0, 100, 10), (20, 0, 40, 10), (50, 0, 60, 10)]
+        # 隙間の合計 100 - 50 = 50 を 3 等分 (端数は丸め)
+        self.check(compute_distribute_deltas, boxes, 0, expected=[(0, 0), (0, 0), (7, 0), (13, 0)])
+
+    def test_distribute_vertically(self):
+        boxes = [(0, 0, 10, 10), (0, 12, 10, 22), (0, 40, 10, 50)]
+        self.check(compute_distribute_deltas, boxes, 1, expected=[(0, 0), (0, 8), (0, 0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from codegen_table import IMAGE_ROW, TableCodeBuilder
+
+
+class SplitRowsForViewportTest(unittest.TestCase):
+    def setUp(self):
+        self.builder = TableCodeBuilder()
+        self.builder.add_widget("ttk", "Label", {}, "in", 10, 10, size=(40, 20)) # z=0
+        self.builder.add_widget("ttk", "Label", {}, "below", 10, 900, size=(40, 20)) # z=1
+        self.builder.add_image("bg.png", 100, 100, 550, 350) # z=2 右下の角に掛かる
+        self.builder.add_widget("ttk", "Label", {}, "right", 700, 0, size=(40, 20)) # z=3
+        self.builder.add_widget("ttk", "Label", {}, "left", -50, 0, size=(50, 20)) # z=4 右端がちょうど 0
+
+    def test_initial_rows_keep_z(self):
+        initial, _ = self.builder.split_rows_for_viewport(600, 400)
+        self.assertEqual([(row[2], row[-1]) for row in initial], [("in", 0), (None, 2)])
+        self.assertEqual(initial[1][0], IMAGE_ROW)
+
+    def test_deferred_rows_sorted_from_top(self):
+        _, deferred = self.builder.split_rows_for_viewport(600, 400)
+        self.assertEqual([row[2] for row in deferred], ["left", "right", "below"])
+        self.assertEqual(deferred[1][-3:], (740, 20, 3))
+
+    def test_everything_initial_in_large_viewport(self):
+        initial, deferred = self.builder.split_rows_for_viewport(2000, 2000)
+        self.assertEqual(len(initial), 4)
+        self.assertEqual([row[2] for row in deferred], ["left"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from components import (expand_layout_components, instance_bounds, instance_origin, make_definition,
+                        member_overrides, resolve_members)
+from layout_fixtures import base_layout, widget
+
+
+def definition_and_origin():
+    return make_definition("row", [widget("a", 100, 60, "A", 0), widget("b", 150, 60, "B", 1)])
+
+
+class DefinitionTest(unittest.TestCase):
+    def test_members_are_relative_to_top_left(self):
+        definition, origin = definition_and_origin()
+        self.assertEqual(origin, (100, 60))
+        self.assertEqual([(member["dx"], member["dy"]) for member in definition["members"]], [(0, 0), (50, 0)])
+        self.assertNotIn("uid", definition["members"][0])
+        self.assertEqual(instance_origin(definition, {1: (250, 10)}), (200, 10))
+
+
+class OverridesTest(unittest.TestCase):
+    def setUp(self):
+        self.definition, _ = definition_and_origin()
+
+    def test_unchanged_members_have_no_overrides(self):
+        members = dict(enumerate(self.definition["members"]))
+        self.assertEqual(member_overrides(self.definition, members), {})
+
+    def test_changed_and_removed_members(self):
+        members = {0: dict(self.definition["members"][0], text="A2")}
+        overrides = member_overrides(self.definition, members)
+        self.assertEqual(overrides, {"0": {"text": "A2"}, "1": {"removed": True}})
+        resolved = resolve_members(self.definition, overrides)
+        self.assertEqual([(index, member["text"]) for index, member in resolved], [(0, "A2")])
+
+    def test_resolve_does_not_share_definition(self):
+        (_, member), _ = resolve_members(self.definition, None)
+        member["text"] = "X"
+        self.assertEqual(self.definition["members"][0]["text"], "A")
+
+    def test_bounds(self):
+        self.assertEqual(instance_bounds(self.definition, None, (10, 20)), (10, 20, 90, 20))
+        self.assertEqual(instance_bounds(self.definition, {"0": {"removed": True}}, (10, 20)), (60, 20, 40, 20))
+
+
+class ExpandLayoutComponentsTest(unittest.TestCase):
+    def test_instances_become_items_in_z_order(self):
+        definition, _ = definition_and_origin()
+        layout = base_layout()
+        layout["components"] = {"row": definition}
+        layout["items"].insert(0, {"uid": "i1", "type": "component", "component": "row", "x": 0, "y": 100, "z": 1,
+                                   "member_uids": ["m0", "m1"], "overrides": {"1": {"text": "B2"}}})
+        layout["items"].append({"uid": "i2", "type": "component", "component": "missing", "x": 0, "y": 0, "z": 9})
+        expanded = expand_layout_components(layout)
+        self.assertNotIn("components", expanded)
+        self.assertEqual(expanded["palette"], layout["palette"])
+        self.assertEqual([(item["uid"], item["x"], item["y"], item["z"]) for item in expanded["items"]],
+                         [("a", 0, 0, 0), ("m0", 0, 100, 1), ("m1", 50, 100, 2), ("b", 50, 0, 3), ("c", 100, 0, 4)])
+        self.assertEqual(expanded["items"][2]["text"], "B2")
+        self.assertNotIn("dx", expanded["items"][1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from groups import GroupTree
+
+
+class CountingFetch:
+    def __init__(self, bboxes):
+        self.bboxes = bboxes
+        self.requests = []
+
+    def __call__(self, item_ids):
+        self.requests.append(sorted(item_ids))
+        return {item_id: self.bboxes[item_id] for item_id in item_ids}
+
+
+class GroupTreeTest(unittest.TestCase):
+    def setUp(self):
+        # outer: {1, inner: {2, 3}}, other: {4}
+        self.tree = GroupTree()
+        self.tree.create("inner", "inner", items=[2, 3])
+        self.tree.create("outer", "outer", items=[1], children=["inner"])
+        self.tree.create("other", "other", items=[4])
+        self.fetch = CountingFetch({1: (0, 0, 10, 10), 2: (20, 0, 30, 10), 3: (0, 40, 10, 50), 4: (100, 100, 110, 110)})
+
+    def test_bbox_is_cached(self):
+        self.assertEqual(self.tree.bbox("outer", self.fetch), (0, 0, 30, 50))
+        self.assertEqual(self.tree.bbox("outer", self.fetch), (0, 0, 30, 50))
+        self.assertEqual(self.fetch.requests, [[1, 2, 3]])
+
+    def test_dirty_item_refetches_only_its_groups(self):
+        self.tree.bbox("outer", self.fetch); self.tree.bbox("other", self.fetch)
+        self.fetch.requests.clear()
+        self.fetch.bboxes[2] = (20, 0, 60, 10)
+        self.tree.mark_items_dirty([2])
+        self.assertEqual(self.tree.bbox("outer", self.fetch), (0, 0, 60, 50))
+        self.assertEqual(self.tree.bbox("other", self.fetch), (100, 100, 110, 110))
+        # inner と outer の直下のアイテムだけを取り直す (other はキャッシュのまま)
+        self.assertEqual(self.fetch.requests, [[1, 2, 3]])
+
+    def test_translate_shifts_cache_without_fetching_moved_group(self):
+        self.tree.bbox("outer", self.fetch)
+        self.fetch.requests.clear()
+        self.tree.translate("inner", 5, 5)
+        for item_id in (2, 3):
+            x1, y1, x2, y2 = self.fetch.bboxes[item_id]
+            self.fetch.bboxes[item_id] = (x1 + 5, y1 + 5, x2 + 5, y2 + 5)
+        self.assertEqual(self.tree.bbox("inner", self.fetch), (5, 5, 35, 55))
+        self.assertEqual(self.fetch.requests, [])
+        self.assertEqual(self.tree.bbox("outer", self.fetch), (0, 0, 35, 55))
+        self.assertEqual(self.fetch.requests, [[1]])
+
+    def test_remove_items_drops_empty_groups(self):
+        self.tree.remove_items([4])
+        self.assertNotIn("other", self.tree)
+        self.tree.remove_items([2, 3])
+        self.assertNotIn("inner", self.tree)
+        self.assertEqual(self.tree.leaf_items("outer"), (1,))
+
+    def test_ungroup_moves_members_to_parent(self):
+        self.tree.ungroup("inner")
+        self.assertEqual(sorted(self.tree.leaf_items("outer")), [1, 2, 3])
+        self.assertEqual(self.tree.root_of_item(2), "outer")
+        self.assertEqual(self.tree.bbox("outer", self.fetch), (0, 0, 30, 50))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from image_budget import OriginalImageBudget, image_nbytes
+
+
+class FakeItem:
+    def __init__(self, path, image):
+        self.path = path
+        self.original_pil_image = image
+
+
+class OriginalImageBudgetTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.paths = []
+        for index in range(3):
+            path = os.path.join(self.tmpdir.name, f"image{index}.png")
+            Image.new("RGB", (512, 512), (index * 40, 0, 0)).save(path)
+            self.paths.append(path)
+        self.image_bytes = 512 * 512 * 3
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _item(self, index):
+        return FakeItem(self.paths[index], Image.new("RGB", (512, 512)))
+
+    def test_evicts_least_recently_used(self):
+        budget = OriginalImageBudget(budget_mb=2 * self.image_bytes / (1024 * 1024))
+        first, second, third = self._item(0), self._item(1), self._item(2)
+        budget.register(first); budget.register(second)
+        budget.original(first) # first を最近使ったことにする
+        budget.register(third)
+        self.assertIsNone(second.original_pil_image)
+        self.assertIsNotNone(first.original_pil_image)
+        self.assertIsNotNone(third.original_pil_image)
+        self.assertEqual(budget.used_bytes, 2 * self.image_bytes)
+        self.assertEqual(budget.dropped, 1)
+
+    def test_reopens_dropped_original(self):
+        budget = OriginalImageBudget(budget_mb=self.image_bytes / (1024 * 1024))
+        first, second = self._item(0), self._item(1)
+        budget.register(first); budget.register(second)
+        self.assertIsNone(first.original_pil_image)
+        image = budget.original(first)
+        self.assertEqual(image.size, (512, 512))
+        self.assertEqual(budget.reopened, 1)
+        self.assertIsNone(second.original_pil_image) # 開き直した分のために second を手放す
+
+    def test_shared_image_counted_once(self):
+        budget = OriginalImageBudget(budget_mb=1)
+        image = Image.new("RGB", (100, 100))
+        first, second = FakeItem(self.paths[0], image), FakeItem(self.paths[0], image)
+        budget.register(first); budget.register(second)
+        self.assertEqual(budget.used_bytes, image_nbytes(image))
+        budget.discard(first)
+        self.assertEqual(budget.used_bytes, image_nbytes(image))
+        budget.discard(second)
+        self.assertEqual(budget.used_bytes, 0)
+
+    def test_reopen_shares_retained_image_of_same_path(self):
+        budget = OriginalImageBudget(budget_mb=self.image_bytes / (1024 * 1024))
+        first, second = self._item(0), self._item(0)
+        budget.register(first); budget.register(second)
+        self.assertIsNone(first.original_pil_image)
+        self.assertIs(budget.original(first), second.original_pil_image)
+        budget.discard(first); budget.discard(second)
+        self.assertEqual(budget.used_bytes, 0)
+
+    def test_single_item_over_budget_is_kept(self):
+        budget = OriginalImageBudget(budget_mb=0)
+        item = self._item(0)
+        budget.register(item)
+        self.assertIsNotNone(item.original_pil_image)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_watcher import StatWatcher
+
+
+class StatWatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.paths = []
+        for index in range(3):
+            path = os.path.join(self.tmpdir.name, f"image{index}.png")
+            with open(path, "wb") as f: f.write(b"x")
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def touch(self, path, data=b"x", mtime_ns=None):
+        with open(path, "wb") as f: f.write(data)
+        if mtime_ns is not None: os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def test_first_pass_only_records(self):
+        watcher = StatWatcher()
+        self.assertEqual(watcher.changed_paths(self.paths), set())
+        self.assertEqual(watcher.changed_paths(self.paths), set())
+
+    def test_reports_modified_file(self):
+        watcher = StatWatcher()
+        watcher.changed_paths(self.paths)
+        self.touch(self.paths[1], b"changed")
+        self.assertEqual(watcher.changed_paths(self.paths), {os.path.abspath(self.paths[1])})
+        self.assertEqual(watcher.changed_paths(self.paths), set())
+
+    def test_same_size_new_mtime(self):
+        watcher = StatWatcher()
+        watcher.changed_paths(self.paths)
+        stat = os.stat(self.paths[0])
+        self.touch(self.paths[0], mtime_ns=stat.st_mtime_ns + 1_000_000_000)
+        self.assertEqual(watcher.changed_paths(self.paths), {os.path.abspath(self.paths[0])})
+
+    def test_deleted_then_restored(self):
+        watcher = StatWatcher()
+        watcher.changed_paths(self.paths)
+        os.remove(self.paths[2])
+        self.assertEqual(watcher.changed_paths(self.paths), set())
+        self.touch(self.paths[2], b"back")
+        self.assertEqual(watcher.changed_paths(self.paths), {os.path.abspath(self.paths[2])})
+
+    def test_batches_spread_over_calls(self):
+        watcher = StatWatcher(batch=2)
+        watcher.changed_paths(self.paths); watcher.changed_paths(self.paths) # 1周目 (基準を取る)
+        for path in self.paths: self.touch(path, b"changed")
+        first = watcher.changed_paths(self.paths); second = watcher.changed_paths(self.paths)
+        self.assertEqual((len(first), len(second)), (2, 1))
+        self.assertEqual(first | second, {os.path.abspath(path) for path in self.paths})
+
+    def test_forgets_paths_no_longer_watched(self):
+        watcher = StatWatcher()
+        watcher.changed_paths(self.paths)
+        watcher.changed_paths(self.paths[:1])
+        self.touch(self.paths[1], b"changed")
+        # 見張りから外した間の変更は、戻したときの基準になるだけ
+        self.assertEqual(watcher.changed_paths(self.paths), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
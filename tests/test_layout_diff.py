@@ -0,0 +1,76 @@
+import copy
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from layout_diff import diff_layouts, diff_is_empty, merge_layouts
+from layout_fixtures import BASE, base_layout, widget
+
+
+class DiffLayoutsTest(unittest.TestCase):
+    def test_identical_layouts(self):
+        self.assertTrue(diff_is_empty(diff_layouts(BASE, base_layout())))
+
+    def test_added_removed_moved_changed(self):
+        new = base_layout()
+        new["items"][0]["x"] = 5
+        new["items"][1]["text"] = "B2"
+        del new["items"][2]
+        new["items"].append(widget("d", 0, 50, "D", 3))
+        new["general_settings"]["grid_spacing"] = 20
+        diff = diff_layouts(BASE, new)
+        self.assertEqual(diff["added"], ["d"])
+        self.assertEqual(diff["removed"], ["c"])
+        self.assertEqual(diff["moved"], [{"uid": "a", "from": [0, 0], "to": [5, 0]}])
+        self.assertEqual(diff["changed"], [{"uid": "b", "fields": {"text": ["B", "B2"]}}])
+        self.assertEqual(diff["settings"], {"grid_spacing": [10, 20]})
+
+    def test_section_changes(self):
+        new = base_layout()
+        new["palette"]["title"]["fg"] = "#ff0000"
+        self.assertIn("palette", diff_layouts(BASE, new)["sections"])
+
+
+class MergeLayoutsTest(unittest.TestCase):
+    def test_non_conflicting_edits_merge(self):
+        ours, theirs = base_layout(), base_layout()
+        ours["items"][0]["x"] = 5
+        theirs["items"][1]["text"] = "B2"
+        theirs["items"].append(widget("d", 0, 50, "D", 3))
+        merged, conflicts = merge_layouts(BASE, ours, theirs)
+        self.assertEqual(conflicts, [])
+        items = {item["uid"]: item for item in merged["items"]}
+        self.assertEqual(items["a"]["x"], 5)
+        self.assertEqual(items["b"]["text"], "B2")
+        self.assertEqual([item["uid"] for item in merged["items"]], ["a", "b", "c", "d"])
+        self.assertEqual([item["z"] for item in merged["items"]], [0, 1, 2, 3])
+
+    def test_conflict_keeps_ours(self):
+        ours, theirs = base_layout(), base_layout()
+        ours["items"][0]["text"] = "ours"
+        theirs["items"][0]["text"] = "theirs"
+        merged, conflicts = merge_layouts(BASE, ours, theirs)
+        self.assertEqual(merged["items"][0]["text"], "ours")
+        self.assertEqual([(c["uid"], c["field"]) for c in conflicts], [("a", "text")])
+
+    def test_delete_against_unchanged_and_changed(self):
+        ours, theirs = base_layout(), base_layout()
+        del ours["items"][2] # c: 自分側で削除、相手側は変更なし -> 削除
+        del ours["items"][1] # b: 自分側で削除、相手側で変更 -> 残して競合
+        theirs["items"][1]["text"] = "B2"
+        merged, conflicts = merge_layouts(BASE, ours, theirs)
+        self.assertEqual([item["uid"] for item in merged["items"]], ["a", "b"])
+        self.assertEqual([(c["uid"], c["field"]) for c in conflicts], [("b", None)])
+
+    def test_section_keys_named_like_item_fields_are_merged(self):
+        base = {"items": [], "palette": {"z": {"fg": "red"}, "uid": {"fg": "red"}}}
+        theirs = copy.deepcopy(base); theirs["palette"]["z"]["fg"] = "blue"; theirs["palette"]["uid"]["fg"] = "blue"
+        merged, conflicts = merge_layouts(base, copy.deepcopy(base), theirs)
+        self.assertEqual(conflicts, [])
+        self.assertEqual(merged["palette"], {"z": {"fg": "blue"}, "uid": {"fg": "blue"}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from layout_lint import find_overlaps, lint_bounds, ISSUE_OVERLAP, ISSUE_OFF_CANVAS, ISSUE_ZERO_SIZE
+
+
+def brute_force_overlaps(bounds):
+    pairs = set()
+    for i, (key_a, ax1, ay1, ax2, ay2) in enumerate(bounds):
+        for key_b, bx1, by1, bx2, by2 in bounds[i + 1:]:
+            if ax1 < bx2 and bx1 < ax2 and ay1 < by2 and by1 < ay2: pairs.add(frozenset((key_a, key_b)))
+    return pairs
+
+
+class FindOverlapsTest(unittest.TestCase):
+    def test_matches_brute_force(self):
+        rng = random.Random(7)
+        for _ in range(50):
+            bounds = []
+            for key in range(rng.randint(0, 60)):
+                x, y = rng.randint(0, 400), rng.randint(0, 400)
+                bounds.append((key, x, y, x + rng.randint(1, 80), y + rng.randint(1, 80)))
+            found = find_overlaps(bounds)
+            self.assertEqual({frozenset((a, b)) for a, b, _ in found}, brute_force_overlaps(bounds))
+            self.assertEqual(len(found), len({frozenset((a, b)) for a, b, _ in found}))
+
+    def test_touching_edges_do_not_overlap(self):
+        self.assertEqual(find_overlaps([("a", 0, 0, 10, 10), ("b", 10, 0, 20, 10), ("c", 0, 10, 10, 20)]), [])
+
+    def test_overlap_region(self):
+        self.assertEqual(find_overlaps([("a", 0, 0, 10, 10), ("b", 5, 6, 20, 20)]), [("a", "b", (5, 6, 10, 10))])
+
+
+class LintBoundsTest(unittest.TestCase):
+    def test_issue_kinds(self):
+        issues = lint_bounds([("zero", 0, 0, 0, 10), ("out", 90, 0, 110, 10), ("a", 0, 0, 10, 10), ("b", 5, 5, 15, 15)],
+                             window_size=(100, 100))
+        kinds = {(issue["kind"], tuple(issue["items"])) for issue in issues}
+        self.assertEqual(kinds, {(ISSUE_ZERO_SIZE, ("zero",)), (ISSUE_OFF_CANVAS, ("out",)), (ISSUE_OVERLAP, ("a", "b"))})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import io
+import os
+import queue
+import sys
+import types
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from layout_fixtures import base_layout, widget
+from live_preview import LivePreviewApp, items_delta, delta_is_empty
+from live_preview_mixin import LivePreviewMixin
+
+
+def sent_items():
+    return {item["uid"]: item for item in base_layout()["items"]}
+
+
+class ItemsDeltaTest(unittest.TestCase):
+    def test_unchanged_items(self):
+        delta = items_delta(sent_items(), {"a": widget("a", 0, 0, "A", 0)})
+        self.assertTrue(delta_is_empty(delta))
+
+    def test_move_only(self):
+        sent = sent_items()
+        delta = items_delta(sent, {"a": widget("a", 30, 0, "A", 0)})
+        self.assertEqual(delta["moved"], {"a": [30, 0]})
+        self.assertEqual((delta["changed"], delta["added"], delta["removed"]), ({}, [], []))
+        self.assertEqual(sent["a"]["x"], 30)
+
+    def test_changed_added_removed(self):
+        sent = sent_items()
+        delta = items_delta(sent, {"b": widget("b", 50, 0, "B2", 1), "d": widget("d", 0, 50, "D", 3)}, removed_keys=["c", "x"])
+        self.assertEqual(list(delta["changed"]), ["b"])
+        self.assertEqual([key for key, _ in delta["added"]], ["d"])
+        self.assertEqual(delta["removed"], ["c"])
+        self.assertEqual(sorted(sent), ["a", "b", "d"])
+
+    def test_refresh_recreates_unchanged_item(self):
+        delta = items_delta(sent_items(), {"a": widget("a", 0, 0, "A", 0)}, refresh_keys={"a"})
+        self.assertEqual(list(delta["changed"]), ["a"])
+
+    def test_palette_change_is_not_empty(self):
+        delta = items_delta(sent_items(), {})
+        delta["palette"] = {}
+        self.assertFalse(delta_is_empty(delta))
+
+
+class ReadMessagesTest(unittest.TestCase):
+    def test_malformed_lines_are_skipped(self):
+        reader = types.SimpleNamespace(_messages=queue.Queue())
+        LivePreviewApp._read_messages(reader, io.StringIO('{"op": "reset"}\n{broken\n[1]\n\n{"op": "delta"}\n'))
+        messages = []
+        while not reader._messages.empty(): messages.append(reader._messages.get_nowait())
+        self.assertEqual(messages, [{"op": "reset"}, {"op": "delta"}, None])
+
+
+class FakeItem:
+    def __init__(self, item_id, uid, x):
+        self.id, self.uid, self.x = item_id, uid, x
+
+
+class FakeDesigner(LivePreviewMixin):
+    # Tk を使わずに、どのアイテムを辞書にしたかと delta の中身を見る
+    def __init__(self, items):
+        self.canvas_items = items
+        self.serialized = []
+        self._live_preview_sent = {}; self._live_preview_keys = {}; self._live_preview_order = []
+        self._live_preview_dirty_ids = set(); self._live_preview_refresh_ids = set(); self._live_preview_order_dirty = False
+        for item in items:
+            self._live_preview_sent[item.uid] = self._data(item); self._live_preview_keys[item.id] = item.uid
+            self._live_preview_order.append(item.uid)
+
+    @staticmethod
+    def _data(item):
+        return widget(item.uid, item.x, 0, item.uid.upper(), 0)
+
+    def _serialize_item(self, item):
+        self.serialized.append(item.id)
+        return self._data(item)
+
+    def canvas_items_in_z_order(self):
+        return list(self.canvas_items)
+
+
+class DeltaMessageTest(unittest.TestCase):
+    def setUp(self):
+        self.items = [FakeItem(1, "a", 0), FakeItem(2, "b", 50), FakeItem(3, "c", 100)]
+        self.designer = FakeDesigner(self.items)
+
+    def test_serializes_only_dirty_items(self):
+        self.items[1].x = 60
+        self.designer._live_preview_dirty_ids = {2}
+        message = self.designer._live_preview_delta_message()
+        self.assertEqual(self.designer.serialized, [2])
+        self.assertEqual(message["moved"], {"b": [60, 0]})
+        self.assertIsNone(message["order"])
+
+    def test_new_item_added_on_top_without_order(self):
+        self.items.append(FakeItem(4, "d", 0))
+        message = self.designer._live_preview_delta_message()
+        self.assertEqual(self.designer.serialized, [4])
+        self.assertEqual([key for key, _ in message["added"]], ["d"])
+        self.assertIsNone(message["order"])
+
+    def test_removed_and_reordered(self):
+        del self.items[0]
+        self.items.reverse()
+        self.designer._live_preview_dirty_ids = {1}
+        self.designer._live_preview_order_dirty = True
+        message = self.designer._live_preview_delta_message()
+        self.assertEqual(message["removed"], ["a"])
+        self.assertEqual(message["order"], ["c", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from smart_guides import EdgeIndex, GuideIndex
+
+
+class EdgeIndexTest(unittest.TestCase):
+    def test_nearest_within_tolerance(self):
+        edges = EdgeIndex()
+        edges.build([(10, 1), (50, 2), (100, 3)])
+        self.assertEqual(edges.nearest(53, 5), 50)
+        self.assertEqual(edges.nearest(48, 5), 50)
+        self.assertIsNone(edges.nearest(75, 5))
+
+    def test_remove_only_matching_entry(self):
+        edges = EdgeIndex()
+        edges.build([(50, 1), (50, 2)])
+        edges.remove(50, 1); edges.remove(50, 9)
+        self.assertEqual(len(edges), 1)
+        self.assertEqual(edges.nearest(50, 0), 50)
+
+
+class GuideIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = GuideIndex()
+        self.index.build({1: (0, 0, 100, 40), 2: (200, 100, 260, 140)})
+
+    def test_snap_to_nearest_edges(self):
+        # 左辺 103 -> 右辺 100、上辺 98 -> 上辺 100
+        self.assertEqual(self.index.snap((103, 98, 153, 118), 5), (-3, 2, 100, 100))
+
+    def test_snap_to_center_line(self):
+        # 中央 x 232 -> 230 (アイテム2の中央)
+        dx, dy, guide_x, guide_y = self.index.snap((212, 300, 252, 320), 3)
+        self.assertEqual((dx, guide_x), (-2, 230))
+        self.assertEqual((dy, guide_y), (None, None))
+
+    def test_no_snap_beyond_tolerance(self):
+        self.assertEqual(self.index.snap((120, 60, 150, 80), 5), (None, None, None, None))
+
+    def test_set_bbox_replaces_old_lines(self):
+        self.index.set_bbox(1, (500, 500, 520, 520))
+        self.assertEqual(len(self.index), 2)
+        self.assertEqual(self.index.snap((103, 300, 153, 320), 5), (None, None, None, None))
+        self.assertEqual(self.index.snap((498, 600, 508, 610), 5)[0], 2)
+
+    def test_remove(self):
+        self.assertEqual(self.index.remove(2), (200, 100, 260, 140))
+        self.assertNotIn(2, self.index)
+        self.assertIsNone(self.index.remove(2))
+        self.assertEqual(len(self.index.x_edges), 3)
+        self.assertEqual(self.index.snap((198, 300, 210, 310), 5), (None, None, None, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
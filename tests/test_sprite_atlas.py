@@ -0,0 +1,46 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sprite_atlas import is_sprite_size, pack_shelves
+
+
+def overlaps(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+class PackShelvesTest(unittest.TestCase):
+    def test_taller_images_first_on_each_shelf(self):
+        placements, extents = pack_shelves([(30, 10), (40, 20), (20, 20)], sheet_size=100, padding=1)
+        self.assertEqual(placements, [(0, 62, 0), (0, 0, 0), (0, 41, 0)])
+        self.assertEqual(extents, [(92, 20)])
+
+    def test_wraps_to_next_shelf_and_sheet(self):
+        placements, extents = pack_shelves([(60, 40)] * 3, sheet_size=100, padding=0)
+        self.assertEqual(placements, [(0, 0, 0), (0, 0, 40), (1, 0, 0)])
+        self.assertEqual(extents, [(60, 80), (60, 40)])
+
+    def test_no_overlap_within_sheet(self):
+        sizes = [(17 + i * 7 % 50, 9 + i * 13 % 60) for i in range(80)]
+        placements, extents = pack_shelves(sizes, sheet_size=256, padding=1)
+        boxes = {}
+        for (width, height), (sheet, x, y) in zip(sizes, placements):
+            box = (x, y, x + width, y + height)
+            self.assertLessEqual(box[2], extents[sheet][0]); self.assertLessEqual(box[3], extents[sheet][1])
+            for other in boxes.get(sheet, []): self.assertFalse(overlaps(box, other))
+            boxes.setdefault(sheet, []).append(box)
+
+    def test_image_larger_than_sheet(self):
+        with self.assertRaises(ValueError):
+            pack_shelves([(10, 10), (300, 10)], sheet_size=256)
+
+    def test_sprite_size(self):
+        self.assertTrue(is_sprite_size(128, 1))
+        self.assertFalse(is_sprite_size(129, 10))
+        self.assertFalse(is_sprite_size(0, 10))
+
+
+if __name__ == "__main__":
+    unittest.main()
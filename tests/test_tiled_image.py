@@ -0,0 +1,95 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageChops
+
+from tiled_image import TiledImageSource, png_row_bands, tile_row_bands, visible_tiles
+
+
+def pattern_image(mode, size=(301, 517)):
+    # 行ごとに違う値にして、帯の継ぎ目 (PNG のフィルターの前の行) のずれが分かるようにする
+    image = Image.new("RGB", size)
+    image.putdata([((x * 7 + y * 3) % 256, (x * y) % 256, (y * 11) % 256) for y in range(size[1]) for x in range(size[0])])
+    if mode == "P": return image.quantize(64)
+    return image.convert(mode)
+
+
+class VisibleTilesTest(unittest.TestCase):
+    def test_partial_view(self):
+        self.assertEqual(visible_tiles((1000, 600), (300, 100, 600, 300), tile_size=256),
+                         [(1, 0), (2, 0), (1, 1), (2, 1)])
+
+    def test_view_is_clipped_to_image(self):
+        self.assertEqual(visible_tiles((300, 300), (-50, -50, 1000, 1000), tile_size=256),
+                         [(0, 0), (1, 0), (0, 1), (1, 1)])
+
+    def test_view_outside_image(self):
+        self.assertEqual(visible_tiles((300, 300), (400, 0, 500, 100)), [])
+
+
+class LevelFactorTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "large.bmp")
+        Image.new("RGB", (2000, 1000)).save(self.path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_largest_factor_keeping_display_size(self):
+        source = TiledImageSource(self.path)
+        self.assertEqual(source.level_factor((2000, 1000)), 1)
+        self.assertEqual(source.level_factor((999, 400)), 2)
+        self.assertEqual(source.level_factor((500, 250)), 4)
+        self.assertEqual(source.level_factor((100, 300)), 2)
+
+
+class BandedDecodeTest(unittest.TestCase):
+    # 帯ごとに展開・縮小した段が、全体を展開して reduce した結果と同じになること
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def assert_same_as_full_decode(self, path):
+        for factor in (1, 2, 3, 8):
+            with Image.open(path) as image:
+                image.load()
+                expected = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+            if factor > 1: expected = expected.reduce(factor)
+            level = TiledImageSource(path)._decode_level(factor)
+            self.assertEqual((level.mode, level.size), (expected.mode, expected.size), (path, factor))
+            self.assertIsNone(ImageChops.difference(level, expected).getbbox(), (path, factor))
+
+    def test_png_modes(self):
+        for mode in ("RGB", "RGBA", "L", "LA", "P"):
+            path = os.path.join(self.tmpdir.name, f"{mode}.png")
+            pattern_image(mode).save(path)
+            self.assertIsNotNone(png_row_bands(path, band_rows=64))
+            self.assertGreater(len(list(png_row_bands(path, band_rows=64))), 1)
+            self.assert_same_as_full_decode(path)
+
+    def test_uncompressed_formats(self):
+        for name in ("image.bmp", "image.tif", "image.ppm"):
+            path = os.path.join(self.tmpdir.name, name)
+            pattern_image("RGB").save(path)
+            bands = list(tile_row_bands(path, band_rows=64))
+            self.assertEqual(sum(band.height for band in bands), 517)
+            self.assert_same_as_full_decode(path)
+
+    def test_smaller_level_is_derived_from_cached_level(self):
+        path = os.path.join(self.tmpdir.name, "image.png")
+        pattern_image("RGB", (1200, 1200)).save(path)
+        source = TiledImageSource(path)
+        source.level((600, 600))
+        self.assertEqual(source.level((300, 300)).size, (300, 300))
+        self.assertEqual(source._level[0], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,292 @@
+import io
+import math
+import struct
+import zlib
+from collections import OrderedDict
+
+from PIL import Image, ImageFile, ImageTk
+
+# 巨大な画像 (例: 20000x15000 の図面を背景にする) をタイルに分けて表示する。
+# - 元画像の全体は展開しない。表示サイズに近い縮小段 (1/2, 1/4, ...) だけを作る
+#   - JPEG は draft で縮小したまま展開する
+#   - PNG (ビット深度 8・インターレースなし) は IDAT を少しずつ伸長し、BAND_ROWS 行ずつの帯にして展開・縮小する
+#   - 無圧縮の BMP/TIFF/PPM や、ストリップ・タイルに分かれた TIFF は im.tile を帯の行だけに絞って読む
+#   - それ以外 (インターレース PNG、圧縮 TIFF、WebP など) は全体を展開してから縮小する
+#   - 小さい段 (縮小率が大きい段) へは、持っている段を縮小して作る (ファイルは読み直さない)
+# - キャンバスに見えている範囲のタイルだけを縮小段から切り出し、PhotoImage にして LRU で持っておく
+# - アイテムの PhotoImage には見えているタイルを Tk の copy -to で貼るだけ (Python 側で表示サイズの画像を作らない)
+
+TILE_SIZE = 256
+TILED_MIN_PIXELS = 4096 * 4096 # これ以上の画素数の画像はタイル表示にする
+TILED_MAX_PIXELS = 1024 * 1024 * 1024 # 巨大画像として開いてよい上限 (Pillow の展開爆弾の検査を置き換える)
+TILE_CACHE_TILES = 256
+BAND_ROWS = 256 # 縮小段を作るときに一度に展開する元画像の行数
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_BAND_COLOR_TYPES = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4} # ビット深度 8 の色の種類 -> 1画素のバイト数
+PNG_READ_SIZE = 1024 * 1024
+RAW_BAND_MODES = ("L", "P", "LA", "RGB", "RGBA", "RGBX", "CMYK") # 1画素 = バンド数バイトのモード
+TILE_BAND_FORMATS = ("BMP", "TIFF", "PPM") # im.tile を帯に絞って読める形式
+
+
+def open_large_image(path):
+    # Pillow は MAX_IMAGE_PIXELS の2倍を超える画像を開かないので、タイル表示の画像だけ上限を上げて開く
+    previous = Image.MAX_IMAGE_PIXELS
+    Image.MAX_IMAGE_PIXELS = TILED_MAX_PIXELS // 2
+    try: return Image.open(path)
+    finally: Image.MAX_IMAGE_PIXELS = previous
+
+
+def is_huge_image(path):
+    # ヘッダーだけを読んで判定する
+    with open_large_image(path) as image:
+        return image.width * image.height >= TILED_MIN_PIXELS
+
+
+def fit_size(size, max_dim):
+    width, height = size
+    scale = min(1.0, max_dim / max(width, height))
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def tile_box(display_size, col, row, tile_size=TILE_SIZE):
+    x, y = col * tile_size, row * tile_size
+    return x, y, min(x + tile_size, display_size[0]), min(y + tile_size, display_size[1])
+
+
+def visible_tiles(display_size, visible_box, tile_size=TILE_SIZE):
+    # visible_box: アイテム左上を原点とした見えている範囲 (x0, y0, x1, y1)
+    x0, y0 = max(0, visible_box[0]), max(0, visible_box[1])
+    x1, y1 = min(display_size[0], visible_box[2]), min(display_size[1], visible_box[3])
+    if x0 >= x1 or y0 >= y1: return []
+    return [(col, row) for row in range(int(y0) // tile_size, math.ceil(y1 / tile_size))
+            for col in range(int(x0) // tile_size, math.ceil(x1 / tile_size))]
+
+
+def _png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def _read_png_chunk_header(f):
+    header = f.read(8)
+    if len(header) < 8: return None, 0
+    length, kind = struct.unpack(">I4s", header)
+    return kind, length
+
+
+def png_row_bands(path, band_rows=BAND_ROWS):
+    # PNG を上から band_rows 行ずつの画像にして順に返す (伸長済みのデータも帯1つ分ほどしか持たない)。
+    # 帯ごとに「前の帯の最後の行 (フィルターなし) + この帯の行」だけの小さな PNG を作って Pillow に展開させるので、
+    # 前の行を参照するフィルター (Up, Average, Paeth) もそのまま戻せる。対応しない PNG なら None
+    f = open(path, "rb")
+    try:
+        if f.read(8) != PNG_SIGNATURE: f.close(); return None
+        ihdr = None; extra_chunks = []
+        while True:
+            kind, length = _read_png_chunk_header(f)
+            if kind is None or kind == b"IEND": f.close(); return None
+            if kind == b"IDAT": break
+            data = f.read(length); f.read(4)
+            if kind == b"IHDR": ihdr = struct.unpack(">IIBBBBB", data)
+            elif kind in (b"PLTE", b"tRNS"): extra_chunks.append(_png_chunk(kind, data))
+    except Exception:
+        f.close(); raise
+    if ihdr is None or ihdr[2] != 8 or ihdr[3] not in PNG_BAND_COLOR_TYPES or ihdr[6] != 0:
+        f.close(); return None
+    return _png_bands(f, ihdr, extra_chunks, length, band_rows)
+
+
+def _idat_data(f, length):
+    # 最初の IDAT の長さを受け取り、IDAT の中身を PNG_READ_SIZE ずつ返す
+    while True:
+        while length:
+            data = f.read(min(length, PNG_READ_SIZE))
+            if not data: return
+            length -= len(data)
+            yield data
+        f.read(4) # CRC
+        kind, length = _read_png_chunk_header(f)
+        if kind != b"IDAT": return
+
+
+def _png_bands(f, ihdr, extra_chunks, first_length, band_rows):
+    width, height, _, color_type = ihdr[:4]
+    row_bytes = 1 + width * PNG_BAND_COLOR_TYPES[color_type]
+    decompressor = zlib.decompressobj()
+    pending = bytearray() # 伸長したが、まだ帯にしていない行 (フィルター付き)
+    previous_row = None; done = 0
+    with f:
+        for data in _idat_data(f, first_length):
+            while data and done < height:
+                pending += decompressor.decompress(data, row_bytes * band_rows)
+                data = decompressor.unconsumed_tail
+                while done < height:
+                    count = min(band_rows, height - done)
+                    if len(pending) < count * row_bytes: break
+                    rows = bytes(pending[:count * row_bytes]); del pending[:count * row_bytes]
+                    if previous_row is not None: rows = b"\x00" + previous_row + rows
+                    band_height = count + (previous_row is not None)
+                    png = (PNG_SIGNATURE + _png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, band_height, 8, color_type, 0, 0, 0))
+                           + b"".join(extra_chunks) + _png_chunk(b"IDAT", zlib.compress(rows, 0)) + _png_chunk(b"IEND", b""))
+                    band = Image.open(io.BytesIO(png)); band.load()
+                    if previous_row is not None: band = band.crop((0, 1, width, band_height))
+                    previous_row = band.crop((0, count - 1, width, count)).tobytes()
+                    done += count
+                    yield band
+    if done < height: raise ValueError(f"PNG のデータが足りません ({done}/{height} 行)")
+
+
+def _raw_tile_stride(image, tile):
+    # 無圧縮のタイルの1行のバイト数 (分からなければ None)
+    args = tile.args if isinstance(tile.args, tuple) else (tile.args,)
+    rawmode, stride = args[0], args[1] if len(args) > 1 else 0
+    if stride: return stride
+    if rawmode == image.mode and image.mode in RAW_BAND_MODES: return (tile.extents[2] - tile.extents[0]) * Image.getmodebands(image.mode)
+    return None
+
+
+def tile_row_bands(path, band_rows=BAND_ROWS):
+    # im.tile を帯の行に入るものだけに絞って、上から順に展開した帯を返す。
+    # 無圧縮のタイルは行の途中で切れる。切れないタイル (圧縮されたストリップなど) は丸ごと1つの帯に入れる。
+    # 帯にできない画像 (全体が1つの圧縮タイルなど) なら None
+    with open_large_image(path) as image:
+        if image.format not in TILE_BAND_FORMATS: return None
+        width, height, tiles = image.width, image.height, list(image.tile)
+        raw = {index: _raw_tile_stride(image, tile) for index, tile in enumerate(tiles) if tile.codec_name == "raw"}
+    raw = {index: stride for index, stride in raw.items() if stride and tiles[index].args and
+           (not isinstance(tiles[index].args, tuple) or len(tiles[index].args) < 3 or tiles[index].args[2] in (1, -1))}
+    if not tiles or any(index not in raw and tile.extents[3] - tile.extents[1] > band_rows * 4 for index, tile in enumerate(tiles)):
+        return None
+    return _tile_bands(path, width, height, tiles, raw, band_rows)
+
+
+def _cut_raw_tile(tile, stride, top, bottom):
+    x0, y0, x1, y1 = tile.extents
+    args = tile.args if isinstance(tile.args, tuple) else (tile.args,)
+    upward = len(args) > 2 and args[2] == -1 # 下の行から並んでいる (BMP)
+    first, last = max(top, y0), min(bottom, y1)
+    offset = tile.offset + ((y1 - last) if upward else (first - y0)) * stride
+    return ImageFile._Tile("raw", (x0, first - top, x1, last - top), offset, (args[0], stride, -1 if upward else 1))
+
+
+def _tile_bands(path, width, height, tiles, raw, band_rows):
+    top = 0
+    while top < height:
+        bottom = min(height, top + band_rows)
+        for index, tile in enumerate(tiles): # 切れないタイルは帯を広げて丸ごと入れる
+            if index not in raw and tile.extents[1] < bottom < tile.extents[3]: bottom = tile.extents[3]
+        band_tiles = []
+        for index, tile in enumerate(tiles):
+            x0, y0, x1, y1 = tile.extents
+            if y1 <= top or y0 >= bottom: continue
+            if index in raw: band_tiles.append(_cut_raw_tile(tile, raw[index], top, bottom))
+            else: band_tiles.append(ImageFile._Tile(tile.codec_name, (x0, y0 - top, x1, y1 - top), tile.offset, tile.args))
+        band = open_large_image(path)
+        band._size = (width, bottom - top)
+        if hasattr(band, "_tile_size"): band._tile_size = band._size # TIFF は展開先をこの大きさで作る
+        band.tile = band_tiles
+        band.load()
+        yield band
+        top = bottom
+
+
+def _level_image(image):
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+    return image
+
+
+def reduce_bands(bands, size, factor):
+    # 上から順の帯を factor 分の1に縮小してつなぐ (Image.reduce(factor) と同じ結果)。
+    # 帯の行数が factor で割り切れないときは、余りの行を次の帯の前につなげてから縮小する
+    level = None; carry = None; y = 0
+    for band in bands:
+        band = _level_image(band)
+        if carry is not None:
+            joined = Image.new(band.mode, (band.width, carry.height + band.height))
+            joined.paste(carry, (0, 0)); joined.paste(band, (0, carry.height))
+            band = joined
+        usable = band.height - band.height % factor
+        carry = band.crop((0, usable, band.width, band.height)) if usable < band.height else None
+        if not usable: continue
+        part = band.crop((0, 0, band.width, usable)).reduce(factor) if factor > 1 else band.crop((0, 0, band.width, usable))
+        if level is None: level = Image.new(part.mode, (math.ceil(size[0] / factor), math.ceil(size[1] / factor)))
+        level.paste(part, (0, y)); y += part.height
+    if carry is not None:
+        part = carry.reduce(factor) if factor > 1 else carry
+        if level is None: level = Image.new(part.mode, (math.ceil(size[0] / factor), math.ceil(size[1] / factor)))
+        level.paste(part, (0, y))
+    return level
+
+
+class TiledImageSource:
+    def __init__(self, path):
+        self.path = path
+        with open_large_image(path) as image: self.size = image.size
+        self._level = None # (縮小率, 縮小段の画像)。一番最近使った段だけを持つ
+
+    def level_factor(self, display_size):
+        # 表示サイズ以上を保てる最大の 2 のべき乗の縮小率
+        factor = 1
+        while (self.size[0] // (factor * 2) >= display_size[0] and self.size[1] // (factor * 2) >= display_size[1]):
+            factor *= 2
+        return factor
+
+    def _decode_level(self, factor):
+        image = open_large_image(self.path)
+        if image.format != "JPEG":
+            bands = png_row_bands(self.path) if image.format == "PNG" else tile_row_bands(self.path)
+            if bands is not None:
+                image.close()
+                return reduce_bands(bands, self.size, factor)
+        target = (max(1, self.size[0] // factor), max(1, self.size[1] // factor))
+        if image.format == "JPEG": image.draft(image.mode, target) # DCT の縮小展開 (1/2〜1/8)
+        image.load()
+        reduce_by = min(image.width // target[0], image.height // target[1])
+        if reduce_by > 1: image = image.reduce(reduce_by)
+        return _level_image(image)
+
+    def level(self, display_size):
+        factor = self.level_factor(display_size)
+        if self._level is None or self._level[0] != factor:
+            if self._level is not None and factor > self._level[0]:
+                self._level = (factor, self._level[1].reduce(factor // self._level[0])) # 持っている段から縮める
+            else:
+                self._level = None # 新しい段を作る前に古い段を手放す
+                self._level = (factor, self._decode_level(factor))
+        return self._level[1]
+
+    def render_tile(self, display_size, col, row, tile_size=TILE_SIZE):
+        level = self.level(display_size)
+        x0, y0, x1, y1 = tile_box(display_size, col, row, tile_size)
+        scale_x, scale_y = level.width / display_size[0], level.height / display_size[1]
+        return level.resize((x1 - x0, y1 - y0), Image.Resampling.BILINEAR,
+                            box=(x0 * scale_x, y0 * scale_y, x1 * scale_x, y1 * scale_y))
+
+    def release(self):
+        self._level = None
+
+
+class TileCache:
+    # タイルの PhotoImage の LRU。キーは (パス, 表示幅, 表示高さ, 列, 行)
+    def __init__(self, max_tiles=TILE_CACHE_TILES):
+        self.max_tiles = max_tiles
+        self._tiles = OrderedDict()
+        self.hits = 0; self.misses = 0
+
+    def tile_photo(self, master, source, display_size, col, row):
+        key = (source.path, display_size[0], display_size[1], col, row)
+        photo = self._tiles.get(key)
+        if photo is not None:
+            self._tiles.move_to_end(key); self.hits += 1
+            return photo
+        self.misses += 1
+        photo = self._tiles[key] = ImageTk.PhotoImage(source.render_tile(display_size, col, row), master=master)
+        while len(self._tiles) > self.max_tiles: self._tiles.popitem(last=False)
+        return photo
+
+    def discard_path(self, path):
+        for key in [key for key in self._tiles if key[0] == path]: del self._tiles[key]
+
+    def clear(self):
+        self._tiles.clear()
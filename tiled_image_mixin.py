@@ -0,0 +1,73 @@
+import tkinter as tk
+
+from item_records import TiledImageItem
+from layout_diff import new_item_uid
+from perf_monitor import perf_timed
+from tiled_image import TiledImageSource, TileCache, fit_size, visible_tiles, tile_box
+
+
+class TiledImageMixin:
+    # 巨大な画像のアイテム (tiled_image.py)。アイテムの PhotoImage は表示サイズの空の画像で、
+    # キャンバスに見えているタイルだけを貼る。移動やキャンバスの大きさの変更で見える所が増えたら、足りないタイルを貼り足す
+    def _init_tiled_images(self):
+        self.tile_cache = TileCache()
+        self._tile_refresh_after_id = None
+
+    def create_tiled_image_item(self, path, x, y, width=None, height=None, uid=None, max_dim=None):
+        source = TiledImageSource(path)
+        if width and height: width, height = int(width), int(height)
+        else: width, height = fit_size(source.size, max_dim) if max_dim else source.size
+        photo = tk.PhotoImage(master=self, width=width, height=height)
+        image_id = self.canvas_frame.create_image(x, y, image=photo, anchor=tk.NW)
+        self.add_to_content_layer(image_id)
+        item = TiledImageItem(image_id, photo, source, width, height, uid or new_item_uid())
+        self.canvas_items.append(item)
+        self.bind_image_item_press(image_id)
+        self._draw_visible_tiles(item)
+        return item
+
+    def _visible_box(self, item):
+        # キャンバスに見えている範囲を、アイテムの左上を原点にして返す
+        x, y = self.canvas_frame.coords(item.id)[:2]
+        left, top = self.canvas_frame.canvasx(0), self.canvas_frame.canvasy(0)
+        return (left - x, top - y, left + self.canvas_frame.winfo_width() - x, top + self.canvas_frame.winfo_height() - y)
+
+    def _draw_visible_tiles(self, item):
+        display_size = (item.width, item.height)
+        for col, row in visible_tiles(display_size, self._visible_box(item)):
+            if (col, row) in item.drawn_tiles: continue
+            tile = self.tile_cache.tile_photo(self, item.source, display_size, col, row)
+            x0, y0, _, _ = tile_box(display_size, col, row)
+            item.obj.tk.call(item.obj, "copy", str(tile), "-to", x0, y0)
+            item.drawn_tiles.add((col, row))
+
+    @perf_timed()
+    def render_tiled_item(self, item, width, height):
+        # 大きさを変えるときは空の PhotoImage を作り直して、見えているタイルだけを描き直す
+        width, height = max(1, int(width)), max(1, int(height))
+        if (width, height) != (item.width, item.height):
+            item.obj = tk.PhotoImage(master=self, width=width, height=height)
+            self.canvas_frame.itemconfig(item.id, image=item.obj)
+            item.width, item.height = width, height
+            item.drawn_tiles = set()
+        self._draw_visible_tiles(item)
+
+    def source_image_for_size(self, item, size):
+        # コード生成で画像を書き出すときの元画像。タイル表示の画像は全体を展開せず、そのサイズに近い縮小段を使う
+        return item.source.level(size) if item.tiled else item.original_pil_image
+
+    def _schedule_tile_refresh(self):
+        if self._tile_refresh_after_id is None:
+            self._tile_refresh_after_id = self.after_idle(self._refresh_tiled_items)
+
+    def _refresh_tiled_items(self):
+        self._tile_refresh_after_id = None
+        for item in self.canvas_items:
+            if item.tiled:
+                try: self._draw_visible_tiles(item)
+                except Exception as e: print(f"タイル描画エラー ({item.path}): {e}")
+
+    def clear_tiled_images(self):
+        if self._tile_refresh_after_id is not None:
+            self.after_cancel(self._tile_refresh_after_id); self._tile_refresh_after_id = None
+        self.tile_cache.clear()
@@ -0,0 +1,45 @@
+import tkinter as tk
+
+
+class UndoMixin:
+    UNDO_HISTORY_LIMIT = 100
+
+    def _init_undo_history(self):
+        self._undo_stack = []
+
+    def push_undo_entry(self, label, restore_func, merge_key=None, item_ids=None):
+        # restore_func: 呼び出すと操作前の状態に戻す関数 (一括操作1回につき1エントリ)
+        # item_ids: 操作で (戻すときも) 変わるアイテム (None なら全部とみなす)。ライブプレビューにはこのアイテムだけを送り直す
+        # merge_key が直前のエントリと同じ場合は連続入力とみなし、最初の状態だけを残す
+        self.mark_live_preview_dirty(item_ids)
+        if merge_key is not None and self._undo_stack and self._undo_stack[-1]['merge_key'] == merge_key:
+            return
+        self._undo_stack.append({'label': label, 'restore': restore_func, 'merge_key': merge_key,
+                                 'item_ids': None if item_ids is None else list(item_ids)})
+        if len(self._undo_stack) > self.UNDO_HISTORY_LIMIT:
+            del self._undo_stack[0]
+
+    def undo_last_action(self, event=None):
+        if not self._undo_stack:
+            return "break" if event is not None else None
+        entry = self._undo_stack.pop()
+        try:
+            entry['restore']()
+        except tk.TclError as e:
+            print(f"元に戻す処理でエラー ({entry['label']}): {e}")
+        self.invalidate_smart_guides(entry['item_ids'])
+        self.invalidate_group_bounds(entry['item_ids'])
+        self.update_property_editor_for_selection()
+        self.update_highlight()
+        return "break" if event is not None else None
+
+    @staticmethod
+    def _make_config_restore(records):
+        # records: [(widget, option_name, old_value), ...]
+        def restore():
+            for widget, option_name, old_value in reversed(records):
+                try:
+                    widget.configure(**{option_name: old_value})
+                except tk.TclError:
+                    pass  # 削除済みのウィジェットは無視
+        return restore
@@ -0,0 +1,81 @@
+# キャンバスの表示順をレイヤーで管理する (下から grid < content < selection < handles)
+# 各レイヤーの上端に非表示のマーカー項目を置き、tag_lower(..., 次のレイヤーのマーカー) で
+# 任意のレイヤーへ1回の呼び出しで挿入・移動する。
+LAYER_NAMES = ("grid", "content", "selection", "handles")
+LAYER_MARKER_TAG = "layer_marker"
+CONTENT_LAYER_TAG = "layer_content"
+SELECTION_LAYER_TAG = "layer_selection"
+SELECTED_CONTENT_TAG = "selected_content"
+
+
+class ZOrderMixin:
+    def _init_z_layers(self, canvas):
+        self._layer_markers = {}
+        for name in LAYER_NAMES:
+            self._layer_markers[name] = canvas.create_line(0, 0, 0, 0, state="hidden",
+                                                           tags=(LAYER_MARKER_TAG, f"{LAYER_MARKER_TAG}_{name}"))
+        self._tagged_selection_ids = set()
+        # 埋め込みウィジェットはキャンバスの表示順に関係なく最前面に描かれるため、
+        # ウィンドウの重なり順は Tcl 側のループ1回でまとめて変更する
+        self.tk.eval("proc ::layoutdesigner_raise_windows {windows} {foreach w $windows {raise $w}}")
+        self.tk.eval("proc ::layoutdesigner_lower_windows {windows} {foreach w [lreverse $windows] {lower $w}}")
+
+    def _layer_top_marker(self, layer_name):
+        return self._layer_markers[layer_name]
+
+    def add_to_content_layer(self, item_id):
+        self.canvas_frame.addtag_withtag(CONTENT_LAYER_TAG, item_id)
+        self.canvas_frame.tag_lower(item_id, self._layer_top_marker("content"))
+
+    def place_selection_overlays(self):
+        # update_highlight で作った枠を selection レイヤー、ハンドルを handles レイヤーへ
+        self.canvas_frame.tag_lower(SELECTION_LAYER_TAG, self._layer_top_marker("selection"))
+        self.canvas_frame.tag_lower(self.ALL_RESIZE_HANDLES_TAG, self._layer_top_marker("handles"))
+
+    def _sync_selected_content_tag(self):
+        current = self.selected_item_ids
+        tagged = self._tagged_selection_ids
+        for item_id in tagged - current:
+            self.canvas_frame.dtag(item_id, SELECTED_CONTENT_TAG)
+        for item_id in current - tagged:
+            self.canvas_frame.addtag_withtag(SELECTED_CONTENT_TAG, item_id)
+        self._tagged_selection_ids = set(current)
+
+    def _selected_window_paths(self):
+        return [str(item.obj) for item in self.canvas_items
+                if item.type == 'widget' and item.id in self.selected_item_ids]
+
+    def promote_selection(self):
+        # 選択中のアイテムを content レイヤーの最前面へ (相対順は維持)
+        self._sync_selected_content_tag()
+        if not self._tagged_selection_ids: return
+        self.canvas_frame.tag_lower(SELECTED_CONTENT_TAG, self._layer_top_marker("content"))
+        window_paths = self._selected_window_paths()
+        if window_paths:
+            self.tk.call("::layoutdesigner_raise_windows", tuple(window_paths))
+        self.mark_live_preview_dirty(order=True)
+
+    def send_selection_to_back(self):
+        self._sync_selected_content_tag()
+        if not self._tagged_selection_ids: return
+        self.canvas_frame.tag_raise(SELECTED_CONTENT_TAG, self._layer_top_marker("grid"))
+        window_paths = self._selected_window_paths()
+        if window_paths:
+            self.tk.call("::layoutdesigner_lower_windows", tuple(window_paths))
+        self.mark_live_preview_dirty(order=True)
+
+    def forget_selected_content_tags(self):
+        self._tagged_selection_ids = set()
+
+    def canvas_items_in_z_order(self):
+        # find_withtag は表示順 (背面から) で返す
+        order = {item_id: z for z, item_id in enumerate(self.canvas_frame.find_withtag(CONTENT_LAYER_TAG))}
+        fallback = len(order)
+        return sorted(self.canvas_items, key=lambda item: order.get(item.id, fallback))
+
+    def sync_canvas_items_to_z_order(self):
+        self.canvas_items[:] = self.canvas_items_in_z_order()
+
+    @staticmethod
+    def sort_layout_items_by_z(items_data):
+        return sorted(items_data, key=lambda info: info.get('z', 0)) if any('z' in info for info in items_data) else items_data